@@ -0,0 +1,101 @@
+import statistics
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.models.models import DEFAULT_TENANT, Base
+
+WORDS = (
+    "борщ пельмени салат суп котлета пампушки сметана курица говядина грибы картофель сыр "
+    "томаты огурцы рыба креветки блины икра компот морс окрошка солянка плов шашлык"
+).split()
+TABLES = ("menus", "submenus", "dishes")
+
+SEED_STATEMENTS = [
+    "TRUNCATE menus, submenus, dishes RESTART IDENTITY CASCADE",
+    "INSERT INTO tenants (id, title) VALUES (:tenant, :tenant) ON CONFLICT DO NOTHING",
+    """INSERT INTO menus (id, title, description, tenant_id)
+    SELECT g, 'Меню ' || g, 'Описание меню ' || g, :tenant FROM generate_series(1, CAST(:menus AS integer)) g""",
+    """INSERT INTO submenus (id, title, description, menu_id, tenant_id)
+    SELECT g, 'Подменю ' || g, 'Описание подменю ' || g, (g - 1) / CAST(:submenus AS integer) + 1, :tenant
+    FROM generate_series(1, CAST(:submenus_total AS integer)) g""",
+    """INSERT INTO dishes (id, title, description, price, submenu_id, tenant_id)
+    SELECT
+        g,
+        initcap(w[1 + g % cardinality(w)]) || ' ' || w[1 + (g / 7) % cardinality(w)],
+        'Блюдо: ' || w[1 + (g / 3) % cardinality(w)] || ', ' || w[1 + (g / 11) % cardinality(w)]
+            || ' и ' || w[1 + (g / 13) % cardinality(w)],
+        to_char(100 + g % 900, 'FM999') || '.00',
+        (g - 1) / CAST(:dishes AS integer) + 1,
+        :tenant
+    FROM generate_series(1, CAST(:dishes_total AS integer)) g, (SELECT CAST(:words AS text[]) AS w) words""",
+    "SELECT setval(pg_get_serial_sequence('menus', 'id'), (SELECT max(id) FROM menus))",
+    "SELECT setval(pg_get_serial_sequence('submenus', 'id'), (SELECT max(id) FROM submenus))",
+    "SELECT setval(pg_get_serial_sequence('dishes', 'id'), (SELECT max(id) FROM dishes))",
+]
+
+
+def export_data(menus: int, submenus: int, dishes: int) -> dict:
+    data: dict[str, list] = {"menus": [], "submenus": [], "dishes": []}
+    for menu_id in range(1, menus + 1):
+        data["menus"].append({"id": menu_id, "title": f"Меню {menu_id}", "description": f"Описание меню {menu_id}"})
+        for number in range(submenus):
+            submenu_id = (menu_id - 1) * submenus + number + 1
+            data["submenus"].append(
+                {"id": submenu_id, "menu_id": menu_id, "title": f"Подменю {submenu_id}", "description": "Описание"}
+            )
+            for position in range(dishes):
+                dish_id = (submenu_id - 1) * dishes + position + 1
+                data["dishes"].append(
+                    {
+                        "id": dish_id,
+                        "submenu_id": submenu_id,
+                        "title": WORDS[dish_id % len(WORDS)].capitalize(),
+                        "description": " ".join(WORDS[(dish_id + shift) % len(WORDS)] for shift in range(3)),
+                        "price": f"{100 + dish_id % 900}.00",
+                    }
+                )
+    return data
+
+
+async def seed(engine: AsyncEngine, menus: int, submenus: int, dishes: int, tenant: str = DEFAULT_TENANT) -> None:
+    from src.db.database import create_default_tenant
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await create_default_tenant(conn)
+    params = {
+        "tenant": tenant,
+        "menus": menus,
+        "submenus": submenus,
+        "dishes": dishes,
+        "submenus_total": menus * submenus,
+        "dishes_total": menus * submenus * dishes,
+        "words": WORDS,
+    }
+    async with engine.begin() as conn:
+        for table in TABLES:
+            await conn.execute(text(f"ALTER TABLE {table} DISABLE TRIGGER USER"))
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement), params)
+        for table in TABLES:
+            await conn.execute(text(f"ALTER TABLE {table} ENABLE TRIGGER USER"))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+
+def summarize(timings: list[float]) -> dict:
+    if not timings:
+        return {}
+    timings = sorted(timings)
+
+    def percentile(value: float) -> float:
+        return round(timings[min(len(timings) - 1, int(len(timings) * value))], 3)
+
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(timings[-1], 3),
+    }
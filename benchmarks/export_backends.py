@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+from benchmarks.catalog import export_data, summarize
+
+BACKENDS = ("celery", "process", "eager")
+
+
+async def measure(name: str, data: dict, exports: int, timeout: float) -> dict:
+    from src.celery import storage
+    from src.services.exports import EXPORT_BACKENDS
+
+    backend = EXPORT_BACKENDS[name]()
+    dispatch: list[float] = []
+    completion: list[float] = []
+    try:
+        for _ in range(exports):
+            started = time.perf_counter()
+            export_id = await backend.submit(data, priority=9, name=f"{uuid4()}.xlsx")
+            dispatch.append((time.perf_counter() - started) * 1000)
+            path = storage.export_storage.path(export_id)
+            while not os.path.exists(path) and time.perf_counter() - started < timeout:
+                await asyncio.sleep(0.01)
+            if not os.path.exists(path):
+                break
+            completion.append((time.perf_counter() - started) * 1000)
+            os.remove(path)
+    except Exception as error:
+        return {"error": repr(error)}
+    finally:
+        await backend.stop()
+    return {
+        "dispatch": summarize(dispatch),
+        "completion": summarize(completion),
+        "completed": len(completion),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    data = export_data(args.menus, args.submenus, args.dishes)
+    return {name: await measure(name, data, args.exports, args.timeout) for name in args.backends}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение бэкендов выгрузки в excel")
+    parser.add_argument("--menus", type=int, default=10)
+    parser.add_argument("--submenus", type=int, default=10)
+    parser.add_argument("--dishes", type=int, default=100)
+    parser.add_argument("--exports", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--uploads", default=None, help="Каталог для файлов, по умолчанию временный")
+    args = parser.parse_args()
+    os.environ["UPLOADS_DIR"] = args.uploads or tempfile.mkdtemp(prefix="exports-")
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.catalog import summarize
+
+PHASES = ("cold", "warm")
+
+
+class Counters:
+    def __init__(self) -> None:
+        self.sql = 0
+        self.redis = 0
+
+
+def catalog_paths(args: argparse.Namespace) -> list[str]:
+    rng = random.Random(args.random_seed)
+    paths = []
+    for _ in range(args.requests):
+        menu_id = rng.randint(1, args.menus)
+        submenu_id = (menu_id - 1) * args.submenus + rng.randint(1, args.submenus)
+        dish_id = (submenu_id - 1) * args.dishes + rng.randint(1, args.dishes)
+        menu = f"/api/v1/menus/{menu_id}"
+        submenu = f"{menu}/submenus/{submenu_id}"
+        paths.append(
+            rng.choice(
+                [
+                    "/api/v1/menus",
+                    menu,
+                    f"{menu}/submenus",
+                    submenu,
+                    f"{submenu}/dishes",
+                    f"{submenu}/dishes/{dish_id}",
+                ]
+            )
+        )
+    return paths
+
+
+async def drive(client, paths: list[str], concurrency: int) -> dict:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    timings: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(paths),
+        "errors": errors,
+        "rps": round(len(paths) / elapsed, 1),
+        "latency": summarize(timings),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import aioredis
+    from httpx import AsyncClient
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from benchmarks.catalog import seed
+    from src.crud.cache import RedisCache
+    from src.db import database
+    from src.db.redis_config import REDIS_URL
+    from src.models.models import DEFAULT_TENANT
+    from src.settings import settings
+
+    tenant = args.tenant or DEFAULT_TENANT
+    await asyncio.to_thread(database.create_database_if_missing)
+    if not args.skip_seed:
+        seed_engine = create_async_engine(database.SQLALCHEMY_DATABASE_URL, future=True)
+        await seed(seed_engine, args.menus, args.submenus, args.dishes, tenant=tenant)
+        await seed_engine.dispose()
+
+    counters = Counters()
+    execute_command = aioredis.Redis.execute_command
+
+    async def counted_execute_command(self, *command, **options):
+        counters.redis += 1
+        return await execute_command(self, *command, **options)
+
+    def count_statement(*_) -> None:
+        counters.sql += 1
+
+    headers = {settings.TENANT_HEADER: tenant}
+    if args.url:
+        client = AsyncClient(base_url=args.url, headers=headers, timeout=60)
+    else:
+        from src.main import app
+
+        aioredis.Redis.execute_command = counted_execute_command
+        for engine in (database.engine, getattr(database, "replica_engine", None)):
+            if engine is not None:
+                engine.sync_engine.echo = False
+                event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+        await app.router.startup()
+        client = AsyncClient(app=app, base_url="http://benchmark", headers=headers, timeout=60)
+
+    redis = aioredis.from_url(REDIS_URL)
+    cache = RedisCache(cache=redis, tenant=tenant)
+    for family in ("menu:", "submenu:", "dish:"):
+        await cache.delete_all(family)
+    counters.redis = 0
+    paths = catalog_paths(args)
+    phases = {}
+    try:
+        for phase in PHASES:
+            counters.sql = counters.redis = 0
+            result = await drive(client, paths, args.concurrency)
+            if not args.url:
+                result["sql_per_request"] = round(counters.sql / len(paths), 3)
+                result["redis_per_request"] = round(counters.redis / len(paths), 3)
+            phases[phase] = result
+    finally:
+        await client.aclose()
+        await redis.close()
+        if not args.url:
+            await app.router.shutdown()
+            aioredis.Redis.execute_command = execute_command
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {
+            "menus": args.menus,
+            "submenus": args.submenus,
+            "dishes": args.dishes,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "tenant": tenant,
+            "target": args.url or "in-process",
+        },
+        "phases": phases,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    lines = [f"{baseline['commit']} -> {report['commit']}"]
+    for phase in PHASES:
+        before = baseline["phases"].get(phase)
+        after = report["phases"].get(phase)
+        if not before or not after:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            lines.append(f"{phase} {metric}: {before['latency'][metric]} -> {after['latency'][metric]}")
+        lines.append(f"{phase} rps: {before['rps']} -> {after['rps']}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API меню")
+    parser.add_argument(
+        "--database", default=None, help="База для тестового каталога, по умолчанию <POSTGRES_DB>_bench"
+    )
+    parser.add_argument("--redis-db", type=int, default=15)
+    parser.add_argument("--menus", type=int, default=10)
+    parser.add_argument("--submenus", type=int, default=10)
+    parser.add_argument("--dishes", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--tenant", default=None, help="Ресторан для заголовка X-Tenant, по умолчанию основной каталог")
+    parser.add_argument("--url", default=None, help="Адрес запущенного сервера вместо приложения в процессе")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="JSON с результатами другого коммита")
+    args = parser.parse_args()
+    os.environ["POSTGRES_DB"] = args.database or f"{os.environ.get('POSTGRES_DB', 'postgres')}_bench"
+    os.environ["REDIS_DB"] = str(args.redis_db)
+    report = asyncio.run(run(args))
+    output = Path(args.output or f"benchmarks/results/{report['commit']}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(json.dumps(report["phases"], ensure_ascii=False, indent=2))
+    if args.compare:
+        print("\n".join(compare(report, json.loads(Path(args.compare).read_text()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy_utils.functions import create_database, database_exists
+
+from benchmarks.catalog import seed, summarize
+from src.crud.crud import SearchCrud
+from src.db.database import DB_HOST, DB_NAME, DB_PORT, POSTGRES_PASSWORD, POSTGRES_USER
+from src.models.models import DEFAULT_TENANT
+
+QUERIES = ["борщ", "пампушк", "курица грибы", "салат с креветками", "блин икр", "шашлык"]
+
+
+def to_tsquery(q: str) -> str:
+    return " & ".join(f"{term}:*" for term in re.findall(r"\w+", q.lower()))
+
+
+async def measure(statement, params: dict, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await statement(**params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return summarize(timings)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    url = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DB_HOST}:{DB_PORT}/{args.database}"
+    if not database_exists(url):
+        create_database(url)
+    engine = create_async_engine(url.replace("postgresql://", "postgresql+asyncpg://"), future=True)
+    if not args.skip_seed:
+        await seed(engine, args.menus, args.submenus, args.dishes, tenant=args.tenant)
+    report: dict = {"dishes": args.menus * args.submenus * args.dishes, "queries": {}}
+    async with AsyncSession(engine) as session:
+        crud = SearchCrud(session=session, tenant=args.tenant)
+
+        async def ilike(pattern: str) -> int:
+            statement = text(
+                "SELECT (SELECT count(*) FROM dishes WHERE title ILIKE :pattern OR description ILIKE :pattern) "
+                "+ (SELECT count(*) FROM submenus WHERE title ILIKE :pattern OR description ILIKE :pattern) "
+                "+ (SELECT count(*) FROM menus WHERE title ILIKE :pattern OR description ILIKE :pattern)"
+            )
+            result = await session.execute(statement, {"pattern": pattern})
+            return result.scalar()
+
+        for q in QUERIES:
+            query = to_tsquery(q)
+            statement = SearchCrud.search_statement(query=query, limit=20, offset=0, tenant=args.tenant).compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True},
+            )
+            plan = await session.execute(text(f"EXPLAIN {statement}"))
+            report["queries"][q] = {
+                "index_used": any("ix_dishes_search" in row[0] for row in plan.all()),
+                "full_text": await measure(crud.search, {"query": query, "limit": 20, "offset": 0}, args.repeat),
+                "ilike_scan": await measure(ilike, {"pattern": f"%{q.split()[0]}%"}, args.repeat),
+            }
+    await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк полнотекстового поиска")
+    parser.add_argument("--database", default=f"{DB_NAME}_bench")
+    parser.add_argument("--menus", type=int, default=100)
+    parser.add_argument("--submenus", type=int, default=100)
+    parser.add_argument("--dishes", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--tenant", default=DEFAULT_TENANT)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+MODES = {
+    "create_all": {"INIT_DB_ON_STARTUP": "true"},
+    "alembic": {"INIT_DB_ON_STARTUP": "false"},
+}
+PROBE_PATH = "/api/v1/menus"
+POLL_INTERVAL = 0.01
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_time() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import src.main"], check=True, env=os.environ.copy())
+    return time.perf_counter() - started
+
+
+def time_to_first_request(env: dict, timeout: float) -> float:
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"worker exited with code {process.returncode}")
+                try:
+                    if client.get(PROBE_PATH).status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(POLL_INTERVAL)
+        raise TimeoutError(f"no response from worker in {timeout} s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время запуска воркера до первого ответа")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+    report = {"import_ms": round(statistics.median(import_time() for _ in range(args.runs)) * 1000, 1)}
+    for mode in args.modes:
+        timings = [time_to_first_request(MODES[mode], args.timeout) * 1000 for _ in range(args.runs)]
+        report[mode] = {
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "max_ms": round(max(timings), 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
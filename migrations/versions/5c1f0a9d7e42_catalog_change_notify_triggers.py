@@ -0,0 +1,77 @@
+"""Catalog change notify triggers
+
+Revision ID: 5c1f0a9d7e42
+Revises: 23b12808a95d
+Create Date: 2026-10-19 12:40:11.318204
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c1f0a9d7e42"
+down_revision = "23b12808a95d"
+branch_labels = None
+depends_on = None
+
+CATALOG_TABLES = ("menus", "submenus", "dishes")
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+DECLARE
+    old_data jsonb;
+    new_data jsonb;
+    rows jsonb[];
+    data jsonb;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        rows := ARRAY[to_jsonb(NEW)];
+    ELSIF TG_OP = 'DELETE' THEN
+        rows := ARRAY[to_jsonb(OLD)];
+    ELSE
+        old_data := to_jsonb(OLD);
+        new_data := to_jsonb(NEW);
+        rows := ARRAY[new_data];
+        IF (old_data -> 'menu_id', old_data -> 'submenu_id')
+            IS DISTINCT FROM (new_data -> 'menu_id', new_data -> 'submenu_id') THEN
+            rows := ARRAY[old_data, new_data];
+        END IF;
+    END IF;
+    FOREACH data IN ARRAY rows LOOP
+        IF TG_TABLE_NAME = 'dishes' THEN
+            data := data || jsonb_build_object(
+                'menu_id',
+                (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer)
+            );
+        END IF;
+        PERFORM pg_notify(
+            'catalog_changes',
+            jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'id', data -> 'id',
+                'menu_id', data -> 'menu_id',
+                'submenu_id', data -> 'submenu_id'
+            )::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_FUNCTION)
+    for table in CATALOG_TABLES:
+        op.execute(
+            f"""
+            CREATE OR REPLACE TRIGGER {table}_notify_catalog_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_catalog_change ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_catalog_change()")
@@ -0,0 +1,47 @@
+"""Full text search indexes
+
+Revision ID: 9a4e2b7c1d30
+Revises: 5c1f0a9d7e42
+Create Date: 2026-10-19 13:05:42.904117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "9a4e2b7c1d30"
+down_revision = "5c1f0a9d7e42"
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT = (
+    "to_tsvector('russian'::regconfig, (coalesce(title, '') || ' ') || coalesce(description, '')) "
+    "|| to_tsvector('simple'::regconfig, (coalesce(title, '') || ' ') || coalesce(description, ''))"
+)
+
+
+def upgrade() -> None:
+    for table in ("menus", "submenus", "dishes"):
+        op.add_column(
+            table,
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(SEARCH_DOCUMENT, persisted=True),
+                nullable=True,
+            ),
+        )
+        op.create_index(
+            f"ix_{table}_search",
+            table,
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    for table in ("menus", "submenus", "dishes"):
+        op.drop_index(f"ix_{table}_search", table_name=table)
+        op.drop_column(table, "search_vector")
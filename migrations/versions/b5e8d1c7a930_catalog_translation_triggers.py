@@ -0,0 +1,55 @@
+"""Catalog translation triggers
+
+Revision ID: b5e8d1c7a930
+Revises: f2a9c4e81b37
+Create Date: 2026-10-19 21:08:53.417602
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b5e8d1c7a930"
+down_revision = "f2a9c4e81b37"
+branch_labels = None
+depends_on = None
+
+TRANSLATION_TABLES = (
+    ("menu_translations", "menus", "menu_id"),
+    ("submenu_translations", "submenus", "submenu_id"),
+    ("dish_translations", "dishes", "dish_id"),
+)
+
+TRANSLATION_FUNCTION = """
+CREATE OR REPLACE FUNCTION touch_translated_item() RETURNS trigger AS $$
+DECLARE
+    data jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        data := to_jsonb(OLD);
+    ELSE
+        data := to_jsonb(NEW);
+    END IF;
+    EXECUTE format('UPDATE %I SET updated_at = now() WHERE id = $1', TG_ARGV[0])
+    USING (data ->> TG_ARGV[1])::integer;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute(TRANSLATION_FUNCTION)
+    for table, parent, column in TRANSLATION_TABLES:
+        op.execute(
+            f"""
+            CREATE OR REPLACE TRIGGER {table}_touch_translated_item
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_translated_item('{parent}', '{column}')
+            """
+        )
+
+
+def downgrade() -> None:
+    for table, _, _ in TRANSLATION_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_translated_item ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS touch_translated_item()")
@@ -0,0 +1,106 @@
+"""Catalog change versions and tombstones
+
+Revision ID: c3f8d2a6b914
+Revises: 9a4e2b7c1d30
+Create Date: 2026-10-19 14:20:37.512093
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3f8d2a6b914"
+down_revision = "9a4e2b7c1d30"
+branch_labels = None
+depends_on = None
+
+CHANGE_VERSION = sa.text("pg_current_xact_id()::text::bigint")
+CATALOG_TABLES = ("menus", "submenus", "dishes")
+
+VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION touch_catalog_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := pg_current_xact_id()::text::bigint;
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_tombstone() RETURNS trigger AS $$
+DECLARE
+    data jsonb := to_jsonb(OLD);
+BEGIN
+    INSERT INTO catalog_tombstones (table_name, row_id, menu_id, submenu_id)
+    VALUES (
+        TG_TABLE_NAME,
+        OLD.id,
+        coalesce(
+            (data ->> 'menu_id')::integer,
+            (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer),
+            (
+                SELECT menu_id FROM catalog_tombstones
+                WHERE table_name = 'submenus' AND row_id = (data ->> 'submenu_id')::integer
+                ORDER BY id DESC LIMIT 1
+            )
+        ),
+        (data ->> 'submenu_id')::integer
+    );
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.add_column(table, sa.Column("version", sa.BigInteger(), server_default=CHANGE_VERSION, nullable=False))
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index(op.f(f"ix_{table}_version"), table, ["version"], unique=False)
+    op.create_table(
+        "catalog_tombstones",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("menu_id", sa.Integer(), nullable=True),
+        sa.Column("submenu_id", sa.Integer(), nullable=True),
+        sa.Column("version", sa.BigInteger(), server_default=CHANGE_VERSION, nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_catalog_tombstones_version"), "catalog_tombstones", ["version"], unique=False)
+    op.execute(VERSION_FUNCTION)
+    op.execute(TOMBSTONE_FUNCTION)
+    for table in CATALOG_TABLES:
+        op.execute(
+            f"""
+            CREATE OR REPLACE TRIGGER {table}_touch_catalog_version
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_catalog_version()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE OR REPLACE TRIGGER {table}_record_catalog_tombstone
+            BEFORE DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_catalog_tombstone()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_catalog_version ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_record_catalog_tombstone ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS touch_catalog_version()")
+    op.execute("DROP FUNCTION IF EXISTS record_catalog_tombstone()")
+    op.drop_index(op.f("ix_catalog_tombstones_version"), table_name="catalog_tombstones")
+    op.drop_table("catalog_tombstones")
+    for table in CATALOG_TABLES:
+        op.drop_index(op.f(f"ix_{table}_version"), table_name=table)
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "version")
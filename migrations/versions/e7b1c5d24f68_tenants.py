@@ -0,0 +1,212 @@
+"""Tenants
+
+Revision ID: e7b1c5d24f68
+Revises: c3f8d2a6b914
+Create Date: 2026-10-19 16:05:42.218734
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7b1c5d24f68"
+down_revision = "c3f8d2a6b914"
+branch_labels = None
+depends_on = None
+
+DEFAULT_TENANT = "default"
+TENANT_TABLES = ("menus", "submenus", "dishes", "catalog_tombstones")
+TENANT_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+DECLARE
+    old_data jsonb;
+    new_data jsonb;
+    rows jsonb[];
+    data jsonb;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        rows := ARRAY[to_jsonb(NEW)];
+    ELSIF TG_OP = 'DELETE' THEN
+        rows := ARRAY[to_jsonb(OLD)];
+    ELSE
+        old_data := to_jsonb(OLD);
+        new_data := to_jsonb(NEW);
+        rows := ARRAY[new_data];
+        IF (old_data -> 'menu_id', old_data -> 'submenu_id')
+            IS DISTINCT FROM (new_data -> 'menu_id', new_data -> 'submenu_id') THEN
+            rows := ARRAY[old_data, new_data];
+        END IF;
+    END IF;
+    FOREACH data IN ARRAY rows LOOP
+        IF TG_TABLE_NAME = 'dishes' THEN
+            data := data || jsonb_build_object(
+                'menu_id',
+                (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer)
+            );
+        END IF;
+        PERFORM pg_notify(
+            'catalog_changes',
+            jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'tenant_id', data -> 'tenant_id',
+                'id', data -> 'id',
+                'menu_id', data -> 'menu_id',
+                'submenu_id', data -> 'submenu_id'
+            )::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+TENANT_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_tombstone() RETURNS trigger AS $$
+DECLARE
+    data jsonb := to_jsonb(OLD);
+BEGIN
+    INSERT INTO catalog_tombstones (tenant_id, table_name, row_id, menu_id, submenu_id)
+    VALUES (
+        OLD.tenant_id,
+        TG_TABLE_NAME,
+        OLD.id,
+        coalesce(
+            (data ->> 'menu_id')::integer,
+            (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer),
+            (
+                SELECT menu_id FROM catalog_tombstones
+                WHERE table_name = 'submenus' AND row_id = (data ->> 'submenu_id')::integer
+                ORDER BY id DESC LIMIT 1
+            )
+        ),
+        (data ->> 'submenu_id')::integer
+    );
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+UNTENANTED_NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+DECLARE
+    old_data jsonb;
+    new_data jsonb;
+    rows jsonb[];
+    data jsonb;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        rows := ARRAY[to_jsonb(NEW)];
+    ELSIF TG_OP = 'DELETE' THEN
+        rows := ARRAY[to_jsonb(OLD)];
+    ELSE
+        old_data := to_jsonb(OLD);
+        new_data := to_jsonb(NEW);
+        rows := ARRAY[new_data];
+        IF (old_data -> 'menu_id', old_data -> 'submenu_id')
+            IS DISTINCT FROM (new_data -> 'menu_id', new_data -> 'submenu_id') THEN
+            rows := ARRAY[old_data, new_data];
+        END IF;
+    END IF;
+    FOREACH data IN ARRAY rows LOOP
+        IF TG_TABLE_NAME = 'dishes' THEN
+            data := data || jsonb_build_object(
+                'menu_id',
+                (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer)
+            );
+        END IF;
+        PERFORM pg_notify(
+            'catalog_changes',
+            jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'id', data -> 'id',
+                'menu_id', data -> 'menu_id',
+                'submenu_id', data -> 'submenu_id'
+            )::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+UNTENANTED_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_tombstone() RETURNS trigger AS $$
+DECLARE
+    data jsonb := to_jsonb(OLD);
+BEGIN
+    INSERT INTO catalog_tombstones (table_name, row_id, menu_id, submenu_id)
+    VALUES (
+        TG_TABLE_NAME,
+        OLD.id,
+        coalesce(
+            (data ->> 'menu_id')::integer,
+            (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer),
+            (
+                SELECT menu_id FROM catalog_tombstones
+                WHERE table_name = 'submenus' AND row_id = (data ->> 'submenu_id')::integer
+                ORDER BY id DESC LIMIT 1
+            )
+        ),
+        (data ->> 'submenu_id')::integer
+    );
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenants",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("rate_limit", sa.Float(), nullable=True),
+        sa.Column("max_items", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(f"INSERT INTO tenants (id, title) VALUES ('{DEFAULT_TENANT}', '{DEFAULT_TENANT}')")
+    for table in TENANT_TABLES:
+        op.add_column(table, sa.Column("tenant_id", sa.String(), server_default=DEFAULT_TENANT, nullable=False))
+        op.create_index(op.f(f"ix_{table}_tenant_id"), table, ["tenant_id"], unique=False)
+    op.create_foreign_key(None, "menus", "tenants", ["tenant_id"], ["id"], ondelete="CASCADE")
+    op.create_unique_constraint("uq_menus_id_tenant", "menus", ["id", "tenant_id"])
+    op.create_unique_constraint("uq_submenus_id_tenant", "submenus", ["id", "tenant_id"])
+    op.drop_constraint("submenus_menu_id_fkey", "submenus", type_="foreignkey")
+    op.create_foreign_key(
+        "submenus_menu_tenant_fkey",
+        "submenus",
+        "menus",
+        ["menu_id", "tenant_id"],
+        ["id", "tenant_id"],
+        ondelete="CASCADE",
+    )
+    op.drop_constraint("dishes_submenu_id_fkey", "dishes", type_="foreignkey")
+    op.create_foreign_key(
+        "dishes_submenu_tenant_fkey",
+        "dishes",
+        "submenus",
+        ["submenu_id", "tenant_id"],
+        ["id", "tenant_id"],
+        ondelete="CASCADE",
+    )
+    op.execute(TENANT_NOTIFY_FUNCTION)
+    op.execute(TENANT_TOMBSTONE_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(UNTENANTED_NOTIFY_FUNCTION)
+    op.execute(UNTENANTED_TOMBSTONE_FUNCTION)
+    op.drop_constraint("dishes_submenu_tenant_fkey", "dishes", type_="foreignkey")
+    op.create_foreign_key("dishes_submenu_id_fkey", "dishes", "submenus", ["submenu_id"], ["id"], ondelete="CASCADE")
+    op.drop_constraint("submenus_menu_tenant_fkey", "submenus", type_="foreignkey")
+    op.create_foreign_key("submenus_menu_id_fkey", "submenus", "menus", ["menu_id"], ["id"], ondelete="CASCADE")
+    op.drop_constraint("uq_submenus_id_tenant", "submenus", type_="unique")
+    op.drop_constraint("uq_menus_id_tenant", "menus", type_="unique")
+    op.drop_constraint("menus_tenant_id_fkey", "menus", type_="foreignkey")
+    for table in TENANT_TABLES:
+        op.drop_index(op.f(f"ix_{table}_tenant_id"), table_name=table)
+        op.drop_column(table, "tenant_id")
+    op.drop_table("tenants")
@@ -0,0 +1,39 @@
+"""Catalog translations
+
+Revision ID: f2a9c4e81b37
+Revises: e7b1c5d24f68
+Create Date: 2026-10-19 17:42:18.604215
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f2a9c4e81b37"
+down_revision = "e7b1c5d24f68"
+branch_labels = None
+depends_on = None
+
+TRANSLATION_TABLES = (
+    ("menu_translations", "menu_id", "menus"),
+    ("submenu_translations", "submenu_id", "submenus"),
+    ("dish_translations", "dish_id", "dishes"),
+)
+
+
+def upgrade() -> None:
+    for table, column, parent in TRANSLATION_TABLES:
+        op.create_table(
+            table,
+            sa.Column(column, sa.Integer(), nullable=False),
+            sa.Column("locale", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.ForeignKeyConstraint([column], [f"{parent}.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint(column, "locale"),
+        )
+
+
+def downgrade() -> None:
+    for table, _, _ in reversed(TRANSLATION_TABLES):
+        op.drop_table(table)
@@ -0,0 +1,132 @@
+import os
+import shutil
+import time
+from collections.abc import Iterator
+
+EXPORT_STORAGE = os.getenv("EXPORT_STORAGE", "local")
+UPLOADS_DIR = os.getenv("UPLOADS_DIR", "/uploads")
+EXPORT_WORK_DIR = os.getenv("EXPORT_WORK_DIR", os.path.join(UPLOADS_DIR, "parts"))
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_BUCKET = os.getenv("S3_BUCKET", "exports")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
+S3_URL_EXPIRES = int(os.getenv("S3_URL_EXPIRES", 300))
+FAILED_SUFFIX = ".failed"
+
+
+class LocalStorage:
+    def __init__(self, root: str = UPLOADS_DIR) -> None:
+        self.root = root
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, os.path.basename(name))
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self.path(name))
+
+    def save(self, source: str, name: str) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        os.replace(source, self.path(name))
+
+    def touch(self, name: str) -> None:
+        os.utime(self.path(name))
+
+    def delete(self, name: str) -> None:
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def files(self) -> Iterator[tuple[str, float]]:
+        if not os.path.isdir(self.root):
+            return
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.name, entry.stat().st_mtime
+
+
+class S3Storage:
+    def __init__(
+        self,
+        bucket: str = S3_BUCKET,
+        endpoint_url: str | None = S3_ENDPOINT_URL,
+        access_key: str | None = S3_ACCESS_KEY,
+        secret_key: str | None = S3_SECRET_KEY,
+    ) -> None:
+        import boto3
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
+
+    def exists(self, name: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=name)
+        except ClientError:
+            return False
+        return True
+
+    def save(self, source: str, name: str) -> None:
+        self.client.upload_file(source, self.bucket, name)
+        os.remove(source)
+
+    def touch(self, name: str) -> None:
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=name,
+            CopySource={"Bucket": self.bucket, "Key": name},
+            MetadataDirective="REPLACE",
+        )
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+    def files(self) -> Iterator[tuple[str, float]]:
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket):
+            for item in page.get("Contents", []):
+                yield item["Key"], item["LastModified"].timestamp()
+
+    def url(self, name: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": name},
+            ExpiresIn=S3_URL_EXPIRES,
+        )
+
+
+def failed_name(name: str) -> str:
+    return f"{name}{FAILED_SUFFIX}"
+
+
+def get_storage() -> LocalStorage | S3Storage:
+    if EXPORT_STORAGE == "s3":
+        return S3Storage()
+    return LocalStorage()
+
+
+export_storage = get_storage()
+
+
+def cleanup(ttl: float) -> int:
+    deadline = time.time() - ttl
+    removed = 0
+    for name, modified in list(export_storage.files()):
+        if modified < deadline:
+            export_storage.delete(name)
+            removed += 1
+    if os.path.isdir(EXPORT_WORK_DIR):
+        for entry in os.scandir(EXPORT_WORK_DIR):
+            if entry.stat().st_mtime >= deadline:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+    return removed
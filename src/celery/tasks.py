@@ -1,9 +1,25 @@
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
 import os
+import re
+import shutil
+import zipfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+from uuid import uuid4
+from xml.sax.saxutils import escape
 
 import openpyxl
 from dotenv import load_dotenv
+from kombu import Exchange, Queue
 
 from celery import Celery
+from src.celery import storage
 
 load_dotenv()
 
@@ -13,40 +29,244 @@ RABBIT_PASSWORD = os.getenv("RABBIT_PASSWORD", "guest")
 RABBIT_PORT = os.getenv("RABBIT_PORT", 5672)
 
 RABBITMQ_URL = f"amqp://{RABBIT_USER}:{RABBIT_PASSWORD}@{RABBIT_HOST}:{RABBIT_PORT}"
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", RABBITMQ_URL)
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "rpc://")
+REDIS_BROKER = CELERY_BROKER_URL.startswith(("redis://", "rediss://"))
 
-app_celery = Celery("tasks", broker=RABBITMQ_URL, backend="rpc://")
+EXPORT_FORMATS = ("xlsx", "csv", "json", "csv.gz", "json.gz")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 5000))
+EXPORT_QUEUE = "exports"
+EXPORT_MAX_PRIORITY = 10
+COLUMN_WIDTHS = {"A": 10, "B": 20, "C": 20, "D": 20, "E": 50, "F": 15}
+SHEET_PATH = "xl/worksheets/sheet1.xml"
+ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
 
+app_celery = Celery("tasks", broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+app_celery.conf.update(
+    task_queues=[
+        Queue(
+            EXPORT_QUEUE,
+            Exchange(EXPORT_QUEUE),
+            routing_key=EXPORT_QUEUE,
+            queue_arguments={"x-max-priority": EXPORT_MAX_PRIORITY},
+        )
+    ],
+    task_default_queue=EXPORT_QUEUE,
+    task_default_exchange=EXPORT_QUEUE,
+    task_default_routing_key=EXPORT_QUEUE,
+    task_queue_max_priority=EXPORT_MAX_PRIORITY,
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+if REDIS_BROKER:
+    app_celery.conf.broker_transport_options = {
+        "priority_steps": list(range(EXPORT_MAX_PRIORITY + 1)),
+        "queue_order_strategy": "priority",
+    }
 
-@app_celery.task(name="create_excel", track_started=True)
-def create_excel(data):
-    id = app_celery.current_task.request.id
+
+def broker_priority(priority: int) -> int:
+    return EXPORT_MAX_PRIORITY - priority if REDIS_BROKER else priority
+
+
+def catalog_chunks(data: dict, chunk_rows: int | None = None) -> list[list[list]]:
+    chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+    submenus: dict[int, list] = {}
+    dishes: dict[int, list] = {}
+    for submenu in data["submenus"] or []:
+        submenus.setdefault(submenu["menu_id"], []).append(submenu)
+    for dish in data["dishes"] or []:
+        dishes.setdefault(dish["submenu_id"], []).append(dish)
+    chunks: list[list[list]] = [[]]
+    for menu in data["menus"] or []:
+        rows = [[menu["id"], menu["title"], menu["description"]]]
+        for submenu in submenus.get(menu["id"], []):
+            rows.append([None, submenu["id"], submenu["title"], submenu["description"]])
+            for dish in dishes.get(submenu["id"], []):
+                rows.append([None, None, dish["id"], dish["title"], dish["description"], dish["price"]])
+        if chunks[-1] and len(chunks[-1]) + len(rows) > chunk_rows:
+            chunks.append([])
+        chunks[-1].extend(rows)
+    return chunks
+
+
+def render_cell(reference: str, value) -> str:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        text = escape(ILLEGAL_XML_CHARS.sub("", str(value)))
+        return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    return f'<c r="{reference}"><v>{value}</v></c>'
+
+
+def render_rows(rows: list[list], start: int) -> str:
+    lines = []
+    for number, row in enumerate(rows, start=start):
+        cells = "".join(
+            render_cell(f"{chr(ord('A') + column)}{number}", value)
+            for column, value in enumerate(row)
+            if value is not None
+        )
+        lines.append(f'<row r="{number}">{cells}</row>')
+    return "".join(lines)
+
+
+def workbook_template() -> tuple[dict[str, bytes], str, str]:
     wb = openpyxl.Workbook()
-    list = wb.active
-    list.column_dimensions["A"].width = 10
-    list.column_dimensions["B"].width = 20
-    list.column_dimensions["C"].width = 20
-    list.column_dimensions["D"].width = 20
-    list.column_dimensions["E"].width = 50
-    list.column_dimensions["F"].width = 15
-    row = 1
-    for menu in data["menus"]:
-        list.cell(row=row, column=1, value=menu["id"])
-        list.cell(row=row, column=2, value=menu["title"])
-        list.cell(row=row, column=3, value=menu["description"])
-        for submenu in data["submenus"]:
-            if submenu["menu_id"] == menu["id"]:
-                row += 1
-                list.cell(row=row, column=2, value=submenu["id"])
-                list.cell(row=row, column=3, value=submenu["title"])
-                list.cell(row=row, column=4, value=submenu["description"])
-                for dish in data["dishes"]:
-                    if dish["submenu_id"] == submenu["id"]:
-                        row += 1
-                        list.cell(row=row, column=3, value=dish["id"])
-                        list.cell(row=row, column=4, value=dish["title"])
-                        list.cell(row=row, column=5, value=dish["description"])
-                        list.cell(row=row, column=6, value=dish["price"])
-        row += 1
-
-    wb.save(f"/uploads/{id}.xlsx")
+    sheet = wb.active
+    for column, width in COLUMN_WIDTHS.items():
+        sheet.column_dimensions[column].width = width
+    buffer = io.BytesIO()
+    wb.save(buffer)
     wb.close()
+    with zipfile.ZipFile(buffer) as archive:
+        files = {name: archive.read(name) for name in archive.namelist()}
+    head, tail = files.pop(SHEET_PATH).decode().split("<sheetData />")
+    return files, head, tail
+
+
+def write_workbook(path: str, fragments: list[str]) -> None:
+    files, head, tail = workbook_template()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+        with archive.open(SHEET_PATH, "w") as sheet:
+            sheet.write(f"{head}<sheetData>".encode())
+            for fragment in fragments:
+                sheet.write(fragment.encode())
+            sheet.write(f"</sheetData>{tail}".encode())
+
+
+def catalog_tree(data: dict) -> list[dict]:
+    menus = [dict(menu, submenus=[]) for menu in data["menus"] or []]
+    submenus = {}
+    by_menu = {menu["id"]: menu for menu in menus}
+    for submenu in data["submenus"] or []:
+        submenus[submenu["id"]] = dict(submenu, dishes=[])
+        by_menu[submenu["menu_id"]]["submenus"].append(submenus[submenu["id"]])
+    for dish in data["dishes"] or []:
+        submenus[dish["submenu_id"]]["dishes"].append(dish)
+    return menus
+
+
+def write_text(path: str, compress: bool, write: Callable) -> None:
+    opener: Callable[..., Any] = open
+    if compress:
+        opener = gzip.open
+    with opener(path, "wt", encoding="utf-8", newline="") as file:
+        write(file)
+
+
+def write_export(path: str, export_format: str, data: dict) -> None:
+    compress = export_format.endswith(".gz")
+    if export_format.startswith("csv"):
+        rows = itertools.chain.from_iterable(catalog_chunks(data))
+        write_text(path, compress, lambda file: csv.writer(file).writerows(rows))
+    elif export_format.startswith("json"):
+        write_text(path, compress, lambda file: json.dump(catalog_tree(data), file, ensure_ascii=False))
+    else:
+        chunks = catalog_chunks(data)
+        write_workbook(path, list(map(render_rows, chunks, chunk_starts(chunks))))
+
+
+def export_name(data: dict, export_format: str = "xlsx") -> str:
+    content = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(f"{export_format}:{content}".encode()).hexdigest()[:32]
+    return f"{digest}.{export_format}"
+
+
+def export_format(name: str) -> str:
+    return name.split(".", 1)[1] if "." in name else "xlsx"
+
+
+def store(name: str, write: Callable[[str], None]) -> None:
+    os.makedirs(storage.EXPORT_WORK_DIR, exist_ok=True)
+    temporary = os.path.join(storage.EXPORT_WORK_DIR, f"{uuid4().hex}.tmp")
+    try:
+        write(temporary)
+        storage.export_storage.save(temporary, name)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def chunk_starts(chunks: list[list[list]]) -> list[int]:
+    starts = [1]
+    for rows in chunks[:-1]:
+        starts.append(starts[-1] + len(rows))
+    return starts
+
+
+def parts_dir(export_id: str) -> str:
+    return os.path.join(storage.EXPORT_WORK_DIR, export_id)
+
+
+def export_finished(export_id: str) -> bool:
+    return storage.export_storage.exists(export_id) or storage.export_storage.exists(storage.failed_name(export_id))
+
+
+def fail_export(export_id: str) -> None:
+    store(storage.failed_name(export_id), lambda path: open(path, "w").close())
+    shutil.rmtree(parts_dir(export_id), ignore_errors=True)
+
+
+@contextmanager
+def export_failure(export_id: str) -> Iterator[None]:
+    try:
+        yield
+    except Exception:
+        fail_export(export_id)
+        raise
+
+
+def save_part(export_id: str, index: int, total: int, fragment: str) -> bool:
+    if export_finished(export_id):
+        return False
+    directory = parts_dir(export_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{index:05d}.xml")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        file.write(fragment)
+    os.replace(f"{path}.tmp", path)
+    if sum(name.endswith(".xml") for name in os.listdir(directory)) < total:
+        return False
+    try:
+        os.close(os.open(os.path.join(directory, "merge.lock"), os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        return False
+    return True
+
+
+def merge_parts(export_id: str, total: int) -> None:
+    directory = parts_dir(export_id)
+    fragments = []
+    for index in range(total):
+        with open(os.path.join(directory, f"{index:05d}.xml"), encoding="utf-8") as file:
+            fragments.append(file.read())
+    store(export_id, lambda path: write_workbook(path, fragments))
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def export_catalog(name: str, data: dict) -> None:
+    store(name, lambda path: write_export(path, export_format(name), data))
+
+
+@app_celery.task(name="create_excel", track_started=True)
+def create_excel(data, name=None):
+    id = name or f"{app_celery.current_task.request.id}.xlsx"
+    with export_failure(id):
+        chunks = catalog_chunks(data)
+        if len(chunks) == 1 or export_format(id) != "xlsx":
+            export_catalog(id, data)
+            return
+        priority = (app_celery.current_task.request.delivery_info or {}).get("priority")
+        for index, (rows, start) in enumerate(zip(chunks, chunk_starts(chunks))):
+            create_excel_chunk.apply_async(
+                kwargs={"export_id": id, "index": index, "total": len(chunks), "rows": rows, "start": start},
+                priority=priority,
+            )
+
+
+@app_celery.task(name="create_excel_chunk")
+def create_excel_chunk(export_id, index, total, rows, start):
+    with export_failure(export_id):
+        if save_part(export_id, index, total, render_rows(rows, start)):
+            merge_parts(export_id, total)
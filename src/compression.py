@@ -0,0 +1,136 @@
+import gzip
+import logging
+from contextvars import ContextVar
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db.redis_config import get_connection_pool
+from src.metrics import InstrumentedRedis
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+STORE_ENCODED_SCRIPT = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local ttl = redis.call("PTTL", KEYS[1])
+if ttl > 0 then
+    redis.call("SET", KEYS[2], ARGV[2], "PX", ttl)
+else
+    redis.call("SET", KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    weight, _, encoding = max(
+        (weights.get(encoding, weights.get("*", 0.0)), -index, encoding) for index, encoding in enumerate(ENCODINGS)
+    )
+    return encoding if weight > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def encoded_key(key: str, encoding: str) -> str:
+    return f"{key}#{encoding}"
+
+
+class ResponseEncoding:
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        self.key: str | None = None
+        self.data: bytes | None = None
+
+
+response_encoding: ContextVar[ResponseEncoding | None] = ContextVar("response_encoding", default=None)
+
+
+def precompressed_response(body: bytes, encoding: str) -> Response:
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", "")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.respond(scope, receive, send, encoding)
+
+    async def respond(self, scope: Scope, receive: Receive, send: Send, encoding: str) -> None:
+        state = ResponseEncoding(encoding) if scope["method"] == "GET" else None
+        token = response_encoding.set(state)
+        start: Message | None = None
+        stored: bytes | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, stored
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            response_start, start = start, None
+            headers = MutableHeaders(raw=response_start["headers"])
+            body = message.get("body", b"")
+            compressible = headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            skip = message.get("more_body") or "content-encoding" in headers or len(body) < self.minimum_size
+            if skip or not compressible:
+                await send(response_start)
+                await send(message)
+                return
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+            if response_start["status"] == 200:
+                stored = body
+
+        try:
+            await self.app(scope, receive, send_compressed)
+        finally:
+            response_encoding.reset(token)
+        if state is not None and state.key is not None and state.data is not None and stored is not None:
+            await self.store(state.key, state.data, encoding, stored)
+
+    async def store(self, key: str, data: bytes, encoding: str, body: bytes) -> None:
+        redis = InstrumentedRedis(connection_pool=get_connection_pool())
+        try:
+            await redis.eval(STORE_ENCODED_SCRIPT, 2, key, encoded_key(key, encoding), data, body)
+        except Exception:
+            logger.exception("Storing compressed response %s failed", key)
+        finally:
+            await redis.close()
@@ -1,6 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.models import DEFAULT_TENANT
+
 
 class BaseCrud:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, tenant: str = DEFAULT_TENANT, locale: str | None = None) -> None:
         self.session = session
+        self.tenant = tenant
+        self.locale = locale
@@ -1,27 +1,177 @@
+import itertools
 import json
+from collections.abc import Callable
 from typing import Any
 
 from fastapi.encoders import jsonable_encoder
 
+from src.compression import (
+    ENCODINGS,
+    encoded_key,
+    precompressed_response,
+    response_encoding,
+)
+from src.metrics import record_cache_lookup
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_VERSION_CHANNEL = "catalog:version"
+CATALOG_CHANGES_STREAM = "catalog:changes"
+VARIANT_SEPARATOR = "?"
+TENANT_PREFIX = "tenant:"
+CACHED_TENANTS_KEY = "cache:tenants"
+CATALOG_FAMILIES = ("menu:", "submenu:", "dish:")
+
+
+def tenant_key(tenant: str, key: str) -> str:
+    return f"{TENANT_PREFIX}{tenant}:{key}"
+
+
+def variant_key(key: str, name: str, value: str) -> str:
+    return f"{key}{'&' if VARIANT_SEPARATOR in key else VARIANT_SEPARATOR}{name}={value}"
+
+
+def projection_key(key: str, fields: tuple[str, ...] | None) -> str:
+    if fields is None:
+        return key
+    return variant_key(key, "fields", ",".join(fields))
+
+
+def catalog_keys(
+    menu_id: int,
+    submenu_id: int | None = None,
+    dish_id: int | None = None,
+    cascade: bool = False,
+) -> tuple[list[str], list[str]]:
+    keys = ["menu:list", f"menu:{menu_id}"]
+    prefixes = []
+    if submenu_id is None:
+        if cascade:
+            prefixes += [f"submenu:{menu_id}:", f"dish:{menu_id}:"]
+        return keys, prefixes
+    keys += [f"submenu:{menu_id}:list", f"submenu:{menu_id}:{submenu_id}"]
+    if dish_id is None:
+        if cascade:
+            prefixes.append(f"dish:{menu_id}:{submenu_id}:")
+        return keys, prefixes
+    keys += [f"dish:{menu_id}:{submenu_id}:list", f"dish:{menu_id}:{submenu_id}:{dish_id}"]
+    return keys, prefixes
+
 
 class RedisCache:
-    def __init__(self, cache: Any) -> None:
+    def __init__(
+        self, cache: Any, tenant: str = DEFAULT_TENANT, locale: str | None = None, expire: int | None = None
+    ) -> None:
         self.cache = cache
+        self.tenant = tenant
+        self.locale = locale
+        self.expire = expire
+        self.index = f"{TENANT_PREFIX}{tenant}"
+
+    def key(self, key: str) -> str:
+        return tenant_key(self.tenant, key)
+
+    def entry(self, key: str) -> str:
+        if self.locale is None:
+            return self.key(key)
+        return variant_key(self.key(key), "lang", self.locale)
 
     async def get(self, key: str) -> Any | None:
-        data = await self.cache.get(key)
+        data = await self.cache.get(self.entry(key))
+        record_cache_lookup(key, bool(data))
+        if not data:
+            return None
+        return json.loads(data)
+
+    async def get_response(self, key: str, servable: Callable[[Any], bool] | None = None) -> Any | None:
+        state = response_encoding.get()
+        if state is None:
+            return await self.get(key)
+        full_key = self.entry(key)
+        data, body = await self.cache.mget(full_key, encoded_key(full_key, state.encoding))
+        record_cache_lookup(key, bool(data))
+        if data and body and (servable is None or servable(json.loads(data))):
+            return precompressed_response(body, state.encoding)
+        if state.key is None:
+            state.key = full_key
+            state.data = data
         if not data:
             return None
         return json.loads(data)
 
-    async def set(self, key: str, value: Any) -> None:
+    def discard_response(self) -> None:
+        state = response_encoding.get()
+        if state is not None:
+            state.data = None
+
+    async def set(self, key: str, value: Any, expire: int | None = None) -> None:
         data = json.dumps(jsonable_encoder(value))
-        await self.cache.set(key, data)
+        indexed = key.startswith(CATALOG_FAMILIES)
+        key = self.entry(key)
+        state = response_encoding.get()
+        if state is not None and state.key == key:
+            state.data = data.encode()
+        base, separator, _ = key.partition(VARIANT_SEPARATOR)
+        async with self.cache.pipeline(transaction=False) as pipe:
+            pipe.set(key, data, ex=expire or self.expire)
+            pipe.delete(*(encoded_key(key, encoding) for encoding in ENCODINGS))
+            if separator:
+                pipe.sadd(f"{base}{separator}", key)
+            if indexed:
+                pipe.sadd(self.index, key)
+            pipe.sadd(CACHED_TENANTS_KEY, self.tenant)
+            await pipe.execute()
 
     async def delete_one(self, keys: list[str] | str) -> None:
-        await self.cache.delete(*keys)
+        keys = [keys] if isinstance(keys, str) else keys
+        await self.delete_keys([self.key(key) for key in keys])
+
+    async def delete_keys(self, keys: list[str]) -> None:
+        registries = [f"{key}{VARIANT_SEPARATOR}" for key in keys]
+        async with self.cache.pipeline(transaction=False) as pipe:
+            for registry in registries:
+                pipe.smembers(registry)
+            variants = await pipe.execute()
+        entries = keys + [member.decode() for member in itertools.chain.from_iterable(variants)]
+        encoded = [encoded_key(entry, encoding) for entry in entries for encoding in ENCODINGS]
+        async with self.cache.pipeline(transaction=False) as pipe:
+            pipe.delete(*entries, *registries, *encoded)
+            pipe.srem(self.index, *entries)
+            await pipe.execute()
 
     async def delete_all(self, key: str) -> None:
-        keys = await self.cache.keys(f"{key}*")
+        prefix = self.key(key)
+        keys = [member.decode() for member in await self.cache.smembers(self.index)]
+        keys = [member for member in keys if member.startswith(prefix)]
         if keys:
-            await self.cache.delete(*keys)
+            await self.delete_keys(keys)
+
+    async def invalidate(
+        self,
+        menu_id: int,
+        submenu_id: int | None = None,
+        dish_id: int | None = None,
+        cascade: bool = False,
+    ) -> None:
+        keys, prefixes = catalog_keys(menu_id, submenu_id, dish_id, cascade)
+        await self.delete_one(keys)
+        for prefix in prefixes:
+            await self.delete_all(prefix)
+
+    async def bump_version(self, change: dict | None = None) -> int:
+        version = await self.cache.incr(CATALOG_VERSION_KEY)
+        async with self.cache.pipeline(transaction=False) as pipe:
+            pipe.publish(CATALOG_VERSION_CHANNEL, version)
+            if change is not None:
+                pipe.xadd(
+                    CATALOG_CHANGES_STREAM,
+                    {
+                        "tenant": self.tenant,
+                        "data": json.dumps(jsonable_encoder({**change, "version": version}), ensure_ascii=False),
+                    },
+                    maxlen=settings.CHANGES_STREAM_LENGTH,
+                    approximate=True,
+                )
+            await pipe.execute()
+        return version
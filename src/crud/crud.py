@@ -1,33 +1,121 @@
-from sqlalchemy import delete, func, select, text, update
+from typing import Any
+
+from sqlalchemy import (
+    Integer,
+    and_,
+    cast,
+    delete,
+    distinct,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    text,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Select
 
 from src.crud.base import BaseCrud
-from src.models.models import Dish, Menu, SubMenu
+from src.models.models import (
+    DEFAULT_TENANT,
+    SEARCH_CONFIGS,
+    CatalogTombstone,
+    Dish,
+    DishTranslation,
+    Menu,
+    MenuTranslation,
+    SubMenu,
+    SubMenuTranslation,
+    Tenant,
+)
 from src.schemas import schemas
 
+TRANSLATED_FIELDS = ("title", "description")
+TRANSLATIONS: dict[Any, tuple[Any, Any]] = {
+    Menu: (MenuTranslation, MenuTranslation.menu_id),
+    SubMenu: (SubMenuTranslation, SubMenuTranslation.submenu_id),
+    Dish: (DishTranslation, DishTranslation.dish_id),
+}
+
+
+def selected_columns(model: Any, names: tuple[str, ...], fields: tuple[str, ...] | None) -> list:
+    return [getattr(model, name) for name in names if fields is None or name == "id" or name in fields]
+
+
+def translated(fields: tuple[str, ...] | None, locale: str | None) -> bool:
+    return locale is not None and (fields is None or any(name in fields for name in TRANSLATED_FIELDS))
+
+
+def localized_columns(model: Any, names: tuple[str, ...], fields: tuple[str, ...] | None, locale: str | None) -> list:
+    columns = selected_columns(model, names, fields)
+    if not translated(fields, locale):
+        return columns
+    translation = TRANSLATIONS[model][0]
+    return [
+        func.coalesce(getattr(translation, column.key), column).label(column.key)
+        if column.key in TRANSLATED_FIELDS
+        else column
+        for column in columns
+    ]
+
+
+def localize(statement: Select, model: Any, fields: tuple[str, ...] | None, locale: str | None) -> Select:
+    if not translated(fields, locale):
+        return statement
+    translation, item_id = TRANSLATIONS[model]
+    return statement.outerjoin(translation, and_(item_id == model.id, translation.locale == locale))
+
+
+def translation_upsert(model: Any, id: int, locale: str, data: dict) -> Any:
+    translation, item_id = TRANSLATIONS[model]
+    statement = insert(translation).values({item_id.key: id, "locale": locale, **data})
+    return statement.on_conflict_do_update(index_elements=[item_id.key, "locale"], set_=data).returning(
+        translation.locale, translation.title, translation.description
+    )
+
 
 class MenuCrud(BaseCrud):
-    async def get_menu_list(self) -> list[schemas.Menu]:
+    def count_columns(self, fields: tuple[str, ...] | None) -> list:
+        columns = []
+        if fields is None or "submenus_count" in fields:
+            submenus = select(func.count(SubMenu.id)).where(
+                SubMenu.menu_id == Menu.id, SubMenu.tenant_id == self.tenant
+            )
+            columns.append(submenus.scalar_subquery().label("submenus_count"))
+        if fields is None or "dishes_count" in fields:
+            dishes = (
+                select(func.count(Dish.id))
+                .join(SubMenu)
+                .where(SubMenu.menu_id == Menu.id, SubMenu.tenant_id == self.tenant)
+            )
+            columns.append(dishes.scalar_subquery().label("dishes_count"))
+        return columns
+
+    async def get_menu_list(self, fields: tuple[str, ...] | None = None) -> list[schemas.Menu]:
         statement = select(
-            Menu.id,
-            Menu.title,
-            Menu.description,
-        )
+            *localized_columns(Menu, ("id", "title", "description"), fields, self.locale),
+            *self.count_columns(fields),
+        ).where(Menu.tenant_id == self.tenant)
+        statement = localize(statement, Menu, fields, self.locale)
         result = await self.session.execute(statement)
         menu_list: list[schemas.Menu] = result.all()
         return menu_list
 
-    async def get_menu(self, id: int) -> schemas.Menu:
-        statement = select(
-            Menu.id,
-            Menu.title,
-            Menu.description,
-        ).where(Menu.id == id)
+    async def get_menu(self, id: int, fields: tuple[str, ...] | None = None) -> schemas.Menu:
+        statement = select(*localized_columns(Menu, ("id", "title", "description"), fields, self.locale)).where(
+            Menu.id == id,
+            Menu.tenant_id == self.tenant,
+        )
+        statement = localize(statement, Menu, fields, self.locale)
         result = await self.session.execute(statement)
         menu = result.one_or_none()
         return menu
 
     async def create_menu(self, data: dict) -> schemas.Menu:
-        menu = Menu(**data)
+        menu = Menu(**data, tenant_id=self.tenant)
         self.session.add(menu)
         await self.session.commit()
         await self.session.refresh(menu)
@@ -36,24 +124,30 @@ class MenuCrud(BaseCrud):
     async def update_menu(self, id: int, title: str, description: str) -> schemas.Menu:
         statement = (
             update(Menu)
-            .where(Menu.id == id)
+            .where(Menu.id == id, Menu.tenant_id == self.tenant)
             .values(
                 title=title,
                 description=description,
             )
         )
-        return await self.session.execute(statement)
+        result = await self.session.execute(statement)
+        await self.session.commit()
+        return result
 
-    async def delete_menu(self, id: int) -> None:
-        statement = delete(Menu).where(Menu.id == id)
+    async def delete_menu(self, id: int) -> list[int]:
+        dishes = select(Dish.id).join(SubMenu).where(SubMenu.menu_id == id, SubMenu.tenant_id == self.tenant)
+        dish_ids = (await self.session.execute(dishes)).scalars().all()
+        statement = delete(Menu).where(Menu.id == id, Menu.tenant_id == self.tenant)
         await self.session.execute(statement)
         await self.session.commit()
+        return dish_ids
 
     async def get_submenus_count(self, id: int) -> int:
         statement = select(
             func.count(SubMenu.id).label("count"),
         ).where(
             SubMenu.menu_id == id,
+            SubMenu.tenant_id == self.tenant,
         )
         result = await self.session.execute(statement)
         return result.scalar()
@@ -64,7 +158,7 @@ class MenuCrud(BaseCrud):
                 func.count(Dish.id).label("dishes_count"),
             )
             .join(SubMenu)
-            .where(SubMenu.menu_id == id)
+            .where(SubMenu.menu_id == id, SubMenu.tenant_id == self.tenant)
         )
         result = await self.session.execute(statement)
         return result.scalar()
@@ -72,35 +166,68 @@ class MenuCrud(BaseCrud):
     async def get_all_data_from_menus_submenus_dishes(self) -> dict:
         sql_query = text(
             """SELECT json_build_object('menus',
-            (SELECT json_agg(row_to_json("menus")) from "menus"),
-            'submenus', (SELECT json_agg(row_to_json("submenus"))
-            from "submenus"),'dishes', (SELECT json_agg(row_to_json("dishes"))
-             from "dishes"))"""
+            (SELECT json_agg(to_jsonb("menus") - '{search_vector,version,updated_at,tenant_id}'::text[])
+            from "menus" WHERE tenant_id = :tenant),
+            'submenus', (SELECT json_agg(to_jsonb("submenus") - '{search_vector,version,updated_at,tenant_id}'::text[])
+            from "submenus" WHERE tenant_id = :tenant),'dishes', (SELECT json_agg(to_jsonb("dishes")
+            - '{search_vector,version,updated_at,tenant_id}'::text[]) from "dishes" WHERE tenant_id = :tenant))"""
         )
-        result = await self.session.execute(sql_query)
+        result = await self.session.execute(sql_query, {"tenant": self.tenant})
         return result.scalar()
 
+    async def set_translation(self, id: int, locale: str, data: dict) -> schemas.Translation:
+        result = await self.session.execute(translation_upsert(Menu, id, locale, data))
+        await self.session.commit()
+        return result.one()
+
+
+def existing_children(rows: list) -> list | None:
+    if not rows:
+        return None
+    return [row for row in rows if row.id is not None]
+
 
 class SubmenuCrud(BaseCrud):
-    async def get_submenu(self, id: int) -> schemas.SubMenu:
-        statement = select(
-            SubMenu.id,
-            SubMenu.title,
-            SubMenu.description,
-        ).where(SubMenu.id == id)
+    async def get_submenu(
+        self,
+        id: int,
+        menu_id: int | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> schemas.SubMenu:
+        statement = select(*localized_columns(SubMenu, ("id", "title", "description"), fields, self.locale)).where(
+            SubMenu.id == id,
+            SubMenu.tenant_id == self.tenant,
+        )
+        if menu_id is not None:
+            statement = statement.where(SubMenu.menu_id == menu_id)
+        statement = localize(statement, SubMenu, fields, self.locale)
         result = await self.session.execute(statement)
         return result.one_or_none()
 
-    async def get_submenu_list(self, menu_id: int) -> list[schemas.SubMenu]:
-        statement = select(SubMenu.id, SubMenu.title, SubMenu.description).where(
-            SubMenu.menu_id == menu_id,
+    async def get_submenu_list(
+        self, menu_id: int, fields: tuple[str, ...] | None = None
+    ) -> list[schemas.SubMenu] | None:
+        columns = localized_columns(SubMenu, ("id", "title", "description"), fields, self.locale)
+        if fields is None or "dishes_count" in fields:
+            dishes = select(func.count(Dish.id)).where(Dish.submenu_id == SubMenu.id, Dish.tenant_id == self.tenant)
+            columns.append(dishes.scalar_subquery().label("dishes_count"))
+        statement = (
+            select(*columns)
+            .select_from(Menu)
+            .outerjoin(SubMenu, SubMenu.menu_id == Menu.id)
+            .where(Menu.id == menu_id, Menu.tenant_id == self.tenant)
         )
+        statement = localize(statement, SubMenu, fields, self.locale)
+        result = await self.session.execute(statement)
+        return existing_children(result.all())
+
+    async def menu_exists(self, menu_id: int) -> bool:
+        statement = select(Menu.id).where(Menu.id == menu_id, Menu.tenant_id == self.tenant)
         result = await self.session.execute(statement)
-        submenu_list: list[schemas.SubMenu] = result.all()
-        return submenu_list
+        return result.scalar() is not None
 
     async def create_submenu(self, data: dict, id: int) -> schemas.SubMenu:
-        submenu = SubMenu(**data, menu_id=id)
+        submenu = SubMenu(**data, menu_id=id, tenant_id=self.tenant)
         self.session.add(submenu)
         await self.session.commit()
         await self.session.refresh(submenu)
@@ -114,48 +241,88 @@ class SubmenuCrud(BaseCrud):
     ) -> schemas.SubMenu:
         statement = (
             update(SubMenu)
-            .where(SubMenu.id == id)
+            .where(SubMenu.id == id, SubMenu.tenant_id == self.tenant)
             .values(
                 title=title,
                 description=description,
             )
         )
-        return await self.session.execute(statement)
+        result = await self.session.execute(statement)
+        await self.session.commit()
+        return result
 
-    async def delete_submenu(self, id: int) -> None:
-        statement = delete(SubMenu).where(SubMenu.id == id)
+    async def delete_submenu(self, id: int) -> list[int]:
+        dishes = select(Dish.id).where(Dish.submenu_id == id, Dish.tenant_id == self.tenant)
+        dish_ids = (await self.session.execute(dishes)).scalars().all()
+        statement = delete(SubMenu).where(SubMenu.id == id, SubMenu.tenant_id == self.tenant)
         await self.session.execute(statement)
         await self.session.commit()
+        return dish_ids
 
     async def get_dishes_count(self, id: int) -> int:
         statement = select(
             func.count(Dish.id).label("dishes_count"),
-        ).where(Dish.submenu_id == id)
+        ).where(Dish.submenu_id == id, Dish.tenant_id == self.tenant)
         result = await self.session.execute(statement)
         return result.scalar()
 
+    async def set_translation(self, id: int, locale: str, data: dict) -> schemas.Translation:
+        result = await self.session.execute(translation_upsert(SubMenu, id, locale, data))
+        await self.session.commit()
+        return result.one()
+
 
 class DishCrud(BaseCrud):
-    async def get_dish(self, id: int) -> schemas.Dish:
+    async def get_dish(
+        self,
+        id: int,
+        menu_id: int | None = None,
+        submenu_id: int | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> schemas.Dish:
         statement = select(
-            Dish.id,
-            Dish.title,
-            Dish.description,
-            Dish.price,
-        ).where(Dish.id == id)
+            *localized_columns(Dish, ("id", "title", "description", "price"), fields, self.locale)
+        ).where(
+            Dish.id == id,
+            Dish.tenant_id == self.tenant,
+        )
+        if submenu_id is not None:
+            statement = statement.where(Dish.submenu_id == submenu_id)
+        if menu_id is not None:
+            statement = statement.join(SubMenu, SubMenu.id == Dish.submenu_id).where(SubMenu.menu_id == menu_id)
+        statement = localize(statement, Dish, fields, self.locale)
         result = await self.session.execute(statement)
         return result.one_or_none()
 
-    async def get_list_dish(self, id_submenu: int) -> list[schemas.Dish]:
-        statement = select(Dish.id, Dish.title, Dish.description, Dish.price).where(
-            Dish.submenu_id == id_submenu,
+    async def get_list_dish(
+        self,
+        id_submenu: int,
+        menu_id: int | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> list[schemas.Dish] | None:
+        statement = (
+            select(*localized_columns(Dish, ("id", "title", "description", "price"), fields, self.locale))
+            .select_from(SubMenu)
+            .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+            .where(SubMenu.id == id_submenu, SubMenu.tenant_id == self.tenant)
+        )
+        if menu_id is not None:
+            statement = statement.where(SubMenu.menu_id == menu_id)
+        statement = localize(statement, Dish, fields, self.locale)
+        result = await self.session.execute(statement)
+        return existing_children(result.all())
+
+    async def submenu_exists(self, submenu_id: int, menu_id: int) -> bool:
+        statement = select(SubMenu.id).where(
+            SubMenu.id == submenu_id,
+            SubMenu.menu_id == menu_id,
+            SubMenu.tenant_id == self.tenant,
         )
         result = await self.session.execute(statement)
-        dish_list: list[schemas.Dish] = result.all()
-        return dish_list
+        return result.scalar() is not None
 
     async def create_dish(self, data: dict, id: int) -> schemas.Dish:
-        dish = Dish(**data, submenu_id=id)
+        dish = Dish(**data, submenu_id=id, tenant_id=self.tenant)
         self.session.add(dish)
         await self.session.commit()
         await self.session.refresh(dish)
@@ -170,45 +337,226 @@ class DishCrud(BaseCrud):
     ) -> schemas.Dish:
         statement = (
             update(Dish)
-            .where(Dish.id == id)
+            .where(Dish.id == id, Dish.tenant_id == self.tenant)
             .values(
                 title=title,
                 description=description,
                 price=price,
             )
         )
-        return await self.session.execute(statement)
+        result = await self.session.execute(statement)
+        await self.session.commit()
+        return result
 
     async def delete_dish(self, id: int) -> None:
-        statement = delete(Dish).where(Dish.id == id)
+        statement = delete(Dish).where(Dish.id == id, Dish.tenant_id == self.tenant)
         await self.session.execute(statement)
         await self.session.commit()
 
+    async def set_translation(self, id: int, locale: str, data: dict) -> schemas.Translation:
+        result = await self.session.execute(translation_upsert(Dish, id, locale, data))
+        await self.session.commit()
+        return result.one()
+
+
+class CatalogCrud(BaseCrud):
+    async def get_menus_with_counts(self) -> list:
+        statement = (
+            select(
+                Menu.id,
+                Menu.title,
+                Menu.description,
+                func.count(distinct(SubMenu.id)).label("submenus_count"),
+                func.count(Dish.id).label("dishes_count"),
+            )
+            .outerjoin(SubMenu, SubMenu.menu_id == Menu.id)
+            .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+            .where(Menu.tenant_id == self.tenant)
+            .group_by(Menu.id)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def get_submenus_with_counts(self) -> list:
+        statement = (
+            select(
+                SubMenu.id,
+                SubMenu.title,
+                SubMenu.description,
+                SubMenu.menu_id,
+                func.count(Dish.id).label("dishes_count"),
+            )
+            .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+            .where(SubMenu.tenant_id == self.tenant)
+            .group_by(SubMenu.id)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def get_dishes(self) -> list:
+        statement = (
+            select(
+                Dish.id,
+                Dish.title,
+                Dish.description,
+                Dish.price,
+                Dish.submenu_id,
+                SubMenu.menu_id,
+            )
+            .join(SubMenu, Dish.submenu_id == SubMenu.id)
+            .where(Dish.tenant_id == self.tenant)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+
+class SyncCrud(BaseCrud):
+    async def get_watermark(self) -> int:
+        result = await self.session.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint - 1"))
+        return result.scalar()
+
+    async def get_menus_since(self, since: int, until: int) -> list:
+        statement = (
+            select(Menu.id, Menu.title, Menu.description, Menu.version)
+            .where(Menu.tenant_id == self.tenant, Menu.version > since, Menu.version <= until)
+            .order_by(Menu.version)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def get_submenus_since(self, since: int, until: int) -> list:
+        statement = (
+            select(SubMenu.id, SubMenu.menu_id, SubMenu.title, SubMenu.description, SubMenu.version)
+            .where(SubMenu.tenant_id == self.tenant, SubMenu.version > since, SubMenu.version <= until)
+            .order_by(SubMenu.version)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def get_dishes_since(self, since: int, until: int) -> list:
+        statement = (
+            select(Dish.id, Dish.submenu_id, Dish.title, Dish.description, Dish.price, Dish.version)
+            .where(Dish.tenant_id == self.tenant, Dish.version > since, Dish.version <= until)
+            .order_by(Dish.version)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def get_tombstones_since(self, since: int, until: int) -> list:
+        statement = (
+            select(
+                CatalogTombstone.table_name,
+                CatalogTombstone.row_id,
+                CatalogTombstone.menu_id,
+                CatalogTombstone.submenu_id,
+                CatalogTombstone.version,
+            )
+            .where(
+                CatalogTombstone.tenant_id == self.tenant,
+                CatalogTombstone.version > since,
+                CatalogTombstone.version <= until,
+            )
+            .order_by(CatalogTombstone.version)
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+
+class SearchCrud(BaseCrud):
+    async def search(self, query: str, limit: int, offset: int) -> list:
+        statement = self.search_statement(query=query, limit=limit, offset=offset, tenant=self.tenant)
+        result = await self.session.execute(statement)
+        return result.all()
+
+    @staticmethod
+    def search_statement(query: str, limit: int, offset: int, tenant: str = DEFAULT_TENANT) -> Select:
+        queries = [func.to_tsquery(literal_column(f"'{config}'::regconfig"), query) for config in SEARCH_CONFIGS]
+        ts_query = queries[0].op("||")(queries[1])
+        menus = select(
+            literal("menu").label("type"),
+            Menu.id,
+            Menu.title,
+            Menu.description,
+            Menu.id.label("menu_id"),
+            cast(null(), Integer).label("submenu_id"),
+            func.ts_rank(Menu.search_vector, ts_query).label("rank"),
+        ).where(Menu.tenant_id == tenant, Menu.search_vector.op("@@")(ts_query))
+        submenus = select(
+            literal("submenu").label("type"),
+            SubMenu.id,
+            SubMenu.title,
+            SubMenu.description,
+            SubMenu.menu_id,
+            SubMenu.id.label("submenu_id"),
+            func.ts_rank(SubMenu.search_vector, ts_query).label("rank"),
+        ).where(SubMenu.tenant_id == tenant, SubMenu.search_vector.op("@@")(ts_query))
+        dishes = (
+            select(
+                literal("dish").label("type"),
+                Dish.id,
+                Dish.title,
+                Dish.description,
+                SubMenu.menu_id,
+                Dish.submenu_id,
+                func.ts_rank(Dish.search_vector, ts_query).label("rank"),
+            )
+            .join(SubMenu, Dish.submenu_id == SubMenu.id)
+            .where(Dish.tenant_id == tenant, Dish.search_vector.op("@@")(ts_query))
+        )
+        found = union_all(menus, submenus, dishes).subquery()
+        return select(found).order_by(found.c.rank.desc(), found.c.type, found.c.id).limit(limit).offset(offset)
+
 
 class TestDataCrud(BaseCrud):
     async def delete_all_tables(self) -> None:
-        statement = delete(Menu)
-        await self.session.execute(statement)
-        statement = delete(SubMenu)
-        await self.session.execute(statement)
-        statement = delete(Dish)
+        statement = delete(Menu).where(Menu.tenant_id == self.tenant)
         await self.session.execute(statement)
         await self.session.commit()
 
-    async def create_menu(self, menu_data: dict) -> None:
-        menu = Menu(**menu_data)
+    async def create_menu(self, menu_data: dict) -> Menu:
+        menu = Menu(**menu_data, tenant_id=self.tenant)
         self.session.add(menu)
         await self.session.commit()
         await self.session.refresh(menu)
+        return menu
 
-    async def create_submenu(self, submenu_data: dict) -> None:
-        submenu = SubMenu(**submenu_data)
+    async def create_submenu(self, submenu_data: dict) -> SubMenu:
+        submenu = SubMenu(**submenu_data, tenant_id=self.tenant)
         self.session.add(submenu)
         await self.session.commit()
         await self.session.refresh(submenu)
+        return submenu
 
-    async def create_dish(self, dish_data: dict) -> None:
-        dish = Dish(**dish_data)
+    async def create_dish(self, dish_data: dict) -> Dish:
+        dish = Dish(**dish_data, tenant_id=self.tenant)
         self.session.add(dish)
         await self.session.commit()
         await self.session.refresh(dish)
+        return dish
+
+
+class TenantCrud(BaseCrud):
+    async def get_tenants(self) -> list:
+        result = await self.session.execute(select(Tenant.id, Tenant.title, Tenant.rate_limit, Tenant.max_items))
+        return result.all()
+
+    async def get_tenant(self, id: str) -> schemas.Tenant | None:
+        statement = select(Tenant.id, Tenant.title, Tenant.rate_limit, Tenant.max_items).where(Tenant.id == id)
+        result = await self.session.execute(statement)
+        return result.one_or_none()
+
+    async def create_tenant(self, data: dict) -> Tenant:
+        tenant = Tenant(**data)
+        self.session.add(tenant)
+        await self.session.commit()
+        await self.session.refresh(tenant)
+        return tenant
+
+    async def count_items(self) -> int:
+        models: tuple[Any, ...] = (Menu, SubMenu, Dish)
+        counts = [
+            select(func.count()).select_from(model).where(model.tenant_id == self.tenant).scalar_subquery()
+            for model in models
+        ]
+        result = await self.session.execute(select(counts[0] + counts[1] + counts[2]))
+        return result.scalar()
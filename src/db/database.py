@@ -1,8 +1,14 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import time
+
+from fastapi import Depends, Request
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy_utils.functions import create_database, database_exists
 
-from src.models.models import Base
+from src.db.triggers import install_catalog_triggers
+from src.metrics import instrument_engine
+from src.models.models import DEFAULT_TENANT, Base, Tenant
 from src.settings import settings
 
 POSTGRES_USER = settings.POSTGRES_USER
@@ -11,8 +17,15 @@ DB_HOST = settings.DB_HOST
 DB_NAME = settings.POSTGRES_DB
 DB_PORT = settings.DB_PORT
 
+DB_REPLICA_HOST = settings.DB_REPLICA_HOST
+DB_REPLICA_PORT = settings.DB_REPLICA_PORT or DB_PORT
+PRIMARY_PIN_COOKIE = "db_primary_until"
+REPLICA_SESSION = "replica"
+
 if not settings.docker_mode:
     DB_HOST = "localhost"
+    if DB_REPLICA_HOST:
+        DB_REPLICA_HOST = "localhost"
 
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
@@ -20,25 +33,83 @@ SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSW
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     future=True,
-    echo=True,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
 )
+instrument_engine(engine.sync_engine)
 SessionLocal = sessionmaker(
     engine,
     expire_on_commit=False,
     class_=AsyncSession,
 )
 
+ReplicaSessionLocal = None
+if DB_REPLICA_HOST:
+    replica_engine = create_async_engine(
+        f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}",
+        future=True,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        connect_args={"server_settings": {"default_transaction_read_only": "on"}},
+    )
+    instrument_engine(replica_engine.sync_engine)
+    ReplicaSessionLocal = sessionmaker(
+        replica_engine,
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+
+def create_database_if_missing():
+    from sqlalchemy_utils.functions import create_database, database_exists
+
+    if not database_exists(DATABASE_URL):
+        create_database(DATABASE_URL)
+
+
+async def create_default_tenant(conn: AsyncConnection) -> None:
+    await conn.execute(insert(Tenant).values(id=DEFAULT_TENANT, title=DEFAULT_TENANT).on_conflict_do_nothing())
+
 
 async def init_db():
+    await asyncio.to_thread(create_database_if_missing)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await install_catalog_triggers(conn)
+        await create_default_tenant(conn)
 
 
-if not database_exists(DATABASE_URL):
-    create_database(DATABASE_URL)
+async def close_db():
+    await engine.dispose()
+    if ReplicaSessionLocal is not None:
+        await replica_engine.dispose()
 
 
 async def get_session() -> AsyncSession:
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     async with async_session() as session:
         yield session
+
+
+def pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request, session: AsyncSession = Depends(get_session)) -> AsyncSession:
+    if ReplicaSessionLocal is None or request.method not in ("GET", "HEAD") or pinned_to_primary(request):
+        yield session
+        return
+    async with ReplicaSessionLocal() as replica_session:
+        replica_session.info[REPLICA_SESSION] = True
+        yield replica_session
+
+
+def read_cache_ttl(session: AsyncSession) -> int | None:
+    return settings.DB_REPLICA_CACHE_TTL if session.info.get(REPLICA_SESSION) else None
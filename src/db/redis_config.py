@@ -1,5 +1,6 @@
-import aioredis
+from aioredis import BlockingConnectionPool
 
+from src.metrics import InstrumentedRedis
 from src.settings import settings
 
 REDIS_HOST = settings.REDIS_HOST
@@ -11,9 +12,29 @@ if not settings.docker_mode:
 
 REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
 
+connection_pool: BlockingConnectionPool | None = None
+
+
+def get_connection_pool() -> BlockingConnectionPool:
+    global connection_pool
+    if connection_pool is None:
+        connection_pool = BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+        )
+    return connection_pool
+
+
+async def close_connection_pool():
+    global connection_pool
+    if connection_pool is not None:
+        await connection_pool.disconnect()
+        connection_pool = None
+
 
 async def get_cache():
-    cache = aioredis.from_url(REDIS_URL)
+    cache = InstrumentedRedis(connection_pool=get_connection_pool())
     try:
         yield cache
     finally:
@@ -0,0 +1,166 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+CATALOG_CHANNEL = "catalog_changes"
+CATALOG_TABLES = ("menus", "submenus", "dishes")
+
+NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+DECLARE
+    old_data jsonb;
+    new_data jsonb;
+    rows jsonb[];
+    data jsonb;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        rows := ARRAY[to_jsonb(NEW)];
+    ELSIF TG_OP = 'DELETE' THEN
+        rows := ARRAY[to_jsonb(OLD)];
+    ELSE
+        old_data := to_jsonb(OLD);
+        new_data := to_jsonb(NEW);
+        rows := ARRAY[new_data];
+        IF (old_data -> 'menu_id', old_data -> 'submenu_id')
+            IS DISTINCT FROM (new_data -> 'menu_id', new_data -> 'submenu_id') THEN
+            rows := ARRAY[old_data, new_data];
+        END IF;
+    END IF;
+    FOREACH data IN ARRAY rows LOOP
+        IF TG_TABLE_NAME = 'dishes' THEN
+            data := data || jsonb_build_object(
+                'menu_id',
+                (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer)
+            );
+        END IF;
+        PERFORM pg_notify(
+            '{CATALOG_CHANNEL}',
+            jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'tenant_id', data -> 'tenant_id',
+                'id', data -> 'id',
+                'menu_id', data -> 'menu_id',
+                'submenu_id', data -> 'submenu_id'
+            )::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CREATE_STATEMENTS = [NOTIFY_FUNCTION] + [
+    f"""
+    CREATE OR REPLACE TRIGGER {table}_notify_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+    """
+    for table in CATALOG_TABLES
+]
+
+DROP_STATEMENTS = [
+    *(f"DROP TRIGGER IF EXISTS {table}_notify_catalog_change ON {table}" for table in CATALOG_TABLES),
+    "DROP FUNCTION IF EXISTS notify_catalog_change()",
+]
+
+VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION touch_catalog_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := pg_current_xact_id()::text::bigint;
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_catalog_tombstone() RETURNS trigger AS $$
+DECLARE
+    data jsonb := to_jsonb(OLD);
+BEGIN
+    INSERT INTO catalog_tombstones (tenant_id, table_name, row_id, menu_id, submenu_id)
+    VALUES (
+        OLD.tenant_id,
+        TG_TABLE_NAME,
+        OLD.id,
+        coalesce(
+            (data ->> 'menu_id')::integer,
+            (SELECT menu_id FROM submenus WHERE id = (data ->> 'submenu_id')::integer),
+            (
+                SELECT menu_id FROM catalog_tombstones
+                WHERE table_name = 'submenus' AND row_id = (data ->> 'submenu_id')::integer
+                ORDER BY id DESC LIMIT 1
+            )
+        ),
+        (data ->> 'submenu_id')::integer
+    );
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CREATE_VERSION_STATEMENTS = [VERSION_FUNCTION, TOMBSTONE_FUNCTION]
+for table in CATALOG_TABLES:
+    CREATE_VERSION_STATEMENTS += [
+        f"""
+        CREATE OR REPLACE TRIGGER {table}_touch_catalog_version
+        BEFORE UPDATE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION touch_catalog_version()
+        """,
+        f"""
+        CREATE OR REPLACE TRIGGER {table}_record_catalog_tombstone
+        BEFORE DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION record_catalog_tombstone()
+        """,
+    ]
+
+DROP_VERSION_STATEMENTS = [
+    statement
+    for table in CATALOG_TABLES
+    for statement in (
+        f"DROP TRIGGER IF EXISTS {table}_touch_catalog_version ON {table}",
+        f"DROP TRIGGER IF EXISTS {table}_record_catalog_tombstone ON {table}",
+    )
+] + ["DROP FUNCTION IF EXISTS touch_catalog_version()", "DROP FUNCTION IF EXISTS record_catalog_tombstone()"]
+
+TRANSLATION_TABLES = (
+    ("menu_translations", "menus", "menu_id"),
+    ("submenu_translations", "submenus", "submenu_id"),
+    ("dish_translations", "dishes", "dish_id"),
+)
+
+TRANSLATION_FUNCTION = """
+CREATE OR REPLACE FUNCTION touch_translated_item() RETURNS trigger AS $$
+DECLARE
+    data jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        data := to_jsonb(OLD);
+    ELSE
+        data := to_jsonb(NEW);
+    END IF;
+    EXECUTE format('UPDATE %I SET updated_at = now() WHERE id = $1', TG_ARGV[0])
+    USING (data ->> TG_ARGV[1])::integer;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CREATE_TRANSLATION_STATEMENTS = [TRANSLATION_FUNCTION] + [
+    f"""
+    CREATE OR REPLACE TRIGGER {table}_touch_translated_item
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION touch_translated_item('{parent}', '{column}')
+    """
+    for table, parent, column in TRANSLATION_TABLES
+]
+
+DROP_TRANSLATION_STATEMENTS = [
+    *(f"DROP TRIGGER IF EXISTS {table}_touch_translated_item ON {table}" for table, _, _ in TRANSLATION_TABLES),
+    "DROP FUNCTION IF EXISTS touch_translated_item()",
+]
+
+
+async def install_catalog_triggers(conn: AsyncConnection) -> None:
+    for statement in CREATE_STATEMENTS + CREATE_VERSION_STATEMENTS + CREATE_TRANSLATION_STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,58 @@
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import HTTPException
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, create_model
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def field_selector(model: type[BaseModel]) -> Callable[..., tuple[str, ...] | None]:
+    names = tuple(model.__fields__)
+
+    def select_fields(
+        fields: str | None = Query(default=None, description=f"Поля ответа через запятую: {', '.join(names)}"),
+    ) -> tuple[str, ...] | None:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(names)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"unknown fields: {', '.join(sorted(unknown))}" if unknown else "no fields selected",
+            )
+        if len(requested) == len(names):
+            return None
+        return tuple(name for name in names if name in requested)
+
+    return select_fields
+
+
+def selected(fields: tuple[str, ...] | None, name: str) -> bool:
+    return fields is None or name in fields
+
+
+def project(item: dict, fields: tuple[str, ...] | None) -> dict:
+    if fields is None:
+        return item
+    return {name: item[name] for name in fields}
+
+
+@lru_cache
+def projection_model(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    definitions: dict[str, Any] = {
+        name: (model.__fields__[name].outer_type_, model.__fields__[name].default) for name in fields
+    }
+    return create_model(f"{model.__name__}Fields", __config__=model.__config__, **definitions)
+
+
+def projected_response(model: type[BaseModel], fields: tuple[str, ...] | None, data: Any) -> Any:
+    if fields is None or isinstance(data, Response):
+        return data
+    partial = projection_model(model, fields)
+    content = [partial.parse_obj(item) for item in data] if isinstance(data, list) else partial.parse_obj(data)
+    return JSONResponse(jsonable_encoder(content))
@@ -0,0 +1,209 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import re
+
+from fastapi import Header
+from starlette.datastructures import Headers
+from starlette.status import HTTP_409_CONFLICT, HTTP_422_UNPROCESSABLE_ENTITY
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db.redis_config import get_connection_pool
+from src.metrics import Counter, InstrumentedRedis
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_PREFIX = "idempotency:"
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+PENDING = "pending"
+IDEMPOTENT_PATH = re.compile(r"/api/v1/(menus(/[^/]+/submenus(/[^/]+/dishes)?)?|create_menu_file)")
+UNSTORED_HEADERS = {"set-cookie"}
+
+idempotent_requests = Counter(
+    "idempotent_requests_total",
+    "Requests with an Idempotency-Key by outcome",
+    ("result",),
+)
+
+
+IDEMPOTENCY_KEY = Header(
+    default=None,
+    alias="Idempotency-Key",
+    min_length=1,
+    max_length=MAX_KEY_LENGTH,
+    description="Повторный запрос с тем же ключом вернёт сохранённый ответ без повторного создания",
+)
+
+
+def idempotency_key(key: str | None = IDEMPOTENCY_KEY) -> str | None:
+    return key
+
+
+def request_fingerprint(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256(f"{scope['method']} {scope['path']}?".encode() + scope["query_string"] + b"\n" + body)
+    return digest.hexdigest()
+
+
+def idempotent(scope: Scope) -> bool:
+    return scope["method"] == "POST" and IDEMPOTENT_PATH.fullmatch(scope["path"]) is not None
+
+
+def receive_body(body: bytes) -> Receive:
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return receive
+
+
+class IdempotencyMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        ttl: int = settings.IDEMPOTENCY_TTL,
+        lock_ttl: int = settings.IDEMPOTENCY_LOCK_TTL,
+        wait_timeout: float = settings.IDEMPOTENCY_WAIT_TIMEOUT,
+    ) -> None:
+        self.app = app
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.running: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = Headers(scope=scope).get(IDEMPOTENCY_HEADER) if scope["type"] == "http" else None
+        if not key or len(key) > MAX_KEY_LENGTH or not idempotent(scope):
+            await self.app(scope, receive, send)
+            return
+        body = await self.read_body(receive)
+        fingerprint = request_fingerprint(scope, body)
+        tenant = Headers(scope=scope).get(settings.TENANT_HEADER) or DEFAULT_TENANT
+        redis_key = f"{IDEMPOTENCY_PREFIX}{tenant}:{scope['path']}:{key}"
+        redis = InstrumentedRedis(connection_pool=get_connection_pool())
+        try:
+            try:
+                record = await self.reserve(redis, redis_key, fingerprint)
+            except Exception:
+                logger.exception("Idempotency key %s lookup failed", redis_key)
+                await self.app(scope, receive_body(body), send)
+                return
+            if record is None:
+                await self.execute(scope, body, send, redis, redis_key, fingerprint)
+                return
+        finally:
+            await redis.close()
+        if record["fingerprint"] != fingerprint:
+            idempotent_requests.inc("mismatch")
+            await self.error(send, HTTP_422_UNPROCESSABLE_ENTITY, "Idempotency-Key reused with a different request")
+        elif record["state"] == PENDING:
+            idempotent_requests.inc("in_progress")
+            await self.error(send, HTTP_409_CONFLICT, "request with this Idempotency-Key is in progress")
+        else:
+            idempotent_requests.inc("replayed")
+            await self.replay(send, record)
+
+    @staticmethod
+    async def read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def reserve(self, redis: InstrumentedRedis, redis_key: str, fingerprint: str) -> dict | None:
+        pending = json.dumps({"state": PENDING, "fingerprint": fingerprint})
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while True:
+            if await redis.set(redis_key, pending, nx=True, ex=self.lock_ttl):
+                return None
+            stored = await redis.get(redis_key)
+            if stored is None:
+                continue
+            record = json.loads(stored)
+            if record["state"] != PENDING or record["fingerprint"] != fingerprint or loop.time() >= deadline:
+                return record
+            event = self.running.get(redis_key)
+            timeout = min(deadline - loop.time(), self.lock_ttl)
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(POLL_INTERVAL, max(timeout, 0)))
+
+    async def execute(
+        self, scope: Scope, body: bytes, send: Send, redis: InstrumentedRedis, redis_key: str, fingerprint: str
+    ) -> None:
+        self.running[redis_key] = event = asyncio.Event()
+        response: dict = {"status": 500, "headers": [], "body": []}
+
+        async def send_recorded(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        idempotent_requests.inc("executed")
+        try:
+            await self.app(scope, receive_body(body), send_recorded)
+            if response["status"] < 500:
+                record = {
+                    "state": "done",
+                    "fingerprint": fingerprint,
+                    "status": response["status"],
+                    "headers": response["headers"],
+                    "body": base64.b64encode(b"".join(response["body"])).decode(),
+                }
+                await self.store(redis, redis_key, json.dumps(record))
+            else:
+                await self.store(redis, redis_key, None)
+        except BaseException:
+            await self.store(redis, redis_key, None)
+            raise
+        finally:
+            del self.running[redis_key]
+            event.set()
+
+    async def store(self, redis: InstrumentedRedis, redis_key: str, record: str | None) -> None:
+        try:
+            if record is None:
+                await redis.delete(redis_key)
+            else:
+                await redis.set(redis_key, record, ex=self.ttl)
+        except Exception:
+            logger.exception("Storing idempotent response %s failed", redis_key)
+
+    @staticmethod
+    async def replay(send: Send, record: dict) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+        headers.append((REPLAYED_HEADER.encode(), b"true"))
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
+
+    @staticmethod
+    async def error(send: Send, status: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,317 @@
+import asyncio
+import inspect
+import json
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.exceptions import HTTPException
+from starlette.datastructures import Headers
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.db.redis_config import get_connection_pool
+from src.metrics import Counter, Gauge, InstrumentedRedis
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "ratelimit:"
+LIMIT_BACKOFF = 0.9
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+rejected_requests = Counter(
+    "http_rejected_requests_total",
+    "Requests rejected by rate limiting and load shedding",
+    ("reason",),
+)
+db_concurrency_limit = Gauge(
+    "db_concurrency_limit",
+    "Current adaptive limit of concurrent requests querying the database",
+    (),
+)
+db_requests_inflight = Gauge(
+    "db_requests_inflight",
+    "Requests holding a database permit",
+    (),
+)
+db_requests_queued = Gauge(
+    "db_requests_queued",
+    "Requests waiting for a database permit",
+    (),
+)
+
+
+def retry_after(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, client: str, now: float | None = None, rate: float | None = None, burst: int | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        rate = rate or self.rate
+        burst = burst or self.burst
+        tokens, updated = self.buckets.pop(client, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self.buckets[client] = (tokens, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float = settings.RATE_LIMIT_RATE,
+        burst: int = settings.RATE_LIMIT_BURST,
+        redis_retry: float = settings.RATE_LIMIT_REDIS_RETRY,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.redis_retry = redis_retry
+        self.local = TokenBucket(rate, burst)
+        self.redis_down_until = 0.0
+
+    async def take(self, client: str, rate: float | None = None, burst: int | None = None) -> float:
+        rate = rate or self.rate
+        burst = burst or self.burst
+        if time.monotonic() >= self.redis_down_until:
+            redis = InstrumentedRedis(connection_pool=get_connection_pool())
+            try:
+                wait = await redis.eval(
+                    TOKEN_BUCKET_SCRIPT, 1, f"{RATE_LIMIT_PREFIX}{client}", rate, burst, time.time()
+                )
+                return float(wait)
+            except Exception:
+                logger.exception("Rate limiting through Redis failed, using in-process buckets")
+                self.redis_down_until = time.monotonic() + self.redis_retry
+            finally:
+                await redis.close()
+        return self.local.take(client, rate=rate, burst=burst)
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        limit: int | None = settings.DB_LIMIT_MAX,
+        minimum: int = settings.DB_LIMIT_MIN,
+        latency: float = settings.DB_LIMIT_LATENCY_MS / 1000,
+        queue_size: int = settings.DB_LIMIT_QUEUE_SIZE,
+        queue_timeout: float = settings.DB_LIMIT_QUEUE_TIMEOUT,
+        tenant_share: float = settings.TENANT_DB_SHARE,
+    ) -> None:
+        limit = limit or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        self.maximum = limit
+        self.minimum = min(minimum, limit)
+        self.limit = float(limit)
+        self.latency = latency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tenant_share = tenant_share
+        self.occupied: dict[str, int] = {}
+        self.inflight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.decreased_at = 0.0
+        db_concurrency_limit.set(self.limit)
+
+    def reject(self, reason: str) -> HTTPException:
+        rejected_requests.inc(reason)
+        return HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="database overloaded",
+            headers=retry_after(self.queue_timeout),
+        )
+
+    def occupy(self, tenant: str | None, delta: int) -> None:
+        if tenant is None:
+            return
+        occupied = self.occupied.get(tenant, 0) + delta
+        if occupied:
+            self.occupied[tenant] = occupied
+        else:
+            self.occupied.pop(tenant, None)
+
+    async def acquire(self, tenant: str | None = None) -> None:
+        if self.inflight < self.limit and not self.waiters:
+            self.inflight += 1
+            self.occupy(tenant, 1)
+            db_requests_inflight.set(self.inflight)
+            return
+        if len(self.waiters) >= self.queue_size:
+            raise self.reject("overload")
+        if tenant is not None and self.occupied.get(tenant, 0) >= max(1.0, self.limit * self.tenant_share):
+            raise self.reject("tenant_quota")
+        self.occupy(tenant, 1)
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        db_requests_queued.set(len(self.waiters))
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as error:
+            if waiter.done() and not waiter.cancelled():
+                self.release(tenant)
+            else:
+                self.occupy(tenant, -1)
+            if isinstance(error, asyncio.TimeoutError):
+                raise self.reject("queue_timeout")
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            db_requests_queued.set(len(self.waiters))
+
+    def release(self, tenant: str | None = None) -> None:
+        self.inflight -= 1
+        self.occupy(tenant, -1)
+        while self.waiters and self.inflight < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+        db_requests_inflight.set(self.inflight)
+
+    def observe(self, started: float, elapsed: float) -> None:
+        if elapsed > self.latency:
+            if started >= self.decreased_at:
+                self.limit = max(self.minimum, self.limit * LIMIT_BACKOFF)
+                self.decreased_at = time.monotonic()
+        elif self.inflight >= self.limit - 1:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        db_concurrency_limit.set(self.limit)
+
+
+class DatabasePermit:
+    def __init__(self, limiter: AdaptiveLimiter, tenant: str | None = None) -> None:
+        self.limiter = limiter
+        self.tenant = tenant
+        self.held = False
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.held:
+            return
+        async with self.lock:
+            if not self.held:
+                await self.limiter.acquire(self.tenant)
+                self.held = True
+
+    def release(self) -> None:
+        if self.held:
+            self.held = False
+            self.limiter.release(self.tenant)
+
+
+database_permit: ContextVar[DatabasePermit | None] = ContextVar("database_permit", default=None)
+
+
+class LimitedCrud:
+    def __init__(self, crud: Any) -> None:
+        self.crud = crud
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.crud, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            permit = database_permit.get()
+            if permit is None:
+                return await attribute(*args, **kwargs)
+            await permit.acquire()
+            started = time.monotonic()
+            try:
+                return await attribute(*args, **kwargs)
+            finally:
+                permit.limiter.observe(started, time.monotonic() - started)
+
+        return call
+
+
+class LimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limiter: RateLimiter | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        client_header: str | None = settings.RATE_LIMIT_CLIENT_HEADER,
+        tenant_header: str = settings.TENANT_HEADER,
+    ) -> None:
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.limiter = limiter
+        self.client_header = client_header
+        self.tenant_header = tenant_header
+
+    def client(self, scope: Scope) -> str:
+        if self.client_header:
+            value = Headers(scope=scope).get(self.client_header)
+            if value:
+                return value.split(",", 1)[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        if self.rate_limiter is not None:
+            wait = await self.rate_limiter.take(self.client(scope))
+            if wait > 0:
+                rejected_requests.inc("rate_limit")
+                await self.reject(send, HTTP_429_TOO_MANY_REQUESTS, "too many requests", wait)
+                return
+        if self.limiter is None:
+            await self.app(scope, receive, send)
+            return
+        permit = DatabasePermit(self.limiter, Headers(scope=scope).get(self.tenant_header) or DEFAULT_TENANT)
+        token = database_permit.set(permit)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            database_permit.reset(token)
+            permit.release()
+
+    @staticmethod
+    async def reject(send: Send, status: int, detail: str, wait: float) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        headers = {"content-type": "application/json", "content-length": str(len(body)), **retry_after(wait)}
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,71 @@
+from functools import lru_cache
+
+from fastapi import Header, Request
+from fastapi.exceptions import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.settings import settings
+
+LOCALIZED_PATH = "/api/v1/menus"
+
+
+@lru_cache(maxsize=1024)
+def resolve_locale(accept_language: str | None) -> str:
+    if not accept_language:
+        return settings.DEFAULT_LOCALE
+    ranges = []
+    for position, item in enumerate(accept_language.split(",")):
+        tag, _, params = item.strip().lower().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if tag and quality > 0:
+            ranges.append((-quality, position, tag.strip()))
+    for _, _, tag in sorted(ranges):
+        if tag == "*":
+            return settings.DEFAULT_LOCALE
+        for candidate in (tag, tag.split("-", 1)[0]):
+            if candidate in settings.LOCALES:
+                return candidate
+    return settings.DEFAULT_LOCALE
+
+
+ACCEPT_LANGUAGE = Header(default=None, description=f"Язык названий и описаний: {', '.join(settings.LOCALES)}")
+
+
+def get_locale(request: Request, accept_language: str | None = ACCEPT_LANGUAGE) -> str | None:
+    if request.method != "GET":
+        return None
+    locale = resolve_locale(accept_language)
+    return None if locale == settings.DEFAULT_LOCALE else locale
+
+
+def translation_locale(locale: str) -> str:
+    if locale == settings.DEFAULT_LOCALE or locale not in settings.LOCALES:
+        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY, detail=f"unsupported locale: {locale}")
+    return locale
+
+
+class LocaleMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(LOCALIZED_PATH):
+            await self.app(scope, receive, send)
+            return
+        locale = resolve_locale(Headers(scope=scope).get("accept-language"))
+
+        async def send_localized(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers["Content-Language"] = locale
+                headers.add_vary_header("Accept-Language")
+            await send(message)
+
+        await self.app(scope, receive, send_localized)
@@ -1,35 +1,94 @@
-import aioredis
-from fastapi import Depends, FastAPI
-from fastapi.responses import FileResponse
+from typing import Literal
+
+from fastapi import Depends, FastAPI, Header, Query
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_202_ACCEPTED
 
-from src.db.database import init_db
-from src.db.redis_config import REDIS_URL
+from src.compression import CompressionMiddleware
+from src.db.database import ReplicaSessionLocal, close_db, init_db
+from src.db.redis_config import close_connection_pool
+from src.fields import field_selector, projected_response
+from src.idempotency import IdempotencyMiddleware, idempotency_key
+from src.limits import AdaptiveLimiter, LimitMiddleware, RateLimiter
+from src.locales import LocaleMiddleware, translation_locale
+from src.metrics import metrics_writer, render_metrics
+from src.middleware import MetricsMiddleware, PrimaryPinMiddleware, SnapshotMiddleware
+from src.profiler import profile_worker, verify_admin_token
 from src.schemas import schemas
+from src.services.changes import change_hub
+from src.services.exports import export_janitor, stop_export_backends
+from src.services.invalidation import invalidation_listener
 from src.services.services import (
     DishServices,
     MenuServices,
+    SearchServices,
     SubmenuServices,
+    SyncServices,
+    TenantServices,
     TestDataServices,
     dish_services,
     menu_services,
+    search_services,
     submenu_services,
+    sync_services,
+    tenant_services,
     test_data_service,
+    warm_up_cache,
 )
+from src.services.snapshot import snapshot_store
+from src.services.stoplist import stop_list
+from src.settings import settings
+from src.tenants import check_tenant_quota, get_stream_tenant
 
 app = FastAPI()
 
+if settings.SNAPSHOT_MODE:
+    app.add_middleware(SnapshotMiddleware, store=snapshot_store, stop_list=stop_list)
+if ReplicaSessionLocal is not None:
+    app.add_middleware(PrimaryPinMiddleware, seconds=settings.DB_PRIMARY_PIN_SECONDS)
+if settings.IDEMPOTENCY_TTL:
+    app.add_middleware(IdempotencyMiddleware)
+if len(settings.LOCALES) > 1:
+    app.add_middleware(LocaleMiddleware)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+if settings.RATE_LIMIT_ENABLED or settings.DB_LIMIT_ENABLED:
+    app.add_middleware(
+        LimitMiddleware,
+        rate_limiter=RateLimiter() if settings.RATE_LIMIT_ENABLED else None,
+        limiter=AdaptiveLimiter() if settings.DB_LIMIT_ENABLED else None,
+    )
+if settings.METRICS_ENABLED or settings.QUERY_DETECTOR:
+    app.add_middleware(MetricsMiddleware)
+
 
 @app.on_event("startup")
 async def startup():
-    await init_db()
-    aioredis.from_url(REDIS_URL)
+    if settings.INIT_DB_ON_STARTUP:
+        await init_db()
+    if settings.CACHE_WARMUP_ON_STARTUP:
+        await warm_up_cache()
+    if settings.CACHE_INVALIDATION_LISTENER:
+        await invalidation_listener.start()
+    if settings.SNAPSHOT_MODE:
+        await snapshot_store.start()
+    if settings.EXPORT_TTL:
+        await export_janitor.start()
+    if settings.METRICS_DIR:
+        await metrics_writer.start(settings.METRICS_DIR)
 
 
 @app.on_event("shutdown")
-async def shutdown_event():
-    cache = aioredis.from_url(REDIS_URL)
-    await cache.flushall()
+async def shutdown():
+    await change_hub.stop()
+    await snapshot_store.stop()
+    await invalidation_listener.stop()
+    await stop_list.stop()
+    await stop_export_backends()
+    await export_janitor.stop()
+    await metrics_writer.stop()
+    await close_connection_pool()
+    await close_db()
 
 
 @app.get(
@@ -40,8 +99,11 @@ async def shutdown_event():
     status_code=HTTP_200_OK,
     tags=["Меню"],
 )
-async def list_menus(service: MenuServices = Depends(menu_services)):
-    return await service.get_list_menus()
+async def list_menus(
+    fields: tuple[str, ...] | None = Depends(field_selector(schemas.Menu)),
+    service: MenuServices = Depends(menu_services),
+):
+    return projected_response(schemas.Menu, fields, await service.get_list_menus(fields=fields))
 
 
 @app.get(
@@ -52,8 +114,12 @@ async def list_menus(service: MenuServices = Depends(menu_services)):
     status_code=HTTP_200_OK,
     tags=["Меню"],
 )
-async def get_menu(menu_id: int, service: MenuServices = Depends(menu_services)):
-    return await service.get_menu(id=menu_id)
+async def get_menu(
+    menu_id: int,
+    fields: tuple[str, ...] | None = Depends(field_selector(schemas.Menu)),
+    service: MenuServices = Depends(menu_services),
+):
+    return projected_response(schemas.Menu, fields, await service.get_menu(id=menu_id, fields=fields))
 
 
 @app.post(
@@ -63,6 +129,7 @@ async def get_menu(menu_id: int, service: MenuServices = Depends(menu_services))
     description="Создание меню",
     status_code=HTTP_201_CREATED,
     tags=["Меню"],
+    dependencies=[Depends(idempotency_key), Depends(check_tenant_quota)],
 )
 async def create_menu(
     menu: schemas.MenuCreate,
@@ -102,6 +169,23 @@ async def delete_menu(
     return await service.delete_menu(id=menu_id)
 
 
+@app.put(
+    "/api/v1/menus/{menu_id}/translations/{locale}",
+    response_model=schemas.Translation,
+    summary="Перевод меню",
+    description="Название и описание меню на другом языке, незаполненные поля берутся из основного языка",
+    status_code=HTTP_200_OK,
+    tags=["Меню"],
+)
+async def put_menu_translation(
+    menu_id: int,
+    translation: schemas.TranslationUpdate,
+    locale: str = Depends(translation_locale),
+    service: MenuServices = Depends(menu_services),
+):
+    return await service.set_translation(id=menu_id, locale=locale, translation=translation)
+
+
 @app.get(
     "/api/v1/menus/{menu_id}/submenus",
     response_model=list[schemas.SubMenu],
@@ -112,9 +196,14 @@ async def delete_menu(
 )
 async def list_submenus(
     menu_id: int,
+    fields: tuple[str, ...] | None = Depends(field_selector(schemas.SubMenu)),
     service: SubmenuServices = Depends(submenu_services),
 ):
-    return await service.get_submenu_list(menu_id=menu_id)
+    return projected_response(
+        schemas.SubMenu,
+        fields,
+        await service.get_submenu_list(menu_id=menu_id, fields=fields),
+    )
 
 
 @app.get(
@@ -128,11 +217,17 @@ async def list_submenus(
 async def get_submenu(
     submenu_id: int,
     menu_id: int,
+    fields: tuple[str, ...] | None = Depends(field_selector(schemas.SubMenu)),
     service: SubmenuServices = Depends(submenu_services),
 ):
-    return await service.get_submenu(
-        id=submenu_id,
-        menu_id=menu_id,
+    return projected_response(
+        schemas.SubMenu,
+        fields,
+        await service.get_submenu(
+            id=submenu_id,
+            menu_id=menu_id,
+            fields=fields,
+        ),
     )
 
 
@@ -143,6 +238,7 @@ async def get_submenu(
     description="Создание подменю",
     status_code=HTTP_201_CREATED,
     tags=["Подменю"],
+    dependencies=[Depends(idempotency_key), Depends(check_tenant_quota)],
 )
 async def create_submenu(
     menu_id: int,
@@ -192,6 +288,24 @@ async def patch_submenu(
     )
 
 
+@app.put(
+    "/api/v1/menus/{menu_id}/submenus/{submenu_id}/translations/{locale}",
+    response_model=schemas.Translation,
+    summary="Перевод подменю",
+    description="Название и описание подменю на другом языке, незаполненные поля берутся из основного языка",
+    status_code=HTTP_200_OK,
+    tags=["Подменю"],
+)
+async def put_submenu_translation(
+    submenu_id: int,
+    menu_id: int,
+    translation: schemas.TranslationUpdate,
+    locale: str = Depends(translation_locale),
+    service: SubmenuServices = Depends(submenu_services),
+):
+    return await service.set_translation(id=submenu_id, menu_id=menu_id, locale=locale, translation=translation)
+
+
 @app.get(
     "/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes",
     response_model=list[schemas.Dish],
@@ -203,11 +317,17 @@ async def patch_submenu(
 async def list_dishes(
     submenu_id: int,
     menu_id: int,
+    fields: tuple[str, ...] | None = Depends(field_selector(schemas.Dish)),
     service: DishServices = Depends(dish_services),
 ):
-    return await service.get_list_dishes(
-        submenu_id=submenu_id,
-        menu_id=menu_id,
+    return projected_response(
+        schemas.Dish,
+        fields,
+        await service.get_list_dishes(
+            submenu_id=submenu_id,
+            menu_id=menu_id,
+            fields=fields,
+        ),
     )
 
 
@@ -223,12 +343,18 @@ async def get_dish(
     dish_id: int,
     menu_id: int,
     submenu_id: int,
+    fields: tuple[str, ...] | None = Depends(field_selector(schemas.Dish)),
     service: DishServices = Depends(dish_services),
 ):
-    return await service.get_dish(
-        id=dish_id,
-        menu_id=menu_id,
-        submenu_id=submenu_id,
+    return projected_response(
+        schemas.Dish,
+        fields,
+        await service.get_dish(
+            id=dish_id,
+            menu_id=menu_id,
+            submenu_id=submenu_id,
+            fields=fields,
+        ),
     )
 
 
@@ -239,6 +365,7 @@ async def get_dish(
     description="Создание блюда",
     status_code=HTTP_201_CREATED,
     tags=["Блюда"],
+    dependencies=[Depends(idempotency_key), Depends(check_tenant_quota)],
 )
 async def create_dish(
     dish: schemas.DishCreate,
@@ -297,6 +424,117 @@ async def delete_dish(
     )
 
 
+@app.put(
+    "/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}/translations/{locale}",
+    response_model=schemas.Translation,
+    summary="Перевод блюда",
+    description="Название и описание блюда на другом языке, незаполненные поля берутся из основного языка",
+    status_code=HTTP_200_OK,
+    tags=["Блюда"],
+)
+async def put_dish_translation(
+    dish_id: int,
+    menu_id: int,
+    submenu_id: int,
+    translation: schemas.TranslationUpdate,
+    locale: str = Depends(translation_locale),
+    service: DishServices = Depends(dish_services),
+):
+    return await service.set_translation(
+        id=dish_id,
+        menu_id=menu_id,
+        submenu_id=submenu_id,
+        locale=locale,
+        translation=translation,
+    )
+
+
+@app.put(
+    "/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}/availability",
+    response_model=schemas.DishAvailability,
+    summary="Наличие блюда",
+    description="Добавление блюда в стоп-лист или возврат в продажу без сброса кэша каталога",
+    status_code=HTTP_200_OK,
+    tags=["Блюда"],
+)
+async def put_dish_availability(
+    dish_id: int,
+    menu_id: int,
+    submenu_id: int,
+    availability: schemas.DishAvailability,
+    service: DishServices = Depends(dish_services),
+):
+    return await service.set_availability(
+        id=dish_id,
+        menu_id=menu_id,
+        submenu_id=submenu_id,
+        availability=availability,
+    )
+
+
+@app.get(
+    "/api/v1/stop-list",
+    response_model=list[str],
+    summary="Стоп-лист",
+    description="Идентификаторы блюд, которых нет в наличии",
+    status_code=HTTP_200_OK,
+    tags=["Стоп-лист"],
+)
+async def get_stop_list(service: DishServices = Depends(dish_services)):
+    return await service.get_stop_list()
+
+
+@app.get(
+    "/api/v1/search",
+    response_model=list[schemas.SearchResult],
+    summary="Поиск",
+    description="Полнотекстовый поиск по меню, подменю и блюдам",
+    status_code=HTTP_200_OK,
+    tags=["Поиск"],
+)
+async def search(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    service: SearchServices = Depends(search_services),
+):
+    return await service.search(q=q, limit=limit, offset=offset)
+
+
+@app.get(
+    "/api/v1/changes",
+    summary="Поток изменений",
+    description="Server-sent events о создании, изменении и удалении меню, подменю и блюд. "
+    "После переподключения с заголовком Last-Event-ID пропущенные события отправляются повторно",
+    response_class=StreamingResponse,
+    status_code=HTTP_200_OK,
+    tags=["Изменения"],
+)
+async def changes(last_event_id: str | None = Header(default=None), tenant: str = Depends(get_stream_tenant)):
+    change_hub.check_capacity()
+    return StreamingResponse(
+        change_hub.stream(last_event_id, tenant=tenant),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get(
+    "/api/v1/catalog/changes",
+    response_model=schemas.CatalogChanges,
+    summary="Изменения каталога",
+    description="Меню, подменю и блюда, изменённые после версии since, и удалённые объекты. "
+    "Поле version ответа передаётся в since следующего запроса",
+    status_code=HTTP_200_OK,
+    tags=["Синхронизация"],
+)
+async def catalog_changes(
+    since: int = Query(default=0, ge=0),
+    service: SyncServices = Depends(sync_services),
+):
+    return await service.get_changes(since=since)
+
+
 @app.get(
     "/api/v1/download_test_data",
     description="Загрузка тестовых данных",
@@ -310,7 +548,7 @@ async def download_test_data(service: TestDataServices = Depends(test_data_servi
 
 @app.get(
     "/api/v1/get_menu_file/{id}",
-    description="Загрузка меню в виде excel файла",
+    description="Загрузка меню в виде excel, csv или json файла",
     summary="Получение меню в excel",
     response_class=FileResponse,
     status_code=HTTP_200_OK,
@@ -322,10 +560,59 @@ async def get_menu_file(id: str, service: MenuServices = Depends(menu_services))
 
 @app.post(
     "/api/v1/create_menu_file",
-    description="Создать меню в виде excel файла",
+    description="Создать меню в виде excel файла, csv или json (при gzip=true сжатого)",
     summary="Создать меню в excel",
     status_code=HTTP_202_ACCEPTED,
     tags=["Создание и получение меню в excel"],
+    dependencies=[Depends(idempotency_key)],
+)
+async def create_menu_file(
+    format: Literal["xlsx", "csv", "json"] = Query(default="xlsx"),
+    gzip: bool = Query(default=False),
+    service: MenuServices = Depends(menu_services),
+):
+    return await service.create_menu_excel_file(export_format=format, compress=gzip)
+
+
+@app.get(
+    "/metrics",
+    summary="Метрики",
+    description="Метрики приложения в текстовом формате Prometheus",
+    response_class=PlainTextResponse,
+    status_code=HTTP_200_OK,
+    tags=["Мониторинг"],
 )
-async def create_menu_file(service: MenuServices = Depends(menu_services)):
-    return await service.create_menu_excel_file()
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.post(
+    "/api/v1/admin/profile",
+    summary="Профилирование воркера",
+    description="Сэмплирующий профиль текущего воркера в формате collapsed stacks для flamegraph",
+    response_class=PlainTextResponse,
+    status_code=HTTP_200_OK,
+    dependencies=[Depends(verify_admin_token)],
+    tags=["Мониторинг"],
+)
+async def profile(
+    seconds: float = Query(default=10, gt=0, le=60),
+    interval_ms: float = Query(default=5, ge=1, le=1000),
+):
+    return PlainTextResponse(await profile_worker(seconds=seconds, interval=interval_ms / 1000))
+
+
+@app.post(
+    "/api/v1/admin/tenants",
+    response_model=schemas.Tenant,
+    summary="Создать ресторан",
+    description="Регистрация ресторана с собственным каталогом и квотами",
+    status_code=HTTP_201_CREATED,
+    dependencies=[Depends(verify_admin_token)],
+    tags=["Рестораны"],
+)
+async def create_tenant(
+    tenant: schemas.TenantCreate,
+    service: TenantServices = Depends(tenant_services),
+):
+    return await service.create_tenant(tenant=tenant)
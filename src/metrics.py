@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from contextvars import ContextVar
+from typing import Any
+
+import aioredis
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.query_detector import StatementRecord, statement_origin
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+NO_ROUTE = "unmatched"
+BACKGROUND = "background"
+
+
+class RequestStats:
+    def __init__(
+        self, scope: MutableMapping[str, Any] | None = None, statements: list[StatementRecord] | None = None
+    ) -> None:
+        self.scope = scope or {}
+        self.statements = statements
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.redis_count = 0
+        self.redis_time = 0.0
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return route.path if route is not None else NO_ROUTE
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+REGISTRY: list["Metric"] = []
+
+
+class Metric:
+    type = ""
+    live_only = False
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: dict[tuple[str, ...], Any] = {}
+        REGISTRY.append(self)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def format_labels(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{label}="{value}"' for label, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def dump(self) -> list:
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+    def merge(self, values: dict, series: list) -> None:
+        raise NotImplementedError
+
+    def render(self, values: dict | None = None) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def merge(self, values: dict, series: list) -> None:
+        for labels, value in series:
+            key = tuple(labels)
+            values[key] = values.get(key, 0) + value
+
+    def render(self, values: dict | None = None) -> list[str]:
+        values = self.values if values is None else values
+        return self.header() + [
+            f"{self.name}{self.format_labels(labels)} {value}" for labels, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+    live_only = True
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...], buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def merge(self, values: dict, series: list) -> None:
+        for labels, (counts, total) in series:
+            current = values.setdefault(tuple(labels), [[0] * len(counts), 0.0])
+            current[0] = [left + right for left, right in zip(current[0], counts)]
+            current[1] += total
+
+    def render(self, values: dict | None = None) -> list[str]:
+        values = self.values if values is None else values
+        lines = self.header()
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket_labels = self.format_labels(labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self.format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{self.format_labels(labels)} {cumulative}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ("method", "route", "status"),
+)
+db_statements = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement latency",
+    ("route",),
+)
+db_statements_per_request = Histogram(
+    "db_statements_per_request",
+    "Number of SQL statements per request",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+redis_commands = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency",
+    ("route", "command"),
+)
+cache_requests = Counter(
+    "cache_requests_total",
+    "Cache lookups by key family and result",
+    ("family", "result"),
+)
+
+
+def write_metrics(directory: str) -> None:
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    with open(f"{path}.tmp", "w") as file:
+        json.dump({metric.name: metric.dump() for metric in REGISTRY}, file)
+    os.replace(f"{path}.tmp", path)
+
+
+def worker_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect_metrics(directory: str) -> dict[str, dict]:
+    merged: dict[str, dict] = {metric.name: {} for metric in REGISTRY}
+    for entry in os.scandir(directory):
+        pid, suffix = os.path.splitext(entry.name)
+        if suffix != ".json" or not pid.isdigit():
+            continue
+        with open(entry.path) as file:
+            data = json.load(file)
+        alive = worker_alive(int(pid))
+        for metric in REGISTRY:
+            if alive or not metric.live_only:
+                metric.merge(merged[metric.name], data.get(metric.name, []))
+    return merged
+
+
+def render_metrics() -> str:
+    merged = None
+    if settings.METRICS_DIR:
+        write_metrics(settings.METRICS_DIR)
+        merged = collect_metrics(settings.METRICS_DIR)
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render(None if merged is None else merged[metric.name])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsWriter:
+    def __init__(self) -> None:
+        self.directory: str | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self, directory: str) -> None:
+        self.directory = directory
+        self._task = asyncio.create_task(self._run(directory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.directory is not None:
+            write_metrics(self.directory)
+            self.directory = None
+
+    async def _run(self, directory: str) -> None:
+        while True:
+            await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL)
+            try:
+                write_metrics(directory)
+            except Exception:
+                logger.exception("Metrics flush failed")
+
+
+metrics_writer = MetricsWriter()
+
+
+def record_cache_lookup(key: str, hit: bool) -> None:
+    cache_requests.inc(key.split(":", 1)[0], "hit" if hit else "miss")
+
+
+def current_route() -> str:
+    stats = request_stats.get()
+    return stats.route if stats is not None else BACKGROUND
+
+
+class InstrumentedRedis(aioredis.Redis):
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = request_stats.get()
+            if stats is not None:
+                stats.redis_count += 1
+                stats.redis_time += elapsed
+            redis_commands.observe(elapsed, current_route(), str(args[0]).upper())
+
+
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = request_stats.get()
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_time += elapsed
+            if stats.statements is not None:
+                stats.statements.append(StatementRecord(statement, elapsed, statement_origin()))
+        db_statements.observe(elapsed, current_route())
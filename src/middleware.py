@@ -0,0 +1,107 @@
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db.database import PRIMARY_PIN_COOKIE
+from src.locales import resolve_locale
+from src.metrics import (
+    RequestStats,
+    db_statements_per_request,
+    http_request_duration,
+    request_stats,
+)
+from src.models.models import DEFAULT_TENANT
+from src.query_detector import query_detector
+from src.services.snapshot import SnapshotStore
+from src.services.stoplist import StopList
+from src.settings import settings
+
+
+class SnapshotMiddleware:
+    def __init__(
+        self, app: ASGIApp, store: SnapshotStore, stop_list: StopList, tenant_header: str = settings.TENANT_HEADER
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.stop_list = stop_list
+        self.tenant_header = tenant_header
+
+    def default_catalog(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET" or b"fields=" in scope["query_string"]:
+            return False
+        headers = Headers(scope=scope)
+        if headers.get(self.tenant_header, DEFAULT_TENANT) != DEFAULT_TENANT:
+            return False
+        return resolve_locale(headers.get("accept-language")) == settings.DEFAULT_LOCALE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        snapshot = self.store.snapshot
+        if snapshot is not None and self.default_catalog(scope):
+            found = snapshot.lookup(scope["path"], self.stop_list.tenants.get(DEFAULT_TENANT))
+            if found is not None:
+                status, body = found
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": status,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()),
+                            (b"x-catalog-version", str(snapshot.version).encode()),
+                        ],
+                    }
+                )
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
+
+
+class PrimaryPinMiddleware:
+    def __init__(self, app: ASGIApp, seconds: int) -> None:
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.seconds
+                cookie = f"{PRIMARY_PIN_COOKIE}={until:.3f}; Max-Age={self.seconds}; Path=/; HttpOnly"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope, statements=[] if query_detector.enabled else None)
+        token = request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_stats.reset(token)
+            http_request_duration.observe(elapsed, scope["method"], stats.route, str(status))
+            db_statements_per_request.observe(stats.sql_count, stats.route)
+            if stats.statements is not None:
+                query_detector.check(scope["method"], stats.route, stats.statements)
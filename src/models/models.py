@@ -1,31 +1,94 @@
 from typing import Any
 
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 Base: Any = declarative_base()
 
+SEARCH_CONFIGS = ("russian", "simple")
+CHANGE_VERSION = text("pg_current_xact_id()::text::bigint")
+DEFAULT_TENANT = "default"
+
+
+def search_document(*columns: Any) -> Any:
+    document = func.coalesce(columns[0], literal_column("''"))
+    for column in columns[1:]:
+        document = document.op("||")(literal_column("' '")).op("||")(func.coalesce(column, literal_column("''")))
+    vectors = [func.to_tsvector(literal_column(f"'{config}'::regconfig"), document) for config in SEARCH_CONFIGS]
+    return vectors[0].op("||")(vectors[1])
+
+
+class Tenant(Base):
+    __tablename__ = "tenants"
+    id = Column(String, primary_key=True)
+    title = Column(String, nullable=False)
+    rate_limit = Column(Float)
+    max_items = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+def tenant_column(*foreign_key: Any) -> Column:
+    return Column(String, *foreign_key, server_default=DEFAULT_TENANT, nullable=False, index=True)
+
 
 class Menu(Base):
     __tablename__ = "menus"
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    tenant_id = tenant_column(ForeignKey("tenants.id", ondelete="CASCADE"))
     title = Column(String, index=True)
     description = Column(String, index=True)
 
+    search_vector = deferred(Column(TSVECTOR, Computed(search_document(title, description), persisted=True)))
+    version = Column(BigInteger, server_default=CHANGE_VERSION, nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_menus_search", "search_vector", postgresql_using="gin"),
+        UniqueConstraint("id", "tenant_id", name="uq_menus_id_tenant"),
+    )
+
 
 class SubMenu(Base):
     __tablename__ = "submenus"
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     title = Column(String, index=True)
     description = Column(String, index=True)
-    menu_id = Column(
-        Integer,
-        ForeignKey("menus.id", ondelete="CASCADE"),
-        nullable=False,
-    )
+    menu_id = Column(Integer, nullable=False)
+    tenant_id = tenant_column()
     menu = relationship("Menu", backref="submenus")
 
+    search_vector = deferred(Column(TSVECTOR, Computed(search_document(title, description), persisted=True)))
+    version = Column(BigInteger, server_default=CHANGE_VERSION, nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_submenus_search", "search_vector", postgresql_using="gin"),
+        ForeignKeyConstraint(
+            ["menu_id", "tenant_id"],
+            ["menus.id", "menus.tenant_id"],
+            name="submenus_menu_tenant_fkey",
+            ondelete="CASCADE",
+        ),
+        UniqueConstraint("id", "tenant_id", name="uq_submenus_id_tenant"),
+    )
+
 
 class Dish(Base):
     __tablename__ = "dishes"
@@ -33,12 +96,56 @@ class Dish(Base):
     title = Column(String, index=True)
     description = Column(String, index=True)
     price = Column(String)
-    submenu_id = Column(
-        Integer,
-        ForeignKey(
-            "submenus.id",
+    submenu_id = Column(Integer, nullable=False)
+    tenant_id = tenant_column()
+    submenu = relationship("SubMenu", backref="dishes")
+
+    search_vector = deferred(Column(TSVECTOR, Computed(search_document(title, description), persisted=True)))
+    version = Column(BigInteger, server_default=CHANGE_VERSION, nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_dishes_search", "search_vector", postgresql_using="gin"),
+        ForeignKeyConstraint(
+            ["submenu_id", "tenant_id"],
+            ["submenus.id", "submenus.tenant_id"],
+            name="dishes_submenu_tenant_fkey",
             ondelete="CASCADE",
         ),
-        nullable=False,
     )
-    submenu = relationship("SubMenu", backref="dishes")
+
+
+class MenuTranslation(Base):
+    __tablename__ = "menu_translations"
+    menu_id = Column(Integer, ForeignKey("menus.id", ondelete="CASCADE"), primary_key=True)
+    locale = Column(String, primary_key=True)
+    title = Column(String)
+    description = Column(String)
+
+
+class SubMenuTranslation(Base):
+    __tablename__ = "submenu_translations"
+    submenu_id = Column(Integer, ForeignKey("submenus.id", ondelete="CASCADE"), primary_key=True)
+    locale = Column(String, primary_key=True)
+    title = Column(String)
+    description = Column(String)
+
+
+class DishTranslation(Base):
+    __tablename__ = "dish_translations"
+    dish_id = Column(Integer, ForeignKey("dishes.id", ondelete="CASCADE"), primary_key=True)
+    locale = Column(String, primary_key=True)
+    title = Column(String)
+    description = Column(String)
+
+
+class CatalogTombstone(Base):
+    __tablename__ = "catalog_tombstones"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    tenant_id = tenant_column()
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    menu_id = Column(Integer)
+    submenu_id = Column(Integer)
+    version = Column(BigInteger, server_default=CHANGE_VERSION, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
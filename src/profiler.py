@@ -0,0 +1,96 @@
+import asyncio
+import inspect
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+
+from fastapi import Header
+from fastapi.exceptions import HTTPException
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND, HTTP_409_CONFLICT
+
+from src.query_detector import SERVICES_DIR
+from src.settings import settings
+
+IDLE = "idle"
+COROUTINE_FLAGS = inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    if code.co_filename.startswith(SERVICES_DIR) and code.co_varnames[:1] == ("self",):
+        owner = frame.f_locals.get("self")
+        if owner is not None:
+            return f"{type(owner).__name__}.{code.co_name}"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_name}".replace(";", ":")
+
+
+def thread_frames(thread_id: int) -> list[FrameType]:
+    frames = []
+    frame = sys._current_frames().get(thread_id)
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def code_path(frames: list[FrameType]) -> list[CodeType]:
+    return [frame.f_code for frame in frames]
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: int, interval: float, dispatch: list[CodeType]) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.dispatch = dispatch
+        self.samples: Counter[str] = Counter()
+
+    def sample(self) -> None:
+        frames = thread_frames(self.thread_id)
+        if not frames:
+            return
+        depth = len(self.dispatch)
+        if len(frames) <= depth or code_path(frames)[:depth] != self.dispatch:
+            self.samples[IDLE] += 1
+            return
+        top = frames[depth]
+        if not top.f_code.co_flags & COROUTINE_FLAGS:
+            self.samples[";".join(map(frame_label, frames))] += 1
+            return
+        self.samples[";".join([f"task:{frame_label(top)}"] + list(map(frame_label, frames[depth:])))] += 1
+
+    def run(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+profile_lock = asyncio.Lock()
+
+
+async def profile_worker(seconds: float, interval: float) -> str:
+    if profile_lock.locked():
+        raise HTTPException(status_code=HTTP_409_CONFLICT, detail="profiling is already running")
+    async with profile_lock:
+        task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("profile_worker must run inside an asyncio task")
+        dispatch = code_path(task.get_stack()[:-1])
+        profiler = SamplingProfiler(threading.get_ident(), interval, dispatch)
+        await asyncio.to_thread(profiler.run, seconds)
+    return profiler.collapsed()
+
+
+async def verify_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=HTTP_403_FORBIDDEN, detail="invalid admin token")
@@ -0,0 +1,81 @@
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from types import FrameType
+from typing import NamedTuple
+
+import greenlet
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "services")
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\bIN \((?:\?|\$\d+)(?:, (?:\?|\$\d+))*\)", re.IGNORECASE)
+UNKNOWN_ORIGIN = "unknown"
+
+
+class StatementRecord(NamedTuple):
+    statement: str
+    elapsed: float
+    origin: str
+
+
+def statement_shape(statement: str) -> str:
+    shape = LITERAL.sub("?", " ".join(statement.split()))
+    return IN_LIST.sub("IN (?)", shape)
+
+
+def statement_origin() -> str:
+    frame: FrameType | None = sys._getframe(1)
+    current = greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            owner = frame.f_locals.get("self")
+            if owner is not None and frame.f_code.co_filename.startswith(SERVICES_DIR):
+                return f"{type(owner).__name__}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return UNKNOWN_ORIGIN
+        frame = current.gr_frame
+
+
+class QueryDetector:
+    def __init__(self, enabled: bool, slow_ms: int, repeat_threshold: int, budget: int) -> None:
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.budget = budget
+        self.violations: list[str] = []
+
+    def check(self, method: str, route: str, statements: list[StatementRecord]) -> None:
+        shapes = Counter((statement_shape(record.statement), record.origin) for record in statements)
+        for (shape, origin), count in shapes.items():
+            if count >= self.repeat_threshold:
+                logger.warning("N+1 query in %s (%s %s): %s executed %s times", origin, method, route, shape, count)
+        for record in statements:
+            if record.elapsed * 1000 >= self.slow_ms:
+                logger.warning(
+                    "Slow query in %s (%s %s): %.1f ms %s",
+                    record.origin,
+                    method,
+                    route,
+                    record.elapsed * 1000,
+                    statement_shape(record.statement),
+                )
+        if self.budget and len(statements) > self.budget:
+            violation = f"{method} {route} executed {len(statements)} SQL statements, budget is {self.budget}"
+            logger.warning(violation)
+            self.violations.append(violation)
+
+
+query_detector = QueryDetector(
+    enabled=settings.QUERY_DETECTOR,
+    slow_ms=settings.SLOW_QUERY_MS,
+    repeat_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    budget=settings.QUERY_BUDGET,
+)
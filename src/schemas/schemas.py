@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class BaseMenu(BaseModel):
@@ -148,6 +148,7 @@ class DishUpdate(BaseDish):
 
 class Dish(BaseDish):
     id: str
+    available: bool = True
 
     class Config:
         schema_extra = {
@@ -156,6 +157,18 @@ class Dish(BaseDish):
                 "title": "Dish title",
                 "description": "Dish description",
                 "price": "22.87",
+                "available": True,
+            },
+        }
+
+
+class DishAvailability(BaseModel):
+    available: bool
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "available": False,
             },
         }
 
@@ -171,3 +184,148 @@ class DishDelete(BaseModel):
                 "message": "The dish has been deleted",
             },
         }
+
+
+class SearchResult(BaseModel):
+    type: str
+    id: str
+    title: str
+    description: str
+    menu_id: str
+    submenu_id: str | None = None
+    rank: float
+
+    class Config:
+        orm_mode = True
+        schema_extra = {
+            "example": {
+                "type": "dish",
+                "id": "1",
+                "title": "Dish title",
+                "description": "Dish description",
+                "menu_id": "1",
+                "submenu_id": "1",
+                "rank": 0.0607927,
+            },
+        }
+
+
+class CatalogMenuChange(BaseModel):
+    id: str
+    title: str
+    description: str
+    version: int
+
+    class Config:
+        orm_mode = True
+
+
+class CatalogSubMenuChange(BaseModel):
+    id: str
+    menu_id: str
+    title: str
+    description: str
+    version: int
+
+    class Config:
+        orm_mode = True
+
+
+class CatalogDishChange(BaseModel):
+    id: str
+    submenu_id: str
+    title: str
+    description: str
+    price: str
+    version: int
+
+    class Config:
+        orm_mode = True
+
+
+class CatalogDeletion(BaseModel):
+    type: str
+    id: str
+    menu_id: str | None = None
+    submenu_id: str | None = None
+    version: int
+
+    class Config:
+        orm_mode = True
+
+
+class CatalogChanges(BaseModel):
+    version: int
+    menus: list[CatalogMenuChange]
+    submenus: list[CatalogSubMenuChange]
+    dishes: list[CatalogDishChange]
+    deleted: list[CatalogDeletion]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "version": 1042,
+                "menus": [],
+                "submenus": [],
+                "dishes": [
+                    {
+                        "id": "1",
+                        "submenu_id": "1",
+                        "title": "Dish title",
+                        "description": "Dish description",
+                        "price": "22.87",
+                        "version": 1040,
+                    },
+                ],
+                "deleted": [{"type": "dish", "id": "2", "menu_id": "1", "submenu_id": "1", "version": 1041}],
+            },
+        }
+
+
+class TenantCreate(BaseModel):
+    id: str = Field(regex=r"^[a-z0-9][a-z0-9_-]{0,62}$")
+    title: str
+    rate_limit: float | None = Field(default=None, gt=0)
+    max_items: int | None = Field(default=None, ge=0)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "id": "cafe-centralnoe",
+                "title": "Кафе «Центральное»",
+                "rate_limit": 50,
+                "max_items": 5000,
+            },
+        }
+
+
+class Tenant(TenantCreate):
+    class Config:
+        orm_mode = True
+
+
+class TranslationUpdate(BaseModel):
+    title: str | None = None
+    description: str | None = None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "title": "Menu title",
+                "description": "Menu description",
+            },
+        }
+
+
+class Translation(TranslationUpdate):
+    locale: str
+
+    class Config:
+        orm_mode = True
+        schema_extra = {
+            "example": {
+                "locale": "en",
+                "title": "Menu title",
+                "description": "Menu description",
+            },
+        }
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from src.db.database import close_db, init_db
+from src.services.services import warm_up_cache
+from src.settings import settings
+
+
+def prepare_metrics_dir(workers: int) -> None:
+    directory = settings.METRICS_DIR
+    if directory is None:
+        if workers < 2 or not settings.METRICS_ENABLED:
+            return
+        directory = tempfile.mkdtemp(prefix="menu-metrics-")
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    for path in Path(directory).glob("*.json*"):
+        path.unlink()
+    os.environ["METRICS_DIR"] = directory
+
+
+async def prepare() -> None:
+    if settings.INIT_DB_ON_STARTUP:
+        await init_db()
+    if settings.CACHE_WARMUP_ON_STARTUP:
+        await warm_up_cache()
+    await close_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Запуск API в несколько воркеров")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WEB_CONCURRENCY or os.cpu_count() or 1,
+        help="Число воркеров, по умолчанию по числу ядер",
+    )
+    args = parser.parse_args()
+    asyncio.run(prepare())
+    prepare_metrics_dir(args.workers)
+    limit_concurrency = settings.WEB_LIMIT_CONCURRENCY
+    if limit_concurrency is not None:
+        limit_concurrency += settings.CHANGES_MAX_CLIENTS
+    os.environ["INIT_DB_ON_STARTUP"] = "false"
+    os.environ["CACHE_WARMUP_ON_STARTUP"] = "false"
+    uvicorn.run(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="auto",
+        http="auto",
+        proxy_headers=True,
+        backlog=settings.WEB_BACKLOG,
+        limit_concurrency=limit_concurrency,
+        limit_max_requests=settings.WEB_LIMIT_MAX_REQUESTS,
+        timeout_keep_alive=settings.WEB_KEEP_ALIVE,
+    )
+
+
+if __name__ == "__main__":
+    main()
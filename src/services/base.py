@@ -1,9 +1,10 @@
 from typing import Any
 
 from src.crud.cache import RedisCache
+from src.limits import LimitedCrud
 
 
 class BaseService:
     def __init__(self, crud: Any, cache: RedisCache) -> None:
-        self.crud = crud
+        self.crud = LimitedCrud(crud)
         self.cache = cache
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+
+import aioredis
+from fastapi.exceptions import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from src.crud.cache import CATALOG_CHANGES_STREAM, CATALOG_VERSION_KEY
+from src.db.redis_config import REDIS_URL
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 1.0
+READ_BLOCK_MS = 5000
+READ_COUNT = 100
+KEEPALIVE = b": keepalive\n\n"
+
+
+def stream_position(event_id: str) -> tuple[int, int]:
+    milliseconds, _, sequence = event_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def format_event(event_id: str, event: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode()
+
+
+def event_tenant(fields: dict) -> str:
+    tenant = fields.get(b"tenant")
+    return tenant.decode() if tenant else DEFAULT_TENANT
+
+
+class ChangeHub:
+    def __init__(
+        self,
+        max_clients: int = settings.CHANGES_MAX_CLIENTS,
+        queue_size: int = settings.CHANGES_QUEUE_SIZE,
+    ) -> None:
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self.clients: dict[asyncio.Queue, str] = {}
+        self._task: asyncio.Task | None = None
+
+    def check_capacity(self) -> None:
+        if len(self.clients) >= self.max_clients:
+            raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail="too many change subscribers")
+
+    async def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        cache = aioredis.from_url(REDIS_URL)
+        try:
+            last = await cache.xrevrange(CATALOG_CHANGES_STREAM, "+", "-", count=1)
+        finally:
+            await cache.close()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._read(last[0][0].decode() if last else "0-0"))
+
+    def subscribe(self, tenant: str = DEFAULT_TENANT) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.clients[queue] = tenant
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.clients.pop(queue, None)
+
+    def broadcast(self, event_id: str, data: str, tenant: str = DEFAULT_TENANT) -> None:
+        for queue, subscriber in list(self.clients.items()):
+            if subscriber != tenant:
+                continue
+            try:
+                queue.put_nowait((event_id, data))
+            except asyncio.QueueFull:
+                self.disconnect(queue)
+
+    def disconnect(self, queue: asyncio.Queue) -> None:
+        self.clients.pop(queue, None)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def stop(self) -> None:
+        for queue in list(self.clients):
+            self.disconnect(queue)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def stream(
+        self,
+        last_event_id: str | None = None,
+        tenant: str = DEFAULT_TENANT,
+        keepalive: float = settings.CHANGES_KEEPALIVE,
+        max_age: float = settings.CHANGES_MAX_AGE,
+    ) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_age
+        await self.start()
+        queue = self.subscribe(tenant)
+        try:
+            yield f"retry: {settings.CHANGES_RETRY_MS}\n\n".encode()
+            position = None
+            if last_event_id:
+                events, position = await self.replay(last_event_id, tenant)
+                for event in events:
+                    yield event
+            while (timeout := min(keepalive, deadline - loop.time())) > 0:
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                if change is None:
+                    return
+                event_id, data = change
+                if position is None or stream_position(event_id) > position:
+                    yield format_event(event_id, "change", data)
+        finally:
+            self.unsubscribe(queue)
+
+    async def replay(
+        self, last_event_id: str, tenant: str = DEFAULT_TENANT
+    ) -> tuple[list[bytes], tuple[int, int] | None]:
+        cache = aioredis.from_url(REDIS_URL)
+        try:
+            try:
+                position = stream_position(last_event_id)
+            except ValueError:
+                return [await self.reset(cache)], None
+            first = await cache.xrange(CATALOG_CHANGES_STREAM, "-", "+", count=1)
+            trimmed = bool(first) and stream_position(first[0][0].decode()) > position
+            if trimmed and await cache.xlen(CATALOG_CHANGES_STREAM) >= settings.CHANGES_STREAM_LENGTH:
+                return [await self.reset(cache)], None
+            entries = await cache.xrange(CATALOG_CHANGES_STREAM, f"({position[0]}-{position[1]}", "+")
+        finally:
+            await cache.close()
+        events = []
+        for event_id, fields in entries:
+            if event_tenant(fields) == tenant:
+                events.append(format_event(event_id.decode(), "change", fields[b"data"].decode()))
+            position = stream_position(event_id.decode())
+        return events, position
+
+    async def reset(self, cache: aioredis.Redis) -> bytes:
+        last = await cache.xrevrange(CATALOG_CHANGES_STREAM, "+", "-", count=1)
+        version = int(await cache.get(CATALOG_VERSION_KEY) or 0)
+        return format_event(last[0][0].decode() if last else "0-0", "reset", json.dumps({"version": version}))
+
+    async def _read(self, last_id: str) -> None:
+        while True:
+            cache = aioredis.from_url(REDIS_URL)
+            try:
+                while True:
+                    response = await cache.xread(
+                        {CATALOG_CHANGES_STREAM: last_id},
+                        count=READ_COUNT,
+                        block=READ_BLOCK_MS,
+                    )
+                    for _, entries in response:
+                        for event_id, fields in entries:
+                            last_id = event_id.decode()
+                            self.broadcast(last_id, fields[b"data"].decode(), event_tenant(fields))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Catalog change stream read failed")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                await cache.close()
+
+
+change_hub = ChangeHub()
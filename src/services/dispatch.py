@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from uuid import uuid4
+
+from fastapi.exceptions import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def celery_publish(name: str, kwargs: dict, task_id: str, options: dict) -> None:
+    from src.celery.tasks import app_celery
+
+    app_celery.send_task(name, kwargs=kwargs, task_id=task_id, retry=False, **options)
+
+
+class TaskDispatcher:
+    def __init__(
+        self,
+        publish: Callable[[str, dict, str, dict], None] = celery_publish,
+        timeout: float = settings.DISPATCH_TIMEOUT,
+        retry_delay: float = settings.DISPATCH_RETRY_DELAY,
+        backlog_size: int = settings.DISPATCH_BACKLOG,
+        threads: int = settings.DISPATCH_THREADS,
+    ) -> None:
+        self.publish = publish
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.backlog: deque[tuple[str, dict, str, dict]] = deque()
+        self.backlog_size = backlog_size
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="task-dispatch")
+        self._retry_task: asyncio.Task | None = None
+
+    async def send(self, name: str, kwargs: dict, task_id: str | None = None, **options) -> str:
+        task_id = task_id or str(uuid4())
+        if self.backlog:
+            self._defer(name, kwargs, task_id, options)
+            return task_id
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(self.publish, name, kwargs, task_id, options)
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Publishing task %s is slow, not waiting for the broker", task_id)
+            future.add_done_callback(partial(self._on_late_publish, name, kwargs, task_id, options))
+        except Exception:
+            logger.exception("Publishing task %s failed", task_id)
+            self._defer(name, kwargs, task_id, options)
+        return task_id
+
+    async def stop(self) -> None:
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            await asyncio.gather(self._retry_task, return_exceptions=True)
+            self._retry_task = None
+
+    def _on_late_publish(self, name: str, kwargs: dict, task_id: str, options: dict, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Publishing task %s failed after timeout", task_id, exc_info=future.exception())
+            self._defer(name, kwargs, task_id, options, check_size=False)
+
+    def _defer(self, name: str, kwargs: dict, task_id: str, options: dict, check_size: bool = True) -> None:
+        if check_size and len(self.backlog) >= self.backlog_size:
+            raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail="task broker unavailable")
+        self.backlog.append((name, kwargs, task_id, options))
+        if self._retry_task is None or self._retry_task.done():
+            self._retry_task = asyncio.get_running_loop().create_task(self._retry())
+
+    async def _retry(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.backlog:
+            name, kwargs, task_id, options = self.backlog[0]
+            try:
+                await loop.run_in_executor(self._executor, partial(self.publish, name, kwargs, task_id, options))
+            except Exception:
+                logger.warning("Broker still unavailable, %s tasks are waiting", len(self.backlog))
+                await asyncio.sleep(self.retry_delay)
+                continue
+            self.backlog.popleft()
+
+
+task_dispatcher = TaskDispatcher()
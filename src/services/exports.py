@@ -0,0 +1,176 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.celery import storage
+from src.services.dispatch import TaskDispatcher, task_dispatcher
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CeleryExportBackend:
+    def __init__(self, dispatcher: TaskDispatcher = task_dispatcher) -> None:
+        self.dispatcher = dispatcher
+
+    async def submit(self, data: dict, priority: int, name: str) -> str:
+        from src.celery.tasks import broker_priority
+
+        await self.dispatcher.send(
+            "create_excel",
+            {"data": data, "name": name},
+            task_id=name,
+            priority=broker_priority(priority),
+        )
+        return name
+
+    async def stop(self) -> None:
+        await self.dispatcher.stop()
+
+
+class ProcessExportBackend:
+    def __init__(self, processes: int | None = settings.EXPORT_PROCESSES) -> None:
+        self.processes = processes or multiprocessing.cpu_count()
+        self._executor: ProcessPoolExecutor | None = None
+        self._chunks: asyncio.PriorityQueue | None = None
+        self._order = itertools.count()
+        self.jobs: dict[str, asyncio.Task] = {}
+        self._workers: list[asyncio.Task] = []
+
+    async def submit(self, data: dict, priority: int, name: str) -> str:
+        if name in self.jobs:
+            return name
+        self._start()
+        job = asyncio.create_task(self.run(name, data, priority))
+        self.jobs[name] = job
+        job.add_done_callback(partial(self._finished, name))
+        return name
+
+    async def run(self, name: str, data: dict, priority: int) -> None:
+        from src.celery import tasks
+
+        try:
+            await self.export(name, data, priority)
+        except Exception:
+            await asyncio.to_thread(tasks.fail_export, name)
+            raise
+
+    async def export(self, name: str, data: dict, priority: int) -> None:
+        from src.celery import tasks
+
+        if tasks.export_format(name) != "xlsx":
+            await asyncio.to_thread(tasks.export_catalog, name, data)
+            return
+        queue = self._chunks
+        if queue is None:
+            raise RuntimeError("process export backend is stopped")
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.to_thread(tasks.catalog_chunks, data)
+        futures = []
+        for rows, start in zip(chunks, tasks.chunk_starts(chunks)):
+            future = loop.create_future()
+            queue.put_nowait((-priority, next(self._order), rows, start, future))
+            futures.append(future)
+        fragments = await asyncio.gather(*futures)
+        await asyncio.to_thread(tasks.store, name, partial(tasks.write_workbook, fragments=fragments))
+
+    async def stop(self) -> None:
+        tasks = list(self.jobs.values()) + self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.jobs = {}
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._chunks = None
+
+    def _start(self) -> None:
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        self._chunks = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._render_chunks(self._chunks)) for _ in range(self.processes)]
+
+    async def _render_chunks(self, queue: asyncio.PriorityQueue) -> None:
+        from src.celery.tasks import render_rows
+
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, rows, start, future = await queue.get()
+            if future.done():
+                continue
+            try:
+                fragment = await loop.run_in_executor(self._executor, render_rows, rows, start)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if not future.done():
+                future.set_result(fragment)
+
+    def _finished(self, name: str, job: asyncio.Task) -> None:
+        self.jobs.pop(name, None)
+        if not job.cancelled() and job.exception() is not None:
+            logger.error("Export failed", exc_info=job.exception())
+
+
+class EagerExportBackend:
+    async def submit(self, data: dict, priority: int, name: str) -> str:
+        from src.celery.tasks import export_catalog
+
+        await asyncio.to_thread(export_catalog, name, data)
+        return name
+
+    async def stop(self) -> None:
+        pass
+
+
+class ExportJanitor:
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                removed = await asyncio.to_thread(storage.cleanup, settings.EXPORT_TTL)
+                if removed:
+                    logger.info("Removed %s expired exports", removed)
+            except Exception:
+                logger.exception("Export cleanup failed")
+            await asyncio.sleep(settings.EXPORT_CLEANUP_INTERVAL)
+
+
+export_janitor = ExportJanitor()
+
+EXPORT_BACKENDS = {
+    "celery": CeleryExportBackend,
+    "process": ProcessExportBackend,
+    "eager": EagerExportBackend,
+}
+export_backends: dict = {}
+
+
+def get_export_backend():
+    if settings.EXPORT_BACKEND not in export_backends:
+        export_backends[settings.EXPORT_BACKEND] = EXPORT_BACKENDS[settings.EXPORT_BACKEND]()
+    return export_backends[settings.EXPORT_BACKEND]
+
+
+async def stop_export_backends() -> None:
+    for backend in export_backends.values():
+        await backend.stop()
+    export_backends.clear()
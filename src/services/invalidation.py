@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+
+import asyncpg
+
+from src.crud.cache import (
+    CACHED_TENANTS_KEY,
+    CATALOG_FAMILIES,
+    RedisCache,
+    catalog_keys,
+)
+from src.db.database import DATABASE_URL
+from src.db.redis_config import get_connection_pool
+from src.db.triggers import CATALOG_CHANNEL
+from src.metrics import InstrumentedRedis
+from src.models.models import DEFAULT_TENANT
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 1.0
+STANDBY_DELAY = 5.0
+LISTENER_LOCK_ID = 7310
+BATCH_SIZE = 500
+
+
+def keys_for_change(change: dict) -> tuple[list[str], list[str]]:
+    cascade = change["op"] == "DELETE"
+    if change["table"] == "menus":
+        return catalog_keys(change["id"], cascade=cascade)
+    if change["menu_id"] is None:
+        return [], []
+    if change["table"] == "submenus":
+        return catalog_keys(change["menu_id"], submenu_id=change["id"], cascade=cascade)
+    return catalog_keys(change["menu_id"], submenu_id=change["submenu_id"], dish_id=change["id"])
+
+
+class CacheInvalidationListener:
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[dict] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._consume()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self._queue.put_nowait(json.loads(payload))
+
+    async def _listen(self) -> None:
+        reconnected = False
+        while True:
+            try:
+                connection = await asyncpg.connect(DATABASE_URL)
+            except Exception:
+                logger.exception("Catalog change listener cannot connect")
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            leader = False
+            try:
+                leader = await connection.fetchval("SELECT pg_try_advisory_lock($1)", LISTENER_LOCK_ID)
+                if leader:
+                    await connection.add_listener(CATALOG_CHANNEL, self._on_notification)
+                    if reconnected:
+                        self._queue.put_nowait({"table": "*"})
+                    reconnected = True
+                    await closed.wait()
+                    logger.warning("Catalog change listener connection lost")
+            finally:
+                await connection.close()
+            if not leader:
+                reconnected = True
+                await asyncio.sleep(STANDBY_DELAY)
+                continue
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _consume(self) -> None:
+        while True:
+            changes = [await self._queue.get()]
+            while not self._queue.empty() and len(changes) < BATCH_SIZE:
+                changes.append(self._queue.get_nowait())
+            try:
+                await self._invalidate(changes)
+            except Exception:
+                logger.exception("Catalog cache invalidation failed")
+
+    async def _invalidate(self, changes: list[dict]) -> None:
+        redis = InstrumentedRedis(connection_pool=get_connection_pool())
+        try:
+            keys: dict[str, set[str]] = {}
+            prefixes: dict[str, set[str]] = {}
+            for change in changes:
+                if change["table"] == "*":
+                    for tenant in await redis.smembers(CACHED_TENANTS_KEY):
+                        prefixes.setdefault(tenant.decode(), set()).update(CATALOG_FAMILIES)
+                    continue
+                tenant = change.get("tenant_id") or DEFAULT_TENANT
+                change_keys, change_prefixes = keys_for_change(change)
+                keys.setdefault(tenant, set()).update(change_keys)
+                prefixes.setdefault(tenant, set()).update(change_prefixes)
+            for tenant in keys.keys() | prefixes.keys():
+                cache = RedisCache(cache=redis, tenant=tenant)
+                if keys.get(tenant):
+                    await cache.delete_one(list(keys[tenant]))
+                for prefix in prefixes.get(tenant, ()):
+                    await cache.delete_all(prefix)
+        finally:
+            await redis.close()
+
+
+invalidation_listener = CacheInvalidationListener()
@@ -1,102 +1,180 @@
+import asyncio
 import json
+import re
+from collections.abc import Callable
+from typing import Any
 
 import aiofiles  # type: ignore
+import aioredis
 from aioredis import Redis
 from fastapi import Depends
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse, Response
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.status import HTTP_404_NOT_FOUND
+from starlette.status import (
+    HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
 
-from src.celery.tasks import app_celery
-from src.crud.cache import RedisCache
-from src.crud.crud import DishCrud, MenuCrud, SubmenuCrud, TestDataCrud
-from src.db.database import get_session
-from src.db.redis_config import get_cache
+from src.celery import storage
+from src.crud.cache import CATALOG_FAMILIES, RedisCache, projection_key
+from src.crud.crud import (
+    CatalogCrud,
+    DishCrud,
+    MenuCrud,
+    SearchCrud,
+    SubmenuCrud,
+    SyncCrud,
+    TenantCrud,
+    TestDataCrud,
+)
+from src.db.database import SessionLocal, get_read_session, get_session, read_cache_ttl
+from src.db.redis_config import REDIS_URL, get_cache
+from src.fields import project, selected
+from src.locales import get_locale
 from src.schemas.schemas import (
     Dish,
+    DishAvailability,
     DishCreate,
     DishUpdate,
     Menu,
     MenuCreate,
     MenuUpdate,
+    SearchResult,
     SubMenu,
     SubMenuCreate,
     SubMenuUpdate,
+    Tenant,
+    TenantCreate,
+    Translation,
+    TranslationUpdate,
 )
 from src.services.base import BaseService
+from src.services.exports import get_export_backend
+from src.services.stoplist import stop_list
+from src.settings import settings
+from src.tenants import get_tenant, tenant_registry
+
+EXPORT_PRIORITY_SMALL = 9
+EXPORT_PRIORITY_LARGE = 1
+DELETED_TYPES = {"menus": "menu", "submenus": "submenu", "dishes": "dish"}
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "json": "application/json",
+    "csv.gz": "application/gzip",
+    "json.gz": "application/gzip",
+}
+
+
+def catalog_change(op: str, kind: str, schema: type[BaseModel] | None = None, item: Any = None, **ids: int) -> dict:
+    change: dict[str, Any] = {"op": op, "type": kind, **{name: str(value) for name, value in ids.items()}}
+    if schema is not None:
+        change["data"] = schema.validate(item).dict()
+    return change
 
 
 class MenuServices(BaseService):
-    async def get_list_menus(self) -> list[Menu]:
-        redis_key = "menu:list"
-        menus = await self.cache.get(redis_key)
+    async def get_list_menus(self, fields: tuple[str, ...] | None = None) -> list[Menu]:
+        redis_key = projection_key("menu:list", fields)
+        menus = await self.cache.get_response(redis_key)
         if not menus:
-            res = await self.crud.get_menu_list()
-            menus = []
-            for item in res:
-                menu = dict()
-                submenus_count = await self.crud.get_submenus_count(id=item.id)
-                dishes_count = await self.crud.get_dishes_count(id=item.id)
-                menu["id"] = item.id
-                menu["title"] = item.title
-                menu["description"] = item.description
-                menu["submenus_count"] = submenus_count
-                menu["dishes_count"] = dishes_count
-                menus.append(menu)
+            res = await self.crud.get_menu_list(fields=fields)
+            menus = [project(dict(item), fields) for item in res]
             await self.cache.set(redis_key, menus)
         return menus
 
-    async def get_menu(self, id: int) -> Menu:
-        redis_key = f"menu:{id}"
-        menu = await self.cache.get(redis_key)
+    async def get_menu(self, id: int, fields: tuple[str, ...] | None = None) -> Menu:
+        redis_key = projection_key(f"menu:{id}", fields)
+        menu = await self.cache.get_response(redis_key)
         if not menu:
-            menu = await self.crud.get_menu(id=id)
+            menu = await self.crud.get_menu(id=id, fields=fields)
             self.menu_empty(not menu)
             menu = dict(menu)
-            submenus_count = await self.crud.get_submenus_count(id=id)
-            dishes_count = await self.crud.get_dishes_count(id=id)
-            menu["submenus_count"] = submenus_count
-            menu["dishes_count"] = dishes_count
+            if selected(fields, "submenus_count"):
+                menu["submenus_count"] = await self.crud.get_submenus_count(id=id)
+            if selected(fields, "dishes_count"):
+                menu["dishes_count"] = await self.crud.get_dishes_count(id=id)
+            menu = project(menu, fields)
             await self.cache.set(redis_key, menu)
         return menu
 
     async def create_menu(self, menu: MenuCreate) -> Menu:
-        await self.cache.delete_one(["menu:list"])
         data = jsonable_encoder(menu)
-        return await self.crud.create_menu(data)
+        new_menu = await self.crud.create_menu(data)
+        await self.cache.invalidate(menu_id=new_menu.id)
+        await self.cache.bump_version(catalog_change("created", "menu", Menu, new_menu, id=new_menu.id))
+        return new_menu
 
     async def update_menu(self, id: int, menu: MenuUpdate) -> Menu:
-        redis_key = [f"menu:{id}", "menu:list"]
         current_menu = await self.crud.get_menu(id=id)
         self.menu_empty(not current_menu)
-        await self.cache.delete_one(redis_key)
         await self.crud.update_menu(id=id, title=menu.title, description=menu.description)
-        return await self.get_menu(id=id)
+        await self.cache.invalidate(menu_id=id)
+        updated = await self.get_menu(id=id)
+        await self.cache.bump_version(catalog_change("updated", "menu", Menu, updated, id=id))
+        return updated
 
     async def delete_menu(self, id: int) -> dict:
-        redis_keys = [f"menu:{id}", "menu:list"]
         menu = await self.crud.get_menu(id=id)
         self.menu_empty(not menu)
-        await self.crud.delete_menu(id=id)
-        await self.cache.delete_one(redis_keys)
-        await self.cache.delete_all(f"submenu:{id}:")
-        await self.cache.delete_all(f"dish:{menu.id}:")
+        dish_ids = await self.crud.delete_menu(id=id)
+        await self.cache.invalidate(menu_id=id, cascade=True)
+        await stop_list.set_available(self.cache, dish_ids, True)
+        await self.cache.bump_version(catalog_change("deleted", "menu", id=id))
         return {"status": True, "message": "The menu has been deleted"}
 
-    async def create_menu_excel_file(self) -> dict:
-        data = await self.crud.get_all_data_from_menus_submenus_dishes()
-        task = app_celery.send_task("create_excel", kwargs={"data": data})
-        return {"task_id": task.id}
+    async def create_menu_excel_file(self, export_format: str = "xlsx", compress: bool = False) -> dict:
+        from src.celery.tasks import export_name
 
-    async def get_menu_excel_file(self, id: str) -> dict:
+        if compress and export_format != "xlsx":
+            export_format = f"{export_format}.gz"
+        data = await self.crud.get_all_data_from_menus_submenus_dishes()
+        name = await asyncio.to_thread(export_name, data, export_format)
+        if await asyncio.to_thread(storage.export_storage.exists, name):
+            await asyncio.to_thread(storage.export_storage.touch, name)
+            return {"task_id": name}
+        await asyncio.to_thread(storage.export_storage.delete, storage.failed_name(name))
+        rows = sum(len(data[key] or []) for key in ("menus", "submenus", "dishes"))
+        priority = EXPORT_PRIORITY_SMALL if rows <= settings.EXPORT_CHUNK_ROWS else EXPORT_PRIORITY_LARGE
+        task_id = await get_export_backend().submit(data, priority, name)
+        return {"task_id": task_id}
+
+    async def get_menu_excel_file(self, id: str) -> Response:
+        name = id if "." in id else f"{id}.xlsx"
+        export_format = name.split(".", 1)[1]
+        if export_format not in EXPORT_MEDIA_TYPES or not await asyncio.to_thread(storage.export_storage.exists, name):
+            if await asyncio.to_thread(storage.export_storage.exists, storage.failed_name(name)):
+                raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail="export failed")
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="file not found")
+        if isinstance(storage.export_storage, storage.S3Storage):
+            return RedirectResponse(await asyncio.to_thread(storage.export_storage.url, name))
+        filename = f"Menu.{export_format}"
+        if settings.EXPORT_ACCEL_REDIRECT:
+            return Response(
+                headers={
+                    "X-Accel-Redirect": f"{settings.EXPORT_ACCEL_REDIRECT.rstrip('/')}/{name}",
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                },
+                media_type=EXPORT_MEDIA_TYPES[export_format],
+            )
         return FileResponse(
-            path=f"/uploads/{id}.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            filename="Menu.xlsx",
+            path=storage.export_storage.path(name),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            filename=filename,
         )
 
+    async def set_translation(self, id: int, locale: str, translation: TranslationUpdate) -> Translation:
+        menu = await self.crud.get_menu(id=id)
+        self.menu_empty(not menu)
+        result = await self.crud.set_translation(id, locale, translation.dict())
+        await self.cache.invalidate(menu_id=id)
+        await self.cache.bump_version(catalog_change("updated", "menu", Menu, menu, id=id))
+        return result
+
     def menu_empty(self, empty: bool) -> None:
         if empty:
             raise HTTPException(
@@ -106,36 +184,29 @@ class MenuServices(BaseService):
 
 
 class SubmenuServices(BaseService):
-    async def get_submenu(self, id: int, menu_id: int) -> SubMenu:
-        redis_key = f"submenu:{menu_id}:{id}"
-        submenu = await self.cache.get(redis_key)
+    async def get_submenu(self, id: int, menu_id: int, fields: tuple[str, ...] | None = None) -> SubMenu:
+        redis_key = projection_key(f"submenu:{menu_id}:{id}", fields)
+        submenu = await self.cache.get_response(redis_key)
         if not submenu:
-            submenu = await self.crud.get_submenu(id=id)
+            submenu = await self.crud.get_submenu(id=id, menu_id=menu_id, fields=fields)
             self.submenu_empty(not submenu)
-            dishes_count = await self.crud.get_dishes_count(
-                id=int(submenu.id),
-            )
             submenu = dict(submenu)
-            submenu["dishes_count"] = dishes_count
+            if selected(fields, "dishes_count"):
+                submenu["dishes_count"] = await self.crud.get_dishes_count(
+                    id=int(submenu["id"]),
+                )
+            submenu = project(submenu, fields)
             await self.cache.set(key=redis_key, value=submenu)
         return submenu
 
-    async def get_submenu_list(self, menu_id: int) -> list[SubMenu]:
-        redis_key = f"submenu:{menu_id}:list"
-        submenus = await self.cache.get(redis_key)
+    async def get_submenu_list(self, menu_id: int, fields: tuple[str, ...] | None = None) -> list[SubMenu]:
+        redis_key = projection_key(f"submenu:{menu_id}:list", fields)
+        submenus = await self.cache.get_response(redis_key)
         if not submenus:
-            result = await self.crud.get_submenu_list(menu_id=menu_id)
-            submenus = []
-            for item in result:
-                submenu = dict()
-                dishes_count = await self.crud.get_dishes_count(
-                    id=int(item.id),
-                )
-                submenu["id"] = item.id
-                submenu["title"] = item.title
-                submenu["description"] = item.description
-                submenu["dishes_count"] = dishes_count
-                submenus.append(submenu)
+            result = await self.crud.get_submenu_list(menu_id=menu_id, fields=fields)
+            if result is None:
+                return []
+            submenus = [project(dict(item), fields) for item in result]
             await self.cache.set(redis_key, submenus)
         return submenus
 
@@ -144,14 +215,15 @@ class SubmenuServices(BaseService):
         submenu: SubMenuCreate,
         menu_id: int,
     ) -> SubMenu:
-        redis_keys = [
-            f"menu:{menu_id}",
-            "menu:list",
-            f"submenu:{menu_id}:list",
-        ]
-        await self.cache.delete_one(redis_keys)
+        if not await self.crud.menu_exists(menu_id):
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="menu not found")
         data = jsonable_encoder(submenu)
-        return await self.crud.create_submenu(data, id=menu_id)
+        new_submenu = await self.crud.create_submenu(data, id=menu_id)
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=new_submenu.id)
+        await self.cache.bump_version(
+            catalog_change("created", "submenu", SubMenu, new_submenu, id=new_submenu.id, menu_id=menu_id),
+        )
+        return new_submenu
 
     async def update_submenu(
         self,
@@ -159,38 +231,38 @@ class SubmenuServices(BaseService):
         menu_id: int,
         submenu: SubMenuUpdate,
     ) -> SubMenu:
-        redis_keys = [
-            f"menu:{menu_id}",
-            "menu:list",
-            f"submenu:{menu_id}:list",
-            f"submenu:{menu_id}:{id}",
-        ]
         current_submenu = await self.get_submenu(
             id=id,
             menu_id=menu_id,
         )
         self.submenu_empty(not current_submenu)
-        await self.cache.delete_one(redis_keys)
         await self.crud.update_submenu(
             id=id,
             title=submenu.title,
             description=submenu.description,
         )
-        return await self.get_submenu(id=id, menu_id=menu_id)
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=id)
+        updated = await self.get_submenu(id=id, menu_id=menu_id)
+        await self.cache.bump_version(catalog_change("updated", "submenu", SubMenu, updated, id=id, menu_id=menu_id))
+        return updated
 
     async def delete_submenu(self, id: int, menu_id: int) -> dict:
-        submenu = await self.crud.get_submenu(id)
+        submenu = await self.crud.get_submenu(id=id, menu_id=menu_id)
         self.submenu_empty(not submenu)
-        await self.crud.delete_submenu(id=id)
-        redis_keys = [
-            f"menu:{menu_id}",
-            "menu:list",
-            f"submenu:{menu_id}:list",
-            f"submenu:{menu_id}:{id}",
-        ]
-        await self.cache.delete_one(redis_keys)
+        dish_ids = await self.crud.delete_submenu(id=id)
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=id, cascade=True)
+        await stop_list.set_available(self.cache, dish_ids, True)
+        await self.cache.bump_version(catalog_change("deleted", "submenu", id=id, menu_id=menu_id))
         return {"status": True, "message": "The submenu has been deleted"}
 
+    async def set_translation(self, id: int, menu_id: int, locale: str, translation: TranslationUpdate) -> Translation:
+        submenu = await self.crud.get_submenu(id=id, menu_id=menu_id)
+        self.submenu_empty(not submenu)
+        result = await self.crud.set_translation(id, locale, translation.dict())
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=id)
+        await self.cache.bump_version(catalog_change("updated", "submenu", SubMenu, submenu, id=id, menu_id=menu_id))
+        return result
+
     def submenu_empty(self, empty: bool) -> None:
         if empty:
             raise HTTPException(
@@ -205,27 +277,64 @@ class DishServices(BaseService):
         id: int,
         menu_id: int,
         submenu_id: int,
-    ) -> Dish:
-        redis_key = f"dish:{menu_id}:{submenu_id}:{id}"
-        dish = await self.cache.get(redis_key)
+        fields: tuple[str, ...] | None = None,
+    ) -> Dish | Response:
+        catalog = self.catalog_fields(fields)
+        redis_key = projection_key(f"dish:{menu_id}:{submenu_id}:{id}", fields)
+        unavailable = await self.unavailable(fields)
+        dish = await self.cache.get_response(redis_key, servable=self.servable(unavailable, many=False))
+        if isinstance(dish, Response):
+            return dish
         if not dish:
-            dish = await self.crud.get_dish(id=id)
+            dish = await self.crud.get_dish(id=id, menu_id=menu_id, submenu_id=submenu_id, fields=catalog)
             self.dish_empty(not dish)
-            dish = dict(dish)
+            dish = project(dict(dish), catalog)
             await self.cache.set(key=redis_key, value=dish)
-        return dish
+        return self.with_availability([dish], fields, unavailable)[0]
 
     async def get_list_dishes(
         self,
         submenu_id: int,
         menu_id: int,
-    ) -> list[Dish]:
-        redis_key = f"dish:{menu_id}:{submenu_id}:list"
-        dishes = await self.cache.get(redis_key)
+        fields: tuple[str, ...] | None = None,
+    ) -> list[Dish] | Response:
+        catalog = self.catalog_fields(fields)
+        redis_key = projection_key(f"dish:{menu_id}:{submenu_id}:list", fields)
+        unavailable = await self.unavailable(fields)
+        dishes = await self.cache.get_response(redis_key, servable=self.servable(unavailable, many=True))
+        if isinstance(dishes, Response):
+            return dishes
         if not dishes:
-            dishes = await self.crud.get_list_dish(id_submenu=submenu_id)
+            dishes = await self.crud.get_list_dish(id_submenu=submenu_id, menu_id=menu_id, fields=catalog)
+            if dishes is None:
+                return []
+            dishes = [project(dict(dish), catalog) for dish in dishes]
             await self.cache.set(key=redis_key, value=dishes)
-        return dishes
+        return self.with_availability(dishes, fields, unavailable)
+
+    @staticmethod
+    def catalog_fields(fields: tuple[str, ...] | None) -> tuple[str, ...] | None:
+        if fields is None or "available" not in fields:
+            return fields
+        return tuple(dict.fromkeys(("id",) + tuple(name for name in fields if name != "available")))
+
+    async def unavailable(self, fields: tuple[str, ...] | None) -> set[int]:
+        if not selected(fields, "available"):
+            return set()
+        return await stop_list.unavailable(self.cache)
+
+    @staticmethod
+    def servable(unavailable: set[int], many: bool) -> Callable[[Any], bool] | None:
+        if not unavailable:
+            return None
+        return lambda data: unavailable.isdisjoint(int(dish["id"]) for dish in (data if many else [data]))
+
+    def with_availability(self, dishes: list[dict], fields: tuple[str, ...] | None, unavailable: set[int]) -> list:
+        if not selected(fields, "available"):
+            return dishes
+        if not unavailable.isdisjoint(int(dish["id"]) for dish in dishes):
+            self.cache.discard_response()
+        return [project({**dish, "available": int(dish["id"]) not in unavailable}, fields) for dish in dishes]
 
     async def create_dish(
         self,
@@ -233,15 +342,23 @@ class DishServices(BaseService):
         menu_id: int,
         dish: DishCreate,
     ) -> Dish:
-        redis_keys = [
-            f"menu:{menu_id}",
-            "menu:list",
-            f"submenu:{menu_id}:list",
-            f"submenu:{menu_id}:{submenu_id}",
-        ]
+        if not await self.crud.submenu_exists(submenu_id, menu_id):
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="submenu not found")
         data = jsonable_encoder(dish)
-        await self.cache.delete_one(redis_keys)
-        return await self.crud.create_dish(data=data, id=submenu_id)
+        new_dish = await self.crud.create_dish(data=data, id=submenu_id)
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=submenu_id, dish_id=new_dish.id)
+        await self.cache.bump_version(
+            catalog_change(
+                "created",
+                "dish",
+                Dish,
+                new_dish,
+                id=new_dish.id,
+                menu_id=menu_id,
+                submenu_id=submenu_id,
+            ),
+        )
+        return new_dish
 
     async def update_dish(
         self,
@@ -249,21 +366,12 @@ class DishServices(BaseService):
         menu_id: int,
         submenu_id: int,
         dish: DishUpdate,
-    ) -> Dish:
+    ) -> Dish | Response:
         current_dish = await self.get_dish(
             id=id,
             menu_id=menu_id,
             submenu_id=submenu_id,
         )
-        redis_keys = [
-            f"menu:{menu_id}",
-            "menu:list",
-            f"submenu:{menu_id}:list",
-            f"submenu:{menu_id}:{submenu_id}",
-            f"dish:{menu_id}:{submenu_id}:{id}",
-            f"dish:{menu_id}:{submenu_id}:list",
-        ]
-        await self.cache.delete_one(redis_keys)
         self.dish_empty(not current_dish)
         await self.crud.update_dish(
             id=id,
@@ -271,7 +379,12 @@ class DishServices(BaseService):
             description=dish.description,
             price=dish.price,
         )
-        return await self.get_dish(id=id, menu_id=menu_id, submenu_id=submenu_id)
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=submenu_id, dish_id=id)
+        updated = await self.get_dish(id=id, menu_id=menu_id, submenu_id=submenu_id)
+        await self.cache.bump_version(
+            catalog_change("updated", "dish", Dish, updated, id=id, menu_id=menu_id, submenu_id=submenu_id),
+        )
+        return updated
 
     async def delete_dish(
         self,
@@ -279,16 +392,36 @@ class DishServices(BaseService):
         menu_id: int,
         submenu_id: int,
     ) -> dict:
-        redis_keys = [
-            f"dish:{menu_id}:{submenu_id}:{id}",
-            f"dish:{menu_id}:{submenu_id}:list",
-        ]
-        dish = await self.crud.get_dish(id=id)
+        dish = await self.crud.get_dish(id=id, menu_id=menu_id, submenu_id=submenu_id)
         self.dish_empty(not dish)
         await self.crud.delete_dish(id=id)
-        await self.cache.delete_one(redis_keys)
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=submenu_id, dish_id=id)
+        await stop_list.set_available(self.cache, [id], True)
+        await self.cache.bump_version(catalog_change("deleted", "dish", id=id, menu_id=menu_id, submenu_id=submenu_id))
         return {"status": True, "message": "The dish has been deleted"}
 
+    async def set_translation(
+        self, id: int, menu_id: int, submenu_id: int, locale: str, translation: TranslationUpdate
+    ) -> Translation:
+        dish = await self.crud.get_dish(id=id, menu_id=menu_id, submenu_id=submenu_id)
+        self.dish_empty(not dish)
+        result = await self.crud.set_translation(id, locale, translation.dict())
+        await self.cache.invalidate(menu_id=menu_id, submenu_id=submenu_id, dish_id=id)
+        await self.cache.bump_version(
+            catalog_change("updated", "dish", Dish, dish, id=id, menu_id=menu_id, submenu_id=submenu_id),
+        )
+        return result
+
+    async def set_availability(
+        self, id: int, menu_id: int, submenu_id: int, availability: DishAvailability
+    ) -> DishAvailability:
+        await self.get_dish(id=id, menu_id=menu_id, submenu_id=submenu_id, fields=("id",))
+        await stop_list.set_available(self.cache, [id], availability.available)
+        return availability
+
+    async def get_stop_list(self) -> list[str]:
+        return [str(id) for id in sorted(await stop_list.unavailable(self.cache))]
+
     def dish_empty(self, empty: bool) -> None:
         if empty:
             raise HTTPException(
@@ -297,68 +430,233 @@ class DishServices(BaseService):
             )
 
 
+class SearchServices(BaseService):
+    async def search(self, q: str, limit: int, offset: int) -> list[SearchResult]:
+        terms = re.findall(r"\w+", q.lower())
+        if not terms:
+            return []
+        redis_key = f"search:{' '.join(terms)}:{limit}:{offset}"
+        results = await self.cache.get_response(redis_key)
+        if results is None:
+            query = " & ".join(f"{term}:*" for term in terms)
+            rows = await self.crud.search(query=query, limit=limit, offset=offset)
+            results = [dict(row) for row in rows]
+            await self.cache.set(redis_key, results, expire=settings.SEARCH_CACHE_TTL)
+        return results
+
+
+class SyncServices(BaseService):
+    async def get_changes(self, since: int) -> dict:
+        version = await self.crud.get_watermark()
+        if since >= version:
+            return {"version": max(since, version), "menus": [], "submenus": [], "dishes": [], "deleted": []}
+        changes = {
+            "version": version,
+            "menus": await self.crud.get_menus_since(since=since, until=version),
+            "submenus": await self.crud.get_submenus_since(since=since, until=version),
+            "dishes": await self.crud.get_dishes_since(since=since, until=version),
+        }
+        current = {
+            (DELETED_TYPES[table], row.id): row.version
+            for table in ("menus", "submenus", "dishes")
+            for row in changes[table]
+        }
+        changes["deleted"] = []
+        for item in await self.crud.get_tombstones_since(since=since, until=version):
+            kind = DELETED_TYPES[item.table_name]
+            if current.get((kind, item.row_id), -1) >= item.version:
+                continue
+            changes["deleted"].append(
+                {
+                    "type": kind,
+                    "id": item.row_id,
+                    "menu_id": item.menu_id,
+                    "submenu_id": item.submenu_id,
+                    "version": item.version,
+                }
+            )
+        return changes
+
+
+class CacheWarmupServices(BaseService):
+    async def warm_up(self, concurrency: int = settings.CACHE_WARMUP_CONCURRENCY) -> dict:
+        menus = await self.crud.get_menus_with_counts()
+        submenus = await self.crud.get_submenus_with_counts()
+        dishes = await self.crud.get_dishes()
+        entries: dict[str, Any] = {"menu:list": []}
+        for item in menus:
+            menu = {
+                "id": item.id,
+                "title": item.title,
+                "description": item.description,
+                "submenus_count": item.submenus_count,
+                "dishes_count": item.dishes_count,
+            }
+            entries["menu:list"].append(menu)
+            entries[f"menu:{item.id}"] = menu
+            entries[f"submenu:{item.id}:list"] = []
+        for item in submenus:
+            submenu = {
+                "id": item.id,
+                "title": item.title,
+                "description": item.description,
+                "dishes_count": item.dishes_count,
+            }
+            entries[f"submenu:{item.menu_id}:list"].append(submenu)
+            entries[f"dish:{item.menu_id}:{item.id}:list"] = []
+        for item in dishes:
+            dish = {
+                "id": item.id,
+                "title": item.title,
+                "description": item.description,
+                "price": item.price,
+            }
+            entries[f"dish:{item.menu_id}:{item.submenu_id}:list"].append(dish)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def store(key: str, value: Any) -> None:
+            async with semaphore:
+                await self.cache.set(key, value)
+
+        await asyncio.gather(*(store(key, value) for key, value in entries.items()))
+        return {"status": True, "keys": len(entries)}
+
+    async def reset(self, concurrency: int = settings.CACHE_WARMUP_CONCURRENCY) -> dict:
+        for family in CATALOG_FAMILIES:
+            await self.cache.delete_all(family)
+        return await self.warm_up(concurrency=concurrency)
+
+
+class TenantServices:
+    def __init__(self, crud: TenantCrud) -> None:
+        self.crud = crud
+
+    async def create_tenant(self, tenant: TenantCreate) -> Tenant:
+        if await self.crud.get_tenant(tenant.id) is not None:
+            raise HTTPException(status_code=HTTP_409_CONFLICT, detail="tenant already exists")
+        new_tenant = await self.crud.create_tenant(tenant.dict())
+        tenant_registry.put(new_tenant)
+        return new_tenant
+
+
 class TestDataServices:
-    def __init__(self, crud: TestDataCrud) -> None:
+    def __init__(self, crud: TestDataCrud, warmup: CacheWarmupServices) -> None:
         self.crud = crud
+        self.warmup = warmup
 
     async def test_data_create(self) -> dict:
         await self.crud.delete_all_tables()
+        await stop_list.clear(self.warmup.cache)
         async with aiofiles.open("test_data/menus.json", mode="r", encoding="utf-8") as f:
             content = await f.read()
             data = json.loads(content)
         for item in data:
             menu_data = {
-                "id": int(item["id"]),
                 "title": item["title"],
                 "description": item["description"],
             }
-            await self.crud.create_menu(menu_data=menu_data)
+            menu = await self.crud.create_menu(menu_data=menu_data)
             for item_submenu in item["submenu"]:
                 submenu_data = {
-                    "id": int(item_submenu["id"]),
                     "title": item_submenu["title"],
                     "description": item_submenu["description"],
-                    "menu_id": int(item["id"]),
+                    "menu_id": menu.id,
                 }
-                await self.crud.create_submenu(submenu_data=submenu_data)
+                submenu = await self.crud.create_submenu(submenu_data=submenu_data)
                 for item_dish in item_submenu["dishes"]:
                     dish_data = {
-                        "id": int(item_dish["id"]),
                         "title": item_dish["title"],
                         "description": item_dish["description"],
                         "price": item_dish["price"],
-                        "submenu_id": int(item_submenu["id"]),
+                        "submenu_id": submenu.id,
                     }
                     await self.crud.create_dish(dish_data=dish_data)
+        await self.warmup.reset()
+        await self.warmup.cache.bump_version(catalog_change("reset", "catalog"))
         return {"status": True, "message": "Test data uploaded successfully!"}
 
 
 async def menu_services(
-    session: AsyncSession = Depends(get_session), cache: Redis = Depends(get_cache)
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_cache),
+    tenant: str = Depends(get_tenant),
+    locale: str | None = Depends(get_locale),
 ) -> MenuServices:
-    crud = MenuCrud(session=session)
-    cache = RedisCache(cache=cache)
+    crud = MenuCrud(session=session, tenant=tenant, locale=locale)
+    cache = RedisCache(cache=cache, tenant=tenant, locale=locale, expire=read_cache_ttl(session))
     return MenuServices(crud=crud, cache=cache)
 
 
 async def submenu_services(
-    session: AsyncSession = Depends(get_session), cache: Redis = Depends(get_cache)
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_cache),
+    tenant: str = Depends(get_tenant),
+    locale: str | None = Depends(get_locale),
 ) -> SubmenuServices:
-    crud = SubmenuCrud(session=session)
-    cache = RedisCache(cache=cache)
+    crud = SubmenuCrud(session=session, tenant=tenant, locale=locale)
+    cache = RedisCache(cache=cache, tenant=tenant, locale=locale, expire=read_cache_ttl(session))
     return SubmenuServices(crud=crud, cache=cache)
 
 
 async def dish_services(
-    session: AsyncSession = Depends(get_session), cache: Redis = Depends(get_cache)
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_cache),
+    tenant: str = Depends(get_tenant),
+    locale: str | None = Depends(get_locale),
 ) -> DishServices:
-    crud = DishCrud(session=session)
-    cache = RedisCache(cache=cache)
+    crud = DishCrud(session=session, tenant=tenant, locale=locale)
+    cache = RedisCache(cache=cache, tenant=tenant, locale=locale, expire=read_cache_ttl(session))
     return DishServices(crud=crud, cache=cache)
 
 
+async def search_services(
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_cache),
+    tenant: str = Depends(get_tenant),
+) -> SearchServices:
+    crud = SearchCrud(session=session, tenant=tenant)
+    cache = RedisCache(cache=cache, tenant=tenant)
+    return SearchServices(crud=crud, cache=cache)
+
+
+async def sync_services(
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_cache),
+    tenant: str = Depends(get_tenant),
+) -> SyncServices:
+    crud = SyncCrud(session=session, tenant=tenant)
+    cache = RedisCache(cache=cache, tenant=tenant)
+    return SyncServices(crud=crud, cache=cache)
+
+
+async def tenant_services(session: AsyncSession = Depends(get_session)) -> TenantServices:
+    return TenantServices(crud=TenantCrud(session=session))
+
+
 async def test_data_service(
     session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_cache),
+    tenant: str = Depends(get_tenant),
 ) -> TestDataServices:
-    crud = TestDataCrud(session=session)
-    return TestDataServices(crud=crud)
+    crud = TestDataCrud(session=session, tenant=tenant)
+    warmup = CacheWarmupServices(
+        crud=CatalogCrud(session=session, tenant=tenant),
+        cache=RedisCache(cache=cache, tenant=tenant),
+    )
+    return TestDataServices(crud=crud, warmup=warmup)
+
+
+async def warm_up_cache(concurrency: int = settings.CACHE_WARMUP_CONCURRENCY) -> dict:
+    cache = aioredis.from_url(REDIS_URL)
+    keys = 0
+    try:
+        async with SessionLocal() as session:
+            for tenant in await TenantCrud(session=session).get_tenants():
+                service = CacheWarmupServices(
+                    crud=CatalogCrud(session=session, tenant=tenant.id),
+                    cache=RedisCache(cache=cache, tenant=tenant.id),
+                )
+                keys += (await service.warm_up(concurrency=concurrency))["keys"]
+        return {"status": True, "keys": keys}
+    finally:
+        await cache.close()
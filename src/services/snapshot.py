@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+import aioredis
+
+from src.crud.cache import CATALOG_VERSION_CHANNEL, CATALOG_VERSION_KEY
+from src.crud.crud import CatalogCrud
+from src.db.database import SessionLocal
+from src.db.redis_config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1/menus"
+RECONNECT_DELAY = 1.0
+NOT_FOUND_DETAILS = {1: "menu not found", 3: "submenu not found", 5: "dish not found"}
+
+
+def dump(value: Any) -> bytes:
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class CatalogSnapshot:
+    def __init__(self, version: int, menus: list, submenus: list, dishes: list) -> None:
+        self.version = version
+        responses: dict[str, bytes] = {}
+        dish_ids: dict[str, tuple[int, ...]] = {}
+        menu_list = []
+        submenu_lists: dict[int, list] = {}
+        dish_lists: dict[tuple[int, int], list] = {}
+        for item in menus:
+            menu = {
+                "title": item.title,
+                "description": item.description,
+                "id": str(item.id),
+                "submenus_count": item.submenus_count,
+                "dishes_count": item.dishes_count,
+            }
+            menu_list.append(menu)
+            submenu_lists[item.id] = []
+            responses[f"{API_PREFIX}/{item.id}"] = dump(menu)
+        for item in submenus:
+            submenu = {
+                "title": item.title,
+                "description": item.description,
+                "id": str(item.id),
+                "dishes_count": item.dishes_count,
+            }
+            submenu_lists[item.menu_id].append(submenu)
+            dish_lists[(item.menu_id, item.id)] = []
+            responses[f"{API_PREFIX}/{item.menu_id}/submenus/{item.id}"] = dump(submenu)
+        for item in dishes:
+            dish = {
+                "title": item.title,
+                "description": item.description,
+                "price": item.price,
+                "id": str(item.id),
+                "available": True,
+            }
+            dish_lists[(item.menu_id, item.submenu_id)].append(dish)
+            path = f"{API_PREFIX}/{item.menu_id}/submenus/{item.submenu_id}/dishes/{item.id}"
+            responses[path] = dump(dish)
+            dish_ids[path] = (item.id,)
+        responses[API_PREFIX] = dump(menu_list)
+        for menu_id, submenu_list in submenu_lists.items():
+            responses[f"{API_PREFIX}/{menu_id}/submenus"] = dump(submenu_list)
+        for (menu_id, submenu_id), dish_list in dish_lists.items():
+            path = f"{API_PREFIX}/{menu_id}/submenus/{submenu_id}/dishes"
+            responses[path] = dump(dish_list)
+            dish_ids[path] = tuple(int(dish["id"]) for dish in dish_list)
+        self.responses: Mapping[str, bytes] = MappingProxyType(responses)
+        self.dish_ids: Mapping[str, tuple[int, ...]] = MappingProxyType(dish_ids)
+
+    def lookup(self, path: str, unavailable: set[int] | None) -> tuple[int, bytes] | None:
+        body = self.responses.get(path)
+        if body is not None and path in self.dish_ids:
+            if unavailable is None or not unavailable.isdisjoint(self.dish_ids[path]):
+                return None
+        if body is not None:
+            return 200, body
+        if not path.startswith(API_PREFIX):
+            return None
+        parts = path.removeprefix(API_PREFIX).split("/")[1:]
+        if len(parts) not in (1, 2, 3, 4, 5):
+            return None
+        if len(parts) > 1 and parts[1] != "submenus":
+            return None
+        if len(parts) > 3 and parts[3] != "dishes":
+            return None
+        if not all(part.isdigit() and not part.startswith("0") for part in parts[::2]):
+            return None
+        if len(parts) in NOT_FOUND_DETAILS:
+            return 404, dump({"detail": NOT_FOUND_DETAILS[len(parts)]})
+        return 200, b"[]"
+
+
+class SnapshotStore:
+    def __init__(self) -> None:
+        self.snapshot: CatalogSnapshot | None = None
+        self._dirty = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        await self.rebuild()
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._rebuild_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def rebuild(self) -> None:
+        cache = aioredis.from_url(REDIS_URL)
+        try:
+            version = int(await cache.get(CATALOG_VERSION_KEY) or 0)
+        finally:
+            await cache.close()
+        async with SessionLocal() as session:
+            crud = CatalogCrud(session=session)
+            menus = await crud.get_menus_with_counts()
+            submenus = await crud.get_submenus_with_counts()
+            dishes = await crud.get_dishes()
+        snapshot = await asyncio.to_thread(CatalogSnapshot, version, menus, submenus, dishes)
+        if self.snapshot is None or snapshot.version >= self.snapshot.version:
+            self.snapshot = snapshot
+            logger.info("Catalog snapshot version %s is active", version)
+
+    async def _rebuild_loop(self) -> None:
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Catalog snapshot rebuild failed")
+                await asyncio.sleep(RECONNECT_DELAY)
+                self._dirty.set()
+
+    async def _listen(self) -> None:
+        while True:
+            cache = aioredis.from_url(REDIS_URL)
+            pubsub = cache.pubsub()
+            try:
+                await pubsub.subscribe(CATALOG_VERSION_CHANNEL)
+                version = int(await cache.get(CATALOG_VERSION_KEY) or 0)
+                if self.snapshot is None or version > self.snapshot.version:
+                    self._dirty.set()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    if self.snapshot is None or int(message["data"]) > self.snapshot.version:
+                        self._dirty.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Catalog version subscription lost")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                await pubsub.close()
+                await cache.close()
+
+
+snapshot_store = SnapshotStore()
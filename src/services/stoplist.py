@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+
+import aioredis
+
+from src.crud.cache import RedisCache, tenant_key
+from src.db.redis_config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+STOP_LIST_KEY = "stoplist"
+STOP_LIST_CHANNEL = "catalog:stoplist"
+RECONNECT_DELAY = 1.0
+
+
+def update(dishes: set[int], dish_ids: list[int] | None, available: bool) -> None:
+    if dish_ids is None:
+        dishes.clear()
+    elif available:
+        dishes.difference_update(dish_ids)
+    else:
+        dishes.update(dish_ids)
+
+
+class StopList:
+    def __init__(self) -> None:
+        self.tenants: dict[str, set[int]] = {}
+        self.loading: dict[str, list[list[tuple[list[int] | None, bool]]]] = {}
+        self.listening = False
+        self.subscription = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.listening = False
+        self.tenants.clear()
+
+    async def unavailable(self, cache: RedisCache) -> set[int]:
+        self.start()
+        dishes = self.tenants.get(cache.tenant)
+        if dishes is not None:
+            return dishes
+        subscription = self.subscription if self.listening else None
+        changes: list[tuple[list[int] | None, bool]] = []
+        self.loading.setdefault(cache.tenant, []).append(changes)
+        try:
+            members = await cache.cache.smembers(tenant_key(cache.tenant, STOP_LIST_KEY))
+        finally:
+            pending = [item for item in self.loading[cache.tenant] if item is not changes]
+            if pending:
+                self.loading[cache.tenant] = pending
+            else:
+                del self.loading[cache.tenant]
+        dishes = {int(member) for member in members}
+        for dish_ids, available in changes:
+            update(dishes, dish_ids, available)
+        if subscription is None or not self.listening or subscription != self.subscription:
+            return dishes
+        return self.tenants.setdefault(cache.tenant, dishes)
+
+    async def set_available(self, cache: RedisCache, dish_ids: list[int], available: bool) -> None:
+        if not dish_ids:
+            return
+        key = tenant_key(cache.tenant, STOP_LIST_KEY)
+        message = json.dumps({"tenant": cache.tenant, "ids": dish_ids, "available": available})
+        async with cache.cache.pipeline(transaction=True) as pipe:
+            if available:
+                pipe.srem(key, *dish_ids)
+            else:
+                pipe.sadd(key, *dish_ids)
+            pipe.publish(STOP_LIST_CHANNEL, message)
+            await pipe.execute()
+        self.apply(cache.tenant, dish_ids, available)
+
+    async def clear(self, cache: RedisCache) -> None:
+        message = json.dumps({"tenant": cache.tenant, "ids": None, "available": True})
+        async with cache.cache.pipeline(transaction=True) as pipe:
+            pipe.delete(tenant_key(cache.tenant, STOP_LIST_KEY))
+            pipe.publish(STOP_LIST_CHANNEL, message)
+            await pipe.execute()
+        self.apply(cache.tenant, None, True)
+
+    def apply(self, tenant: str, dish_ids: list[int] | None, available: bool) -> None:
+        for changes in self.loading.get(tenant, []):
+            changes.append((dish_ids, available))
+        dishes = self.tenants.get(tenant)
+        if dishes is not None:
+            update(dishes, dish_ids, available)
+
+    async def _listen(self) -> None:
+        while True:
+            cache = aioredis.from_url(REDIS_URL)
+            pubsub = cache.pubsub()
+            try:
+                await pubsub.subscribe(STOP_LIST_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        self.subscription += 1
+                        self.listening = True
+                    if message["type"] != "message":
+                        continue
+                    change = json.loads(message["data"])
+                    self.apply(change["tenant"], change["ids"], change["available"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Stop-list subscription lost")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                self.listening = False
+                self.tenants.clear()
+                await pubsub.close()
+                await cache.close()
+
+
+stop_list = StopList()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseSettings
 
 
@@ -9,9 +11,80 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_DB_TESTS: str
     docker_mode: bool = True
+    DB_REPLICA_HOST: str | None = None
+    DB_REPLICA_PORT: int | None = None
+    DB_PRIMARY_PIN_SECONDS: int = 5
+    DB_REPLICA_CACHE_TTL: int = 30
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    INIT_DB_ON_STARTUP: bool = True
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_DB: int
+    REDIS_POOL_SIZE: int = 50
+    REDIS_POOL_TIMEOUT: int = 5
+    CACHE_WARMUP_ON_STARTUP: bool = False
+    CACHE_WARMUP_CONCURRENCY: int = 10
+    SNAPSHOT_MODE: bool = False
+    SEARCH_CACHE_TTL: int = 60
+    CACHE_INVALIDATION_LISTENER: bool = True
+    DB_ECHO: bool = False
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: str | None = None
+    METRICS_FLUSH_INTERVAL: float = 5.0
+    QUERY_DETECTOR: bool = False
+    SLOW_QUERY_MS: int = 100
+    N_PLUS_ONE_THRESHOLD: int = 3
+    QUERY_BUDGET: int = 0
+    ADMIN_TOKEN: str | None = None
+    DISPATCH_TIMEOUT: float = 2.0
+    DISPATCH_RETRY_DELAY: float = 5.0
+    DISPATCH_BACKLOG: int = 100
+    DISPATCH_THREADS: int = 2
+    EXPORT_CHUNK_ROWS: int = 5000
+    EXPORT_BACKEND: Literal["celery", "process", "eager"] = "celery"
+    EXPORT_PROCESSES: int | None = None
+    EXPORT_TTL: int = 86400
+    EXPORT_CLEANUP_INTERVAL: int = 3600
+    EXPORT_ACCEL_REDIRECT: str | None = None
+    CHANGES_STREAM_LENGTH: int = 10000
+    CHANGES_MAX_CLIENTS: int = 5000
+    CHANGES_QUEUE_SIZE: int = 100
+    CHANGES_KEEPALIVE: float = 15
+    CHANGES_MAX_AGE: float = 300
+    CHANGES_RETRY_MS: int = 3000
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_RATE: float = 20
+    RATE_LIMIT_BURST: int = 40
+    RATE_LIMIT_CLIENT_HEADER: str | None = None
+    RATE_LIMIT_REDIS_RETRY: float = 5
+    DB_LIMIT_ENABLED: bool = False
+    DB_LIMIT_MIN: int = 1
+    DB_LIMIT_MAX: int | None = None
+    DB_LIMIT_LATENCY_MS: int = 100
+    DB_LIMIT_QUEUE_SIZE: int = 100
+    DB_LIMIT_QUEUE_TIMEOUT: float = 1.0
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TTL: int = 30
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10
+    TENANT_HEADER: str = "X-Tenant"
+    TENANT_CACHE_TTL: float = 60
+    TENANT_RATE_LIMIT: float | None = None
+    TENANT_MAX_ITEMS: int | None = None
+    TENANT_DB_SHARE: float = 0.5
+    LOCALES: list[str] = ["ru", "en"]
+    DEFAULT_LOCALE: str = "ru"
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_CONCURRENCY: int | None = None
+    WEB_LIMIT_CONCURRENCY: int | None = 1000
+    WEB_LIMIT_MAX_REQUESTS: int | None = None
+    WEB_BACKLOG: int = 2048
+    WEB_KEEP_ALIVE: int = 5
 
     class Config:
         env_file = "./.env"
@@ -0,0 +1,120 @@
+import re
+import time
+from typing import Any, NamedTuple
+
+from fastapi import Depends, Header
+from fastapi.exceptions import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import (
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
+
+from src.crud.crud import TenantCrud
+from src.db.database import SessionLocal, get_session
+from src.limits import RateLimiter, rejected_requests, retry_after
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+
+TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+TENANT_BURST_SECONDS = 2
+MAX_CACHED_TENANTS = 10000
+MISSING = object()
+
+
+class TenantRecord(NamedTuple):
+    id: str
+    title: str
+    rate_limit: float | None = None
+    max_items: int | None = None
+
+
+DEFAULT_TENANT_RECORD = TenantRecord(DEFAULT_TENANT, DEFAULT_TENANT)
+
+
+class TenantRegistry:
+    def __init__(self, ttl: float = settings.TENANT_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self.tenants: dict[str, tuple[Any, float]] = {}
+
+    def put(self, tenant: Any) -> None:
+        self.tenants[tenant.id] = (tenant, time.monotonic() + self.ttl)
+
+    def put_missing(self, tenant_id: str) -> None:
+        now = time.monotonic()
+        if len(self.tenants) >= MAX_CACHED_TENANTS:
+            self.tenants = {key: entry for key, entry in self.tenants.items() if entry[1] > now}
+        if len(self.tenants) < MAX_CACHED_TENANTS:
+            self.tenants[tenant_id] = (None, now + self.ttl)
+
+    async def get(self, tenant_id: str, session: AsyncSession) -> Any | None:
+        if tenant_id == DEFAULT_TENANT:
+            return DEFAULT_TENANT_RECORD
+        if not TENANT_ID.match(tenant_id):
+            return None
+        tenant = self.cached(tenant_id)
+        if tenant is not MISSING:
+            return tenant
+        tenant = await TenantCrud(session=session).get_tenant(tenant_id)
+        if tenant is None:
+            self.put_missing(tenant_id)
+        else:
+            self.put(tenant)
+        return tenant
+
+    def cached(self, tenant_id: str) -> Any:
+        tenant, expires = self.tenants.get(tenant_id, (MISSING, 0.0))
+        return tenant if expires > time.monotonic() else MISSING
+
+
+tenant_registry = TenantRegistry()
+tenant_rate_limiter = RateLimiter()
+TENANT = Header(
+    default=None,
+    alias=settings.TENANT_HEADER,
+    description="Идентификатор ресторана, по умолчанию используется основной каталог",
+)
+
+
+async def resolve_tenant(tenant_id: str | None, session: AsyncSession) -> Any:
+    tenant = await tenant_registry.get(tenant_id or DEFAULT_TENANT, session)
+    if tenant is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="tenant not found")
+    rate = tenant.rate_limit or settings.TENANT_RATE_LIMIT
+    if rate:
+        wait = await tenant_rate_limiter.take(
+            f"tenant:{tenant.id}", rate=rate, burst=max(1, round(rate * TENANT_BURST_SECONDS))
+        )
+        if wait > 0:
+            rejected_requests.inc("tenant_rate_limit")
+            raise HTTPException(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                detail="tenant request quota exceeded",
+                headers=retry_after(wait),
+            )
+    return tenant
+
+
+async def get_tenant_record(tenant_id: str | None = TENANT, session: AsyncSession = Depends(get_session)) -> Any:
+    return await resolve_tenant(tenant_id, session)
+
+
+async def get_tenant(tenant: Any = Depends(get_tenant_record)) -> str:
+    return tenant.id
+
+
+async def get_stream_tenant(tenant_id: str | None = TENANT) -> str:
+    async with SessionLocal() as session:
+        tenant = await resolve_tenant(tenant_id, session)
+    return tenant.id
+
+
+async def check_tenant_quota(
+    tenant: Any = Depends(get_tenant_record), session: AsyncSession = Depends(get_session)
+) -> None:
+    max_items = tenant.max_items if tenant.max_items is not None else settings.TENANT_MAX_ITEMS
+    if max_items is None:
+        return
+    if await TenantCrud(session=session, tenant=tenant.id).count_items() >= max_items:
+        raise HTTPException(status_code=HTTP_403_FORBIDDEN, detail="tenant catalog size quota exceeded")
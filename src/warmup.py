@@ -0,0 +1,22 @@
+import argparse
+import asyncio
+
+from src.services.services import warm_up_cache
+from src.settings import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Прогрев кэша меню, подменю и блюд")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.CACHE_WARMUP_CONCURRENCY,
+        help="Максимальное число одновременных записей в Redis",
+    )
+    args = parser.parse_args()
+    result = asyncio.run(warm_up_cache(concurrency=args.concurrency))
+    print(f"Cache warmed up: {result['keys']} keys")
+
+
+if __name__ == "__main__":
+    main()
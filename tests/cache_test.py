@@ -0,0 +1,47 @@
+import aioredis
+import pytest
+
+from src.crud.cache import RedisCache
+from src.crud.crud import CatalogCrud
+from src.services.invalidation import keys_for_change
+from src.services.services import CacheWarmupServices
+from tests.conftest import REDIS_URL
+
+
+@pytest.mark.asyncio
+async def test_cache_warm_up(db, create_menu, create_submenu, create_dish):
+    menu = create_menu
+    submenu = create_submenu
+    dish = create_dish
+    redis = aioredis.from_url(REDIS_URL)
+    cache = RedisCache(cache=redis)
+    service = CacheWarmupServices(crud=CatalogCrud(session=db), cache=cache)
+    result = await service.warm_up(concurrency=2)
+    assert result["status"] is True
+    menus = await cache.get("menu:list")
+    cached_menu = await cache.get(f"menu:{menu.id}")
+    submenus = await cache.get(f"submenu:{menu.id}:list")
+    dishes = await cache.get(f"dish:{menu.id}:{submenu.id}:list")
+    await redis.close()
+    assert menu.id in [item["id"] for item in menus]
+    assert cached_menu["submenus_count"] == 1
+    assert cached_menu["dishes_count"] == 1
+    assert submenus[0]["dishes_count"] == 1
+    assert dishes[0]["id"] == dish.id
+    assert dishes[0]["price"] == dish.price
+
+
+def test_keys_for_change():
+    keys, prefixes = keys_for_change({"table": "dishes", "op": "DELETE", "id": 3, "menu_id": 1, "submenu_id": 2})
+    assert set(keys) == {
+        "menu:list",
+        "menu:1",
+        "submenu:1:list",
+        "submenu:1:2",
+        "dish:1:2:list",
+        "dish:1:2:3",
+    }
+    assert prefixes == []
+    keys, prefixes = keys_for_change({"table": "menus", "op": "DELETE", "id": 1, "menu_id": None, "submenu_id": None})
+    assert set(keys) == {"menu:list", "menu:1"}
+    assert set(prefixes) == {"submenu:1:", "dish:1:"}
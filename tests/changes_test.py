@@ -0,0 +1,68 @@
+import asyncio
+import json
+from functools import partial
+
+import aioredis
+import pytest
+from starlette.status import HTTP_200_OK
+
+from src.crud.cache import CATALOG_CHANGES_STREAM
+from src.db.redis_config import REDIS_URL
+from src.services.changes import ChangeHub, change_hub
+
+
+def parse_events(text: str) -> list[dict]:
+    events = []
+    for block in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            events.append(fields)
+    return events
+
+
+async def last_event_id() -> str:
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        last = await redis.xrevrange(CATALOG_CHANGES_STREAM, "+", "-", count=1)
+    finally:
+        await redis.close()
+    return last[0][0].decode() if last else "0-0"
+
+
+@pytest.mark.asyncio
+async def test_live_changes(client):
+    stream = change_hub.stream(keepalive=5, max_age=5)
+    assert (await anext(stream)).startswith(b"retry: ")
+    response = await client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"})
+    menu_id = response.json()["id"]
+    event = parse_events((await asyncio.wait_for(anext(stream), 5)).decode())[0]
+    change = json.loads(event["data"])
+    assert event["event"] == "change"
+    assert change["op"] == "created"
+    assert change["type"] == "menu"
+    assert change["data"]["title"] == "Меню"
+    await client.delete(f"/api/v1/menus/{menu_id}")
+    event = parse_events((await asyncio.wait_for(anext(stream), 5)).decode())[0]
+    assert json.loads(event["data"])["op"] == "deleted"
+    await stream.aclose()
+    assert not change_hub.clients
+    await change_hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_resume_changes(client, create_menu, create_submenu, create_dish, monkeypatch):
+    monkeypatch.setattr(change_hub, "stream", partial(ChangeHub.stream, change_hub, max_age=0.2))
+    resume_from = await last_event_id()
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes/{create_dish.id}"
+    await client.patch(url, json={"title": "Блюдо", "description": "Описание", "price": "99.90"})
+    await client.delete(f"/api/v1/menus/{create_menu.id}")
+    response = await client.get("/api/v1/changes", headers={"Last-Event-ID": resume_from})
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    changes = [json.loads(event["data"]) for event in parse_events(response.text)]
+    assert [(change["op"], change["type"]) for change in changes] == [("updated", "dish"), ("deleted", "menu")]
+    assert changes[0]["data"]["price"] == "99.90"
+    assert changes[0]["submenu_id"] == str(create_submenu.id)
+    response = await client.get("/api/v1/changes", headers={"Last-Event-ID": "unknown"})
+    assert parse_events(response.text)[0]["event"] == "reset"
+    await change_hub.stop()
@@ -0,0 +1,137 @@
+import aioredis
+import pytest
+from httpx import AsyncClient
+from starlette.responses import JSONResponse, Response
+from starlette.status import HTTP_200_OK
+
+from src import compression
+from src.compression import CompressionMiddleware, encoded_key, negotiate
+from src.crud.cache import RedisCache, tenant_key
+from src.db.redis_config import REDIS_URL
+from src.models.models import DEFAULT_TENANT
+from src.services.stoplist import STOP_LIST_KEY, stop_list
+
+DESCRIPTION = "Нежное филе с овощами, соусом и свежей зеленью. " * 20
+
+
+def test_negotiate():
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("gzip, br;q=0.5") == "gzip"
+    assert negotiate("br;q=0, gzip;q=0") is None
+    assert negotiate("*") == "br"
+    assert negotiate("identity") is None
+
+
+@pytest.mark.asyncio
+async def test_precompressed_dish_list(client, create_menu, create_submenu, monkeypatch):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    dish = {"title": "Блюдо", "description": DESCRIPTION, "price": "10.50"}
+    created = await client.post(url, json=dish)
+    response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Language, Accept-Encoding"
+    assert response.json()[0]["description"] == DESCRIPTION
+    key = tenant_key(DEFAULT_TENANT, f"dish:{create_menu.id}:{create_submenu.id}:list")
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        assert await redis.exists(encoded_key(key, "gzip"))
+
+        def fail(body, encoding):
+            raise AssertionError("response is compressed again")
+
+        monkeypatch.setattr(compression, "compress", fail)
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()[0]["description"] == DESCRIPTION
+        monkeypatch.undo()
+        response = await client.get(url, headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.json()[0]["title"] == "Блюдо"
+        await client.patch(f"{url}/{created.json()['id']}", json=dict(dish, title="Новое блюдо"))
+        assert not await redis.exists(encoded_key(key, "gzip"), encoded_key(key, "br"))
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.json()[0]["title"] == "Новое блюдо"
+    finally:
+        await client.delete(f"/api/v1/menus/{create_menu.id}")
+        await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_precompressed_dish_list_follows_stop_list(client, create_menu, create_submenu, create_dish, monkeypatch):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    await client.patch(f"{url}/{create_dish.id}", json={"title": "Блюдо", "description": DESCRIPTION, "price": "1.00"})
+    key = encoded_key(tenant_key(DEFAULT_TENANT, f"dish:{create_menu.id}:{create_submenu.id}:list"), "gzip")
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.json()[0]["available"] is True
+        body = await redis.get(key)
+        assert body
+
+        await client.put(f"{url}/{create_dish.id}/availability", json={"available": False})
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.json()[0]["available"] is False
+        assert await redis.get(key) == body
+
+        await client.put(f"{url}/{create_dish.id}/availability", json={"available": True})
+
+        def fail(body, encoding):
+            raise AssertionError("response is compressed again")
+
+        monkeypatch.setattr(compression, "compress", fail)
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.json()[0]["available"] is True
+    finally:
+        await redis.delete(tenant_key(DEFAULT_TENANT, STOP_LIST_KEY))
+        await stop_list.stop()
+        await client.delete(f"/api/v1/menus/{create_menu.id}")
+        await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_small_response_not_compressed(client, create_menu):
+    response = await client.get(f"/api/v1/menus/{create_menu.id}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == HTTP_200_OK
+    assert "content-encoding" not in response.headers
+    response = await client.get(f"/api/v1/menus/{create_menu.id}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    await client.delete(f"/api/v1/menus/{create_menu.id}")
+
+
+@pytest.mark.asyncio
+async def test_compressed_body_follows_cached_json():
+    redis = aioredis.from_url(REDIS_URL)
+    cache = RedisCache(cache=redis)
+    value = [DESCRIPTION]
+    invalidate = False
+
+    async def app(scope, receive, send):
+        data = await cache.get_response("search:compressed")
+        if isinstance(data, Response):
+            await data(scope, receive, send)
+            return
+        if data is None:
+            data = value
+            await cache.set("search:compressed", data, expire=60)
+        await JSONResponse(data)(scope, receive, send)
+        if invalidate:
+            await cache.delete_one("search:compressed")
+
+    key = tenant_key(DEFAULT_TENANT, "search:compressed")
+    headers = {"Accept-Encoding": "gzip"}
+    try:
+        async with AsyncClient(app=CompressionMiddleware(app, minimum_size=100), base_url="http://test") as client:
+            await client.get("/", headers=headers)
+            assert 0 < await redis.pttl(encoded_key(key, "gzip")) <= 60000
+            await redis.delete(key)
+            value = [DESCRIPTION, "new"]
+            response = await client.get("/", headers=headers)
+            assert response.json() == value
+            invalidate = True
+            await cache.delete_one("search:compressed")
+            await client.get("/", headers=headers)
+            assert not await redis.exists(key, encoded_key(key, "gzip"))
+    finally:
+        await cache.delete_one("search:compressed")
+        await redis.close()
@@ -1,6 +1,7 @@
 import asyncio
 
 import aioredis
+import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -8,9 +9,12 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils.functions import create_database, database_exists
 
 from src.crud.crud import DishCrud, MenuCrud, SubmenuCrud
-from src.db.database import get_session
+from src.db.database import create_default_tenant, get_session
+from src.db.triggers import install_catalog_triggers
 from src.main import app
+from src.metrics import instrument_engine
 from src.models.models import Base
+from src.query_detector import query_detector
 from src.settings import settings
 
 POSTGRES_USER = settings.POSTGRES_USER
@@ -49,6 +53,24 @@ if not database_exists(DATABASE_URL):
     create_database(DATABASE_URL)
 
 
+def pytest_configure(config):
+    config.addinivalue_line("markers", "query_budget(count): maximum number of SQL statements per request")
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    marker = request.node.get_closest_marker("query_budget")
+    enabled, budget = query_detector.enabled, query_detector.budget
+    query_detector.enabled = True
+    if marker is not None:
+        query_detector.budget = marker.args[0]
+    query_detector.violations.clear()
+    yield
+    query_detector.enabled, query_detector.budget = enabled, budget
+    if query_detector.violations:
+        pytest.fail("\n".join(query_detector.violations))
+
+
 @pytest_asyncio.fixture(scope="session")
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
@@ -72,10 +94,13 @@ async def get_cache_test():
 @pytest_asyncio.fixture(scope="session")
 async def db_engine():
     engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+    instrument_engine(engine.sync_engine)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        await install_catalog_triggers(conn)
+        await create_default_tenant(conn)
 
     yield engine
 
@@ -1,5 +1,6 @@
 import json
 
+import aioredis
 import pytest
 from sqlalchemy import func, select
 from starlette.status import (
@@ -9,7 +10,9 @@ from starlette.status import (
     HTTP_422_UNPROCESSABLE_ENTITY,
 )
 
-from src.models.models import Dish
+from src.crud.cache import tenant_key
+from src.db.redis_config import REDIS_URL
+from src.models.models import DEFAULT_TENANT, Dish
 
 
 @pytest.mark.asyncio
@@ -50,6 +53,27 @@ async def test_get_dish_not_found(db, client, create_menu, create_submenu):
     assert response.json()["detail"] == "dish not found"
 
 
+@pytest.mark.asyncio
+@pytest.mark.query_budget(1)
+async def test_get_dish_under_wrong_parents(db, client, create_menu, create_submenu, create_dish):
+    menu = create_menu
+    submenu = create_submenu
+    dish = create_dish
+    for url in (
+        f"/api/v1/menus/{menu.id + 1}/submenus/{submenu.id}/dishes/{dish.id}",
+        f"/api/v1/menus/{menu.id}/submenus/{submenu.id + 1}/dishes/{dish.id}",
+    ):
+        response = await client.get(url)
+        assert response.status_code == HTTP_404_NOT_FOUND
+    response = await client.get(f"/api/v1/menus/{menu.id + 1}/submenus/{submenu.id}/dishes")
+    assert response.json() == []
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        assert await redis.keys(tenant_key(DEFAULT_TENANT, f"dish:{menu.id + 1}:*")) == []
+    finally:
+        await redis.close()
+
+
 @pytest.mark.asyncio
 async def test_create_dish(db, client, create_menu, create_submenu):
     menu = create_menu
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.exceptions import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from src.services.dispatch import TaskDispatcher
+
+
+class Broker:
+    def __init__(self, delay: float = 0, available: bool = True) -> None:
+        self.delay = delay
+        self.available = available
+        self.published: list[str] = []
+
+    def publish(self, name: str, kwargs: dict, task_id: str, options: dict) -> None:
+        time.sleep(self.delay)
+        if not self.available:
+            raise ConnectionError("broker is down")
+        self.published.append(task_id)
+
+
+@pytest.mark.asyncio
+async def test_slow_broker_does_not_block():
+    broker = Broker(delay=0.3)
+    dispatcher = TaskDispatcher(publish=broker.publish, timeout=0.05)
+    started = time.perf_counter()
+    task_id = await dispatcher.send("create_excel", {"data": {}})
+    assert time.perf_counter() - started < 0.2
+    await asyncio.sleep(0.4)
+    assert broker.published == [task_id]
+    await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_unavailable_broker_backlog():
+    broker = Broker(available=False)
+    dispatcher = TaskDispatcher(publish=broker.publish, retry_delay=0.05, backlog_size=2)
+    first = await dispatcher.send("create_excel", {"data": {}})
+    second = await dispatcher.send("create_excel", {"data": {}})
+    with pytest.raises(HTTPException) as error:
+        await dispatcher.send("create_excel", {"data": {}})
+    assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+    broker.available = True
+    await asyncio.sleep(0.2)
+    assert broker.published == [first, second]
+    assert not dispatcher.backlog
+    await dispatcher.stop()
@@ -0,0 +1,153 @@
+import csv
+import gzip
+import io
+import os
+import time
+
+import openpyxl
+import pytest
+import pytest_asyncio
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_202_ACCEPTED,
+    HTTP_404_NOT_FOUND,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
+
+from src.celery import storage, tasks
+from src.services.exports import ProcessExportBackend, stop_export_backends
+from src.settings import settings
+
+DATA = {
+    "menus": [
+        {"id": 1, "title": "Меню 1", "description": "Описание"},
+        {"id": 2, "title": "Меню 2", "description": "<&>"},
+    ],
+    "submenus": [
+        {"id": 1, "menu_id": 1, "title": "Подменю 1", "description": "Описание"},
+        {"id": 2, "menu_id": 2, "title": "Подменю 2", "description": "Описание"},
+    ],
+    "dishes": [
+        {"id": 1, "submenu_id": 1, "title": "Блюдо 1", "description": "Описание", "price": 12.5},
+        {"id": 2, "submenu_id": 2, "title": "Блюдо 2", "description": "Описание", "price": 10},
+    ],
+}
+
+
+@pytest_asyncio.fixture
+async def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "export_storage", storage.LocalStorage(str(tmp_path / "uploads")))
+    monkeypatch.setattr(storage, "EXPORT_WORK_DIR", str(tmp_path / "parts"))
+    monkeypatch.setattr(settings, "EXPORT_BACKEND", "eager")
+    yield tmp_path / "uploads"
+    await stop_export_backends()
+
+
+def read_rows(path):
+    wb = openpyxl.load_workbook(path)
+    rows = [list(row) for row in wb.active.iter_rows(values_only=True)]
+    wb.close()
+    return rows
+
+
+def test_catalog_chunks():
+    chunks = tasks.catalog_chunks(DATA, chunk_rows=3)
+    assert len(chunks) == 2
+    assert chunks[0] == [
+        [1, "Меню 1", "Описание"],
+        [None, 1, "Подменю 1", "Описание"],
+        [None, None, 1, "Блюдо 1", "Описание", 12.5],
+    ]
+
+
+def test_chunked_export_matches_single(uploads, tmp_path):
+    single = tasks.catalog_chunks(DATA, chunk_rows=100)
+    tasks.write_workbook(str(tmp_path / "single.xlsx"), [tasks.render_rows(single[0], start=1)])
+    chunks = tasks.catalog_chunks(DATA, chunk_rows=3)
+    merged = []
+    for index, rows in reversed(list(enumerate(chunks))):
+        start = tasks.chunk_starts(chunks)[index]
+        if tasks.save_part("chunked.xlsx", index, len(chunks), tasks.render_rows(rows, start)):
+            tasks.merge_parts("chunked.xlsx", len(chunks))
+            merged.append(index)
+    assert merged == [0]
+    expected = read_rows(tmp_path / "single.xlsx")
+    assert read_rows(uploads / "chunked.xlsx") == expected
+    assert expected[3] == [2, "Меню 2", "<&>", None, None, None]
+    assert not (tmp_path / "parts" / "chunked.xlsx").exists()
+    assert not tasks.save_part("chunked.xlsx", 1, len(chunks), tasks.render_rows(chunks[1], 4))
+    assert not (tmp_path / "parts" / "chunked.xlsx").exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_is_reported(client, uploads, tmp_path, monkeypatch):
+    chunks = tasks.catalog_chunks(DATA, chunk_rows=3)
+    render_rows = tasks.render_rows
+    tasks.create_excel_chunk("failed.xlsx", 0, len(chunks), chunks[0], 1)
+
+    def fail(rows, start):
+        raise ValueError("broken chunk")
+
+    monkeypatch.setattr(tasks, "render_rows", fail)
+    with pytest.raises(ValueError):
+        tasks.create_excel_chunk("failed.xlsx", 1, len(chunks), chunks[1], 4)
+    assert not (tmp_path / "parts" / "failed.xlsx").exists()
+    response = await client.get("/api/v1/get_menu_file/failed.xlsx")
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "export failed"}
+    assert not tasks.save_part("failed.xlsx", 0, len(chunks), render_rows(chunks[0], 1))
+    assert not (tmp_path / "parts" / "failed.xlsx").exists()
+
+
+@pytest.mark.asyncio
+async def test_eager_export(client, create_menu, create_submenu, create_dish, uploads):
+    response = await client.post("/api/v1/create_menu_file")
+    assert response.status_code == HTTP_202_ACCEPTED
+    name = response.json()["task_id"]
+    assert name.endswith(".xlsx")
+    rows = read_rows(uploads / name)
+    assert rows[0][:2] == [create_menu.id, create_menu.title]
+    assert rows[2][3] == create_dish.title
+    os.utime(uploads / name, (0, 0))
+    response = await client.post("/api/v1/create_menu_file")
+    assert response.json()["task_id"] == name
+    assert os.path.getmtime(uploads / name) > 0
+    response = await client.get(f"/api/v1/get_menu_file/{name}")
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-disposition"] == 'attachment; filename="Menu.xlsx"'
+    response = await client.get(f"/api/v1/get_menu_file/{name[:-5]}")
+    assert response.status_code == HTTP_200_OK
+    response = await client.get("/api/v1/get_menu_file/missing")
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_compressed_csv_export(client, create_menu, create_submenu, create_dish, uploads):
+    response = await client.post("/api/v1/create_menu_file", params={"format": "csv", "gzip": True})
+    name = response.json()["task_id"]
+    assert name.endswith(".csv.gz")
+    response = await client.get(f"/api/v1/get_menu_file/{name}")
+    assert response.headers["content-type"] == "application/gzip"
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert rows[2][3] == create_dish.title
+
+
+def test_cleanup(uploads):
+    uploads.mkdir()
+    (uploads / "old.xlsx").write_bytes(b"old")
+    (uploads / "new.xlsx").write_bytes(b"new")
+    os.utime(uploads / "old.xlsx", (time.time() - 100, time.time() - 100))
+    assert storage.cleanup(ttl=50) == 1
+    assert os.listdir(uploads) == ["new.xlsx"]
+
+
+@pytest.mark.asyncio
+async def test_process_export(uploads, tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, "EXPORT_CHUNK_ROWS", 3)
+    backend = ProcessExportBackend(processes=2)
+    name = await backend.submit(DATA, priority=9, name="process.xlsx")
+    await backend.jobs[name]
+    await backend.stop()
+    single = tasks.catalog_chunks(DATA, chunk_rows=100)
+    tasks.write_workbook(str(tmp_path / "single.xlsx"), [tasks.render_rows(single[0], start=1)])
+    assert read_rows(uploads / "process.xlsx") == read_rows(tmp_path / "single.xlsx")
@@ -0,0 +1,46 @@
+import pytest
+from starlette.status import HTTP_200_OK, HTTP_422_UNPROCESSABLE_ENTITY
+
+from src.crud.crud import MenuCrud
+
+
+@pytest.mark.asyncio
+async def test_dish_fields(client, create_menu, create_submenu, create_dish):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    response = await client.get(url, params={"fields": "price,id,title"})
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == [{"title": create_dish.title, "price": create_dish.price, "id": str(create_dish.id)}]
+    response = await client.get(f"{url}/{create_dish.id}", params={"fields": "title"})
+    assert response.json() == {"title": create_dish.title}
+    dish = {"title": "Новое блюдо", "description": "Описание", "price": "10.50"}
+    await client.patch(f"{url}/{create_dish.id}", json=dish)
+    response = await client.get(url, params={"fields": "id,title,price"})
+    assert response.json()[0]["title"] == "Новое блюдо"
+    response = await client.get(f"{url}/{create_dish.id}", params={"fields": "title"})
+    assert response.json() == {"title": "Новое блюдо"}
+    response = await client.get(f"{url}/{create_dish.id}")
+    assert response.json()["description"] == "Описание"
+    await client.delete(f"/api/v1/menus/{create_menu.id}")
+
+
+@pytest.mark.asyncio
+async def test_menu_fields_skip_counts(client, create_menu, monkeypatch):
+    async def count(self, id):
+        raise AssertionError("counts are not requested")
+
+    monkeypatch.setattr(MenuCrud, "get_submenus_count", count)
+    monkeypatch.setattr(MenuCrud, "get_dishes_count", count)
+    response = await client.get(f"/api/v1/menus/{create_menu.id}", params={"fields": "id,title"})
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == {"title": create_menu.title, "id": str(create_menu.id)}
+    response = await client.get("/api/v1/menus", params={"fields": "title"})
+    assert response.json() == [{"title": create_menu.title}]
+    monkeypatch.undo()
+    await client.delete(f"/api/v1/menus/{create_menu.id}")
+
+
+@pytest.mark.asyncio
+async def test_unknown_fields(client):
+    response = await client.get("/api/v1/menus", params={"fields": "id,price"})
+    assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"] == "unknown fields: price"
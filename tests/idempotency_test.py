@@ -0,0 +1,119 @@
+import asyncio
+import json
+import uuid
+
+import aioredis
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from starlette.status import (
+    HTTP_201_CREATED,
+    HTTP_409_CONFLICT,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+)
+
+from src.db.redis_config import REDIS_URL
+from src.idempotency import (
+    IDEMPOTENCY_PREFIX,
+    PENDING,
+    IdempotencyMiddleware,
+    request_fingerprint,
+)
+from src.models.models import DEFAULT_TENANT, Dish
+
+
+async def dishes_count(db):
+    result = await db.execute(select(func.count(Dish.id)))
+    return result.scalar()
+
+
+@pytest.mark.asyncio
+async def test_retried_create_is_replayed(client, create_menu, create_submenu, db):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    dish = {"title": "Блюдо", "description": "Описание", "price": "10.50"}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    count = await dishes_count(db)
+    first = await client.post(url, json=dish, headers=headers)
+    second = await client.post(url, json=dish, headers=headers)
+    assert first.status_code == second.status_code == HTTP_201_CREATED
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert await dishes_count(db) == count + 1
+
+    response = await client.post(url, json={**dish, "price": "11.00"}, headers=headers)
+    assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    response = await client.post(url, json=dish, headers={"Idempotency-Key": uuid.uuid4().hex})
+    assert response.json()["id"] != first.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_are_coalesced(client, create_menu, create_submenu, db):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    dish = {"title": "Блюдо", "description": "Описание", "price": "10.50"}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    count = await dishes_count(db)
+    responses = await asyncio.gather(*(client.post(url, json=dish, headers=headers) for _ in range(3)))
+    assert {response.json()["id"] for response in responses} == {responses[0].json()["id"]}
+    assert sum("idempotent-replayed" in response.headers for response in responses) == 2
+    assert await dishes_count(db) == count + 1
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(await receive())
+        if len(calls) == 1:
+            raise RuntimeError("database is down")
+        await send({"type": "http.response.start", "status": HTTP_201_CREATED, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    key = uuid.uuid4().hex
+    async with AsyncClient(app=IdempotencyMiddleware(app), base_url="http://test") as client:
+        with pytest.raises(RuntimeError):
+            await client.post("/api/v1/menus", json={}, headers={"Idempotency-Key": key})
+        response = await client.post("/api/v1/menus", json={}, headers={"Idempotency-Key": key})
+    assert response.status_code == HTTP_201_CREATED
+    assert [call["body"] for call in calls] == [b"{}", b"{}"]
+
+
+@pytest.mark.asyncio
+async def test_request_in_progress_conflict():
+    async def app(scope, receive, send):
+        raise AssertionError("duplicate request executed")
+
+    key = uuid.uuid4().hex
+    fingerprint = request_fingerprint({"method": "POST", "path": "/api/v1/menus", "query_string": b""}, b"{}")
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        record = json.dumps({"state": PENDING, "fingerprint": fingerprint})
+        await redis.set(f"{IDEMPOTENCY_PREFIX}{DEFAULT_TENANT}:/api/v1/menus:{key}", record)
+    finally:
+        await redis.close()
+    async with AsyncClient(app=IdempotencyMiddleware(app, wait_timeout=0.1), base_url="http://test") as client:
+        response = await client.post("/api/v1/menus", content=b"{}", headers={"Idempotency-Key": key})
+    assert response.status_code == HTTP_409_CONFLICT
+
+
+@pytest.mark.asyncio
+async def test_only_catalog_creates_are_idempotent():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        headers = [(b"content-type", b"application/json"), (b"set-cookie", b"primary=1")]
+        await send({"type": "http.response.start", "status": HTTP_201_CREATED, "headers": headers})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    async with AsyncClient(app=IdempotencyMiddleware(app), base_url="http://test") as client:
+        for _ in range(2):
+            await client.post("/api/v1/admin/tenants", json={}, headers=headers)
+        first = await client.post("/api/v1/menus/1/submenus", json={}, headers=headers)
+        second = await client.post("/api/v1/menus/1/submenus", json={}, headers=headers)
+    assert calls == ["/api/v1/admin/tenants", "/api/v1/admin/tenants", "/api/v1/menus/1/submenus"]
+    assert first.headers["set-cookie"] == "primary=1"
+    assert second.headers["idempotent-replayed"] == "true"
+    assert "set-cookie" not in second.headers
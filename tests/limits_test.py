@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi.exceptions import HTTPException
+from httpx import AsyncClient
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
+
+from src import limits
+from src.limits import (
+    AdaptiveLimiter,
+    DatabasePermit,
+    LimitMiddleware,
+    RateLimiter,
+    TokenBucket,
+)
+from src.main import app
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, burst=2)
+    assert bucket.take("client", now=0) == 0
+    assert bucket.take("client", now=0) == 0
+    assert bucket.take("client", now=0) == 0.5
+    assert bucket.take("other", now=0) == 0
+    assert bucket.take("client", now=1) == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_redis_and_fallback(monkeypatch):
+    limiter = RateLimiter(rate=1, burst=2)
+    client = uuid.uuid4().hex
+    assert await limiter.take(client) == 0
+    assert await limiter.take(client) == 0
+    assert await limiter.take(client) > 0
+
+    async def fail(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(limits.InstrumentedRedis, "eval", fail)
+    assert await limiter.take(client) == 0
+    assert limiter.redis_down_until > 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_queues_and_sheds():
+    limiter = AdaptiveLimiter(limit=1, queue_size=1, queue_timeout=0.2)
+    rejected = limits.rejected_requests.values.get(("overload",), 0)
+    await limiter.acquire()
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as error:
+        await limiter.acquire()
+    assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+    assert error.value.headers == {"Retry-After": "1"}
+    assert limits.rejected_requests.values[("overload",)] == rejected + 1
+    limiter.release()
+    await queued
+    assert limiter.inflight == 1
+    with pytest.raises(HTTPException):
+        await limiter.acquire()
+    limiter.release()
+    assert limiter.inflight == 0 and not limiter.waiters
+
+
+def test_adaptive_limiter_adjusts_limit():
+    limiter = AdaptiveLimiter(limit=10, minimum=2, latency=0.1)
+    limiter.observe(started=1, elapsed=0.5)
+    assert limiter.limit == 9
+    limiter.observe(started=0, elapsed=0.5)
+    assert limiter.limit == 9
+    for _ in range(20):
+        limiter.observe(started=limiter.decreased_at, elapsed=0.5)
+    assert limiter.limit == 2
+    limiter.inflight = 2
+    limiter.observe(started=0, elapsed=0.01)
+    assert limiter.limit == 2.5
+
+
+@pytest.mark.asyncio
+async def test_permit_held_once_per_request():
+    limiter = AdaptiveLimiter(limit=1)
+    permit = DatabasePermit(limiter)
+    await asyncio.gather(permit.acquire(), permit.acquire())
+    assert limiter.inflight == 1
+    permit.release()
+    permit.release()
+    assert limiter.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests(client):
+    middleware = LimitMiddleware(app, rate_limiter=RateLimiter(rate=1, burst=2), client_header="X-Client-Id")
+    headers = {"X-Client-Id": uuid.uuid4().hex}
+    async with AsyncClient(app=middleware, base_url="http://test") as limited:
+        statuses = [(await limited.get("/api/v1/menus", headers=headers)).status_code for _ in range(2)]
+        assert statuses == [HTTP_200_OK, HTTP_200_OK]
+        response = await limited.get("/api/v1/menus", headers=headers)
+        assert response.status_code == HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["retry-after"] == "1"
+        response = await limited.get("/api/v1/menus", headers={"X-Client-Id": uuid.uuid4().hex})
+        assert response.status_code == HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_overloaded_database_returns_503(client, create_menu):
+    limiter = AdaptiveLimiter(limit=1, queue_size=0)
+    async with AsyncClient(app=LimitMiddleware(app, limiter=limiter), base_url="http://test") as limited:
+        await limiter.acquire()
+        response = await limited.get(f"/api/v1/menus/{create_menu.id}/submenus/0")
+        assert response.status_code == HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+        limiter.release()
+        response = await limited.get(f"/api/v1/menus/{create_menu.id}/submenus/0")
+        assert response.status_code != HTTP_503_SERVICE_UNAVAILABLE
+        assert limiter.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_tenant_share_of_saturated_limiter():
+    limiter = AdaptiveLimiter(limit=2, queue_size=10, queue_timeout=0.2, tenant_share=0.5)
+    await limiter.acquire("first")
+    await limiter.acquire("first")
+    queued = asyncio.create_task(limiter.acquire("second"))
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException):
+        await limiter.acquire("first")
+    assert limits.rejected_requests.values[("tenant_quota",)] >= 1
+    limiter.release("first")
+    await queued
+    assert limiter.occupied == {"first": 1, "second": 1}
+    limiter.release("first")
+    limiter.release("second")
+    assert limiter.inflight == 0 and not limiter.occupied
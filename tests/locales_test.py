@@ -0,0 +1,87 @@
+import aioredis
+import pytest
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_404_NOT_FOUND,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+)
+
+from src.crud.cache import RedisCache, tenant_key
+from src.crud.crud import DishCrud
+from src.db.redis_config import REDIS_URL
+from src.locales import resolve_locale
+from src.models.models import DEFAULT_TENANT
+
+
+def test_resolve_locale():
+    assert resolve_locale(None) == "ru"
+    assert resolve_locale("en-US,en;q=0.9,ru;q=0.8") == "en"
+    assert resolve_locale("de, ru;q=0.5, en;q=0.7") == "en"
+    assert resolve_locale("en;q=0, de") == "ru"
+    assert resolve_locale("*") == "ru"
+
+
+@pytest.mark.asyncio
+async def test_translated_menu(client, create_menu, create_submenu):
+    url = f"/api/v1/menus/{create_menu.id}"
+    english = {"Accept-Language": "en-GB,en;q=0.9"}
+    response = await client.get(url, headers=english)
+    assert response.json()["title"] == create_menu.title
+    assert response.headers["content-language"] == "en"
+
+    response = await client.put(f"{url}/translations/en", json={"title": "Test menu"})
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == {"locale": "en", "title": "Test menu", "description": None}
+    response = await client.get(url, headers=english)
+    assert response.json()["title"] == "Test menu"
+    assert response.json()["description"] == create_menu.description
+    assert response.json()["submenus_count"] == 1
+    assert "Accept-Language" in response.headers["vary"]
+    response = await client.get(url)
+    assert response.json()["title"] == create_menu.title
+    assert response.headers["content-language"] == "ru"
+    response = await client.get("/api/v1/menus", headers=english)
+    assert response.json()[0]["title"] == "Test menu"
+
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        key = tenant_key(DEFAULT_TENANT, f"menu:{create_menu.id}")
+        assert await redis.exists(key, f"{key}?lang=en") == 2
+        await client.put(f"{url}/translations/en", json={"title": "Test menu", "description": "Description"})
+        assert not await redis.exists(key, f"{key}?lang=en")
+        response = await client.get(url, headers=english)
+        assert response.json()["description"] == "Description"
+    finally:
+        await RedisCache(cache=redis).invalidate(menu_id=create_menu.id, cascade=True)
+        await redis.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(1)
+async def test_translated_dish_list(db, client, create_menu, create_submenu, create_dish):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    await DishCrud(session=db).set_translation(create_dish.id, "en", {"title": None, "description": "Test dish"})
+    response = await client.get(url, headers={"Accept-Language": "en"})
+    assert response.json() == [
+        {
+            "id": str(create_dish.id),
+            "title": create_dish.title,
+            "description": "Test dish",
+            "price": create_dish.price,
+            "available": True,
+        }
+    ]
+    response = await client.get(url, headers={"Accept-Language": "en"}, params={"fields": "price"})
+    assert response.json() == [{"price": create_dish.price}]
+
+
+@pytest.mark.asyncio
+async def test_translation_errors(client, create_menu, create_submenu):
+    url = f"/api/v1/menus/{create_menu.id}"
+    for locale in ("ru", "de"):
+        response = await client.put(f"{url}/translations/{locale}", json={"title": "Menu"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    response = await client.put(
+        f"/api/v1/menus/{create_menu.id + 1}/submenus/{create_submenu.id}/translations/en", json={"title": "Submenu"}
+    )
+    assert response.status_code == HTTP_404_NOT_FOUND
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+
+import pytest
+from starlette.status import HTTP_200_OK
+
+from src.metrics import REGISTRY, Counter, Gauge, Histogram, render_metrics
+from src.settings import settings
+
+
+@pytest.mark.asyncio
+async def test_metrics(client, create_menu):
+    menu = create_menu
+    await client.get(f"/api/v1/menus/{menu.id}")
+    await client.get(f"/api/v1/menus/{menu.id}")
+    response = await client.get("/metrics")
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/v1/menus/{menu_id}",status="200"}'
+        in response.text
+    )
+    assert 'cache_requests_total{family="menu",result="hit"}' in response.text
+    await client.delete(f"/api/v1/menus/{menu.id}")
+
+
+def test_histogram_render():
+    histogram = Histogram("test_seconds", "Test", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+    REGISTRY.remove(histogram)
+    assert histogram.render() == [
+        "# HELP test_seconds Test",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_seconds_bucket{route="/a",le="1.0"} 2',
+        'test_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_seconds_sum{route="/a"} 5.55',
+        'test_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_metrics_aggregate_workers(tmp_path, monkeypatch):
+    counter = Counter("test_total", "Test", ("route",))
+    gauge = Gauge("test_inflight", "Test", ())
+    try:
+        monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+        counter.inc("/a")
+        gauge.set(1)
+        finished = subprocess.Popen(["true"])
+        finished.wait()
+        for pid, value in ((os.getppid(), 2), (finished.pid, 4)):
+            data = {"test_total": [[["/a"], value]], "test_inflight": [[[], value]]}
+            (tmp_path / f"{pid}.json").write_text(json.dumps(data))
+        text = render_metrics()
+    finally:
+        REGISTRY.remove(counter)
+        REGISTRY.remove(gauge)
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert 'test_total{route="/a"} 7' in text
+    assert "test_inflight 3" in text
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from starlette.status import HTTP_200_OK, HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
+
+from src.settings import settings
+
+URL = "/api/v1/admin/profile"
+
+
+def busy(seconds: float) -> None:
+    deadline = asyncio.get_running_loop().time() + seconds
+    while asyncio.get_running_loop().time() < deadline:
+        pass
+
+
+async def busy_task(seconds: float) -> None:
+    await asyncio.sleep(0.01)
+    busy(seconds)
+
+
+@pytest.mark.asyncio
+async def test_profile_requires_admin_token(client, monkeypatch):
+    response = await client.post(URL, params={"seconds": 0.1})
+    assert response.status_code == HTTP_404_NOT_FOUND
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    response = await client.post(URL, params={"seconds": 0.1}, headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_profile_collapsed_stacks(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    task = asyncio.create_task(busy_task(0.2))
+    response = await client.post(URL, params={"seconds": 0.3, "interval_ms": 2}, headers={"X-Admin-Token": "secret"})
+    await task
+    assert response.status_code == HTTP_200_OK
+    lines = response.text.splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(
+        line.startswith("task:tests.profiler_test.busy_task;tests.profiler_test.busy_task;tests.profiler_test.busy")
+        for line in lines
+    )
+    assert any(line.startswith("idle ") for line in lines)
@@ -0,0 +1,64 @@
+import logging
+
+import pytest
+from starlette.status import HTTP_200_OK
+
+from src.query_detector import (
+    QueryDetector,
+    StatementRecord,
+    query_detector,
+    statement_shape,
+)
+
+
+def test_n_plus_one_detected(caplog):
+    detector = QueryDetector(enabled=True, slow_ms=1000, repeat_threshold=3, budget=0)
+    statements = [
+        StatementRecord(f"SELECT count(*) FROM submenus WHERE menu_id = {number}", 0.001, "MenuServices.get_menu")
+        for number in range(3)
+    ]
+    statements.append(StatementRecord("SELECT * FROM menus", 0.001, "MenuServices.get_menu"))
+    with caplog.at_level(logging.WARNING, logger="src.query_detector"):
+        detector.check("GET", "/api/v1/menus", statements)
+    warnings = [record.getMessage() for record in caplog.records if "N+1" in record.getMessage()]
+    assert warnings == [
+        "N+1 query in MenuServices.get_menu (GET /api/v1/menus): "
+        "SELECT count(*) FROM submenus WHERE menu_id = ? executed 3 times"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_menu_list_counts_in_one_statement(client, caplog, monkeypatch):
+    for number in range(3):
+        await client.post("/api/v1/menus", json={"title": f"Меню {number}", "description": "Описание"})
+    monkeypatch.setattr(query_detector, "budget", 1)
+    with caplog.at_level(logging.WARNING, logger="src.query_detector"):
+        response = await client.get("/api/v1/menus")
+    monkeypatch.setattr(query_detector, "budget", 0)
+    assert response.status_code == HTTP_200_OK
+    assert query_detector.violations == []
+    assert not [record for record in caplog.records if "N+1" in record.getMessage()]
+    assert {(menu["submenus_count"], menu["dishes_count"]) for menu in response.json()} == {(0, 0)}
+    for menu in response.json():
+        await client.delete(f"/api/v1/menus/{menu['id']}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(3)
+async def test_query_budget(client, create_menu):
+    menu = create_menu
+    response = await client.get(f"/api/v1/menus/{menu.id}")
+    assert response.status_code == HTTP_200_OK
+    await client.delete(f"/api/v1/menus/{menu.id}")
+    assert query_detector.violations == []
+
+
+def test_query_budget_exceeded():
+    detector = QueryDetector(enabled=True, slow_ms=10, repeat_threshold=3, budget=1)
+    statements = [
+        StatementRecord("SELECT * FROM menus WHERE id = $1", 0.001, "MenuServices.get_menu"),
+        StatementRecord("SELECT count(*) FROM submenus WHERE menu_id IN (1, 2)", 0.02, "MenuServices.get_menu"),
+    ]
+    detector.check("GET", "/api/v1/menus/{menu_id}", statements)
+    assert detector.violations == ["GET /api/v1/menus/{menu_id} executed 2 SQL statements, budget is 1"]
+    assert statement_shape(statements[1].statement) == "SELECT count(*) FROM submenus WHERE menu_id IN (?)"
@@ -0,0 +1,60 @@
+import time
+
+import aioredis
+import pytest
+from httpx import AsyncClient
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_404_NOT_FOUND
+
+from src.crud.cache import RedisCache, tenant_key
+from src.db import database
+from src.db.redis_config import REDIS_URL
+from src.main import app
+from src.middleware import PrimaryPinMiddleware
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+from tests.conftest import SessionLocalTest
+
+
+@pytest.mark.asyncio
+async def test_reads_are_routed_to_replica(client, create_menu, monkeypatch):
+    monkeypatch.setattr(database, "ReplicaSessionLocal", SessionLocalTest)
+    url = f"/api/v1/menus/{create_menu.id}"
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        response = await client.get(url)
+        assert response.status_code == HTTP_404_NOT_FOUND
+        pin = {"Cookie": f"{database.PRIMARY_PIN_COOKIE}={time.time() + 60}"}
+        response = await client.get(url, headers=pin)
+        assert response.status_code == HTTP_200_OK
+        assert await redis.ttl(tenant_key(DEFAULT_TENANT, f"menu:{create_menu.id}")) == -1
+    finally:
+        await RedisCache(cache=redis).delete_one(f"menu:{create_menu.id}")
+        await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_replica_cache_fill_expires(client, monkeypatch):
+    monkeypatch.setattr(database, "ReplicaSessionLocal", SessionLocalTest)
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        response = await client.get("/api/v1/menus")
+        assert response.status_code == HTTP_200_OK
+        ttl = await redis.ttl(tenant_key(DEFAULT_TENANT, "menu:list"))
+        assert 0 < ttl <= settings.DB_REPLICA_CACHE_TTL
+    finally:
+        await RedisCache(cache=redis).delete_one("menu:list")
+        await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_mutation_pins_client_to_primary(client):
+    async with AsyncClient(app=PrimaryPinMiddleware(app, seconds=5), base_url="http://test") as client:
+        response = await client.get("/api/v1/menus/1111")
+        assert "set-cookie" not in response.headers
+        response = await client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"})
+        assert response.status_code == HTTP_201_CREATED
+        until = float(client.cookies[database.PRIMARY_PIN_COOKIE])
+        assert time.time() < until <= time.time() + 5
+        response = await client.delete("/api/v1/menus/1111")
+        assert response.status_code == HTTP_404_NOT_FOUND
+        assert "set-cookie" not in response.headers
@@ -0,0 +1,25 @@
+import pytest
+from starlette.status import HTTP_200_OK, HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_search(client, create_menu, create_submenu, create_dish):
+    dish = create_dish
+    url = "/api/v1/search"
+    response = await client.get(url, params={"q": "блюд"})
+    assert response.status_code == HTTP_200_OK
+    results = response.json()
+    assert isinstance(results, list) is True
+    assert {"type": "dish", "id": str(dish.id)}.items() <= results[0].items()
+    response = await client.get(url, params={"q": "тестов", "limit": 2})
+    assert response.status_code == HTTP_200_OK
+    assert len(response.json()) == 2
+    assert response.json()[0]["rank"] >= response.json()[1]["rank"]
+
+
+@pytest.mark.asyncio
+async def test_search_validation(client):
+    response = await client.get("/api/v1/search")
+    assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    response = await client.get("/api/v1/search", params={"q": "борщ", "limit": 0})
+    assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,62 @@
+import pytest
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from src.crud.crud import CatalogCrud
+from src.services.snapshot import CatalogSnapshot
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_api(db, client, create_menu, create_submenu, create_dish):
+    menu = create_menu
+    submenu = create_submenu
+    dish = create_dish
+    crud = CatalogCrud(session=db)
+    snapshot = CatalogSnapshot(
+        1,
+        await crud.get_menus_with_counts(),
+        await crud.get_submenus_with_counts(),
+        await crud.get_dishes(),
+    )
+    urls = [
+        f"/api/v1/menus/{menu.id}",
+        f"/api/v1/menus/{menu.id}/submenus",
+        f"/api/v1/menus/{menu.id}/submenus/{submenu.id}",
+        f"/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes",
+        f"/api/v1/menus/{menu.id}/submenus/{submenu.id}/dishes/{dish.id}",
+    ]
+    for url in urls:
+        response = await client.get(url)
+        status, body = snapshot.lookup(url, set())
+        assert status == response.status_code == HTTP_200_OK
+        assert body == response.content
+
+
+@pytest.mark.asyncio
+async def test_snapshot_skips_stopped_dishes(db, create_menu, create_submenu, create_dish):
+    crud = CatalogCrud(session=db)
+    snapshot = CatalogSnapshot(
+        1,
+        await crud.get_menus_with_counts(),
+        await crud.get_submenus_with_counts(),
+        await crud.get_dishes(),
+    )
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    for path in (url, f"{url}/{create_dish.id}"):
+        assert snapshot.lookup(path, {create_dish.id}) is None
+        assert snapshot.lookup(path, None) is None
+        assert snapshot.lookup(path, {create_dish.id + 1})[0] == HTTP_200_OK
+    assert snapshot.lookup(f"/api/v1/menus/{create_menu.id}", None)[0] == HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_snapshot_not_found(db, create_menu):
+    crud = CatalogCrud(session=db)
+    snapshot = CatalogSnapshot(
+        1,
+        await crud.get_menus_with_counts(),
+        await crud.get_submenus_with_counts(),
+        await crud.get_dishes(),
+    )
+    status, _ = snapshot.lookup("/api/v1/menus/1111", set())
+    assert status == HTTP_404_NOT_FOUND
+    assert snapshot.lookup("/api/v1/download_test_data", set()) is None
@@ -0,0 +1,93 @@
+import aioredis
+import pytest
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from src.crud.cache import RedisCache, tenant_key
+from src.db.redis_config import REDIS_URL
+from src.models.models import DEFAULT_TENANT
+from src.services.stoplist import STOP_LIST_KEY, StopList, stop_list
+
+
+class TogglingRedis:
+    def __init__(self, stop_list: StopList, reconnect: bool = False) -> None:
+        self.stop_list = stop_list
+        self.reconnect = reconnect
+
+    async def smembers(self, key):
+        self.stop_list.apply(DEFAULT_TENANT, [1], False)
+        if self.reconnect:
+            self.stop_list.subscription += 1
+        return [b"2"]
+
+
+@pytest.mark.asyncio
+async def test_availability_does_not_touch_catalog_cache(client, create_menu, create_submenu, create_dish):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}/dishes"
+    redis = aioredis.from_url(REDIS_URL)
+    list_key = tenant_key(DEFAULT_TENANT, f"dish:{create_menu.id}:{create_submenu.id}:list")
+    try:
+        response = await client.get(url)
+        assert response.json()[0]["available"] is True
+        assert await redis.exists(list_key)
+
+        response = await client.put(f"{url}/{create_dish.id}/availability", json={"available": False})
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"available": False}
+        assert await redis.exists(list_key)
+        response = await client.get(url)
+        assert response.json()[0]["available"] is False
+        response = await client.get(f"{url}/{create_dish.id}", params={"fields": "available"})
+        assert response.json() == {"available": False}
+        response = await client.get("/api/v1/stop-list")
+        assert response.json() == [str(create_dish.id)]
+
+        await client.put(f"{url}/{create_dish.id}/availability", json={"available": True})
+        response = await client.get(f"{url}/{create_dish.id}")
+        assert response.json()["available"] is True
+        response = await client.get("/api/v1/stop-list")
+        assert response.json() == []
+        response = await client.put(f"{url}/{create_dish.id + 1}/availability", json={"available": False})
+        assert response.status_code == HTTP_404_NOT_FOUND
+    finally:
+        await redis.delete(tenant_key(DEFAULT_TENANT, STOP_LIST_KEY))
+        await stop_list.stop()
+        await RedisCache(cache=redis).invalidate(menu_id=create_menu.id, submenu_id=create_submenu.id)
+        await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_toggle_during_load_is_kept():
+    local = StopList()
+    local.start = lambda: None
+    local.listening = True
+    assert await local.unavailable(RedisCache(cache=TogglingRedis(local))) == {1, 2}
+    assert local.tenants[DEFAULT_TENANT] == {1, 2}
+    assert not local.loading
+
+    local.tenants.clear()
+    assert await local.unavailable(RedisCache(cache=TogglingRedis(local, reconnect=True))) == {1, 2}
+    assert DEFAULT_TENANT not in local.tenants
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parent", ["menu", "submenu"])
+async def test_cascade_delete_clears_stop_list(client, create_menu, create_submenu, create_dish, parent):
+    url = f"/api/v1/menus/{create_menu.id}/submenus/{create_submenu.id}"
+    redis = aioredis.from_url(REDIS_URL)
+    key = tenant_key(DEFAULT_TENANT, STOP_LIST_KEY)
+    other = str(create_dish.id + 1)
+    try:
+        await client.put(f"{url}/dishes/{create_dish.id}/availability", json={"available": False})
+        await redis.sadd(key, other)
+        response = await client.delete(url if parent == "submenu" else f"/api/v1/menus/{create_menu.id}")
+        assert response.status_code == HTTP_200_OK
+        assert (await client.get("/api/v1/stop-list")).json() == [other]
+
+        await stop_list.clear(RedisCache(cache=redis))
+        assert not await redis.exists(key)
+        assert (await client.get("/api/v1/stop-list")).json() == []
+    finally:
+        await redis.delete(key)
+        await stop_list.stop()
+        await RedisCache(cache=redis).invalidate(menu_id=create_menu.id, cascade=True)
+        await redis.close()
@@ -46,6 +46,19 @@ async def test_get_submenu_not_found(db, client, create_menu):
     assert response.json()["detail"] == "submenu not found"
 
 
+@pytest.mark.asyncio
+@pytest.mark.query_budget(1)
+async def test_get_submenu_under_wrong_menu(db, client, create_menu, create_submenu):
+    menu = create_menu
+    submenu = create_submenu
+    response = await client.get(f"/api/v1/menus/{menu.id + 1}/submenus/{submenu.id}")
+    assert response.status_code == HTTP_404_NOT_FOUND
+    response = await client.delete(f"/api/v1/menus/{menu.id + 1}/submenus/{submenu.id}")
+    assert response.status_code == HTTP_404_NOT_FOUND
+    response = await client.get(f"/api/v1/menus/{menu.id + 1}/submenus")
+    assert response.json() == []
+
+
 @pytest.mark.asyncio
 async def test_create_submenu(db, client, create_menu):
     menu = create_menu
@@ -0,0 +1,99 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.status import HTTP_200_OK
+
+from src.db.database import get_session
+from src.main import app
+
+
+@pytest_asyncio.fixture
+async def sync_client(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def committed_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = committed_session
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_session, None)
+    async with db_engine.begin() as conn:
+        await conn.execute(text("TRUNCATE menus, submenus, dishes, catalog_tombstones RESTART IDENTITY CASCADE"))
+
+
+async def changes(client, since=0):
+    response = await client.get("/api/v1/catalog/changes", params={"since": since})
+    assert response.status_code == HTTP_200_OK
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_catalog_changes(sync_client):
+    base = await changes(sync_client)
+    menu = (await sync_client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"})).json()
+    url = f"/api/v1/menus/{menu['id']}/submenus"
+    submenu = (await sync_client.post(url, json={"title": "Подменю", "description": "Описание"})).json()
+    url = f"/api/v1/menus/{menu['id']}/submenus/{submenu['id']}/dishes"
+    dish = (await sync_client.post(url, json={"title": "Блюдо", "description": "Описание", "price": "1.50"})).json()
+
+    result = await changes(sync_client, base["version"])
+    assert result["version"] > base["version"]
+    assert [item["id"] for item in result["menus"]] == [menu["id"]]
+    assert result["submenus"][0]["menu_id"] == menu["id"]
+    assert result["dishes"][0] == {
+        "id": dish["id"],
+        "submenu_id": submenu["id"],
+        "title": "Блюдо",
+        "description": "Описание",
+        "price": "1.50",
+        "version": result["dishes"][0]["version"],
+    }
+    assert result["deleted"] == []
+
+    version = result["version"]
+    assert await changes(sync_client, version) == {
+        "version": version,
+        "menus": [],
+        "submenus": [],
+        "dishes": [],
+        "deleted": [],
+    }
+
+    await sync_client.patch(f"/api/v1/menus/{menu['id']}", json={"title": "Меню 2", "description": "Описание"})
+    result = await changes(sync_client, version)
+    assert [item["title"] for item in result["menus"]] == ["Меню 2"]
+    assert result["submenus"] == result["dishes"] == []
+
+
+@pytest.mark.asyncio
+async def test_catalog_changes_deleted(sync_client):
+    menu = (await sync_client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"})).json()
+    url = f"/api/v1/menus/{menu['id']}/submenus"
+    submenu = (await sync_client.post(url, json={"title": "Подменю", "description": "Описание"})).json()
+    url = f"/api/v1/menus/{menu['id']}/submenus/{submenu['id']}/dishes"
+    dish = (await sync_client.post(url, json={"title": "Блюдо", "description": "Описание", "price": "1.50"})).json()
+    version = (await changes(sync_client))["version"]
+
+    await sync_client.delete(f"/api/v1/menus/{menu['id']}")
+    result = await changes(sync_client, version)
+    assert result["menus"] == result["submenus"] == result["dishes"] == []
+    deleted = {(item["type"], item["id"]): item for item in result["deleted"]}
+    assert set(deleted) == {("menu", menu["id"]), ("submenu", submenu["id"]), ("dish", dish["id"])}
+    assert deleted[("dish", dish["id"])]["menu_id"] == menu["id"]
+    assert deleted[("dish", dish["id"])]["submenu_id"] == submenu["id"]
+
+
+@pytest.mark.asyncio
+async def test_catalog_changes_translation(sync_client):
+    menu = (await sync_client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"})).json()
+    version = (await changes(sync_client))["version"]
+
+    await sync_client.put(f"/api/v1/menus/{menu['id']}/translations/en", json={"title": "Menu"})
+    result = await changes(sync_client, version)
+    assert [item["id"] for item in result["menus"]] == [menu["id"]]
+    assert result["version"] > version
@@ -0,0 +1,176 @@
+import uuid
+
+import aioredis
+import pytest
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
+
+from src import tenants
+from src.crud.cache import RedisCache, tenant_key
+from src.crud.crud import TenantCrud
+from src.db.database import get_session
+from src.db.redis_config import REDIS_URL
+from src.main import app
+from src.models.models import DEFAULT_TENANT
+from src.settings import settings
+
+
+class SessionScope:
+    def __init__(self, session) -> None:
+        self.session = session
+        self.open = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        self.open += 1
+        return self.session
+
+    async def __aexit__(self, *exc):
+        self.open -= 1
+
+
+async def create_tenant(db, **quotas):
+    tenant_id = f"cafe-{uuid.uuid4().hex[:8]}"
+    await TenantCrud(session=db).create_tenant({"id": tenant_id, "title": "Кафе", **quotas})
+    return tenant_id
+
+
+@pytest.mark.asyncio
+async def test_tenant_catalogs_are_isolated(db, client):
+    tenant = await create_tenant(db)
+    headers = {settings.TENANT_HEADER: tenant}
+    response = await client.post("/api/v1/menus", json={"title": "Основное", "description": "Описание"})
+    default_menu_id = response.json()["id"]
+    response = await client.get("/api/v1/menus", headers=headers)
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == []
+
+    response = await client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"}, headers=headers)
+    assert response.status_code == HTTP_201_CREATED
+    menu_id = response.json()["id"]
+    response = await client.get("/api/v1/menus", headers=headers)
+    assert [menu["id"] for menu in response.json()] == [menu_id]
+    response = await client.get("/api/v1/menus")
+    assert [menu["id"] for menu in response.json()] == [default_menu_id]
+
+    response = await client.get(f"/api/v1/menus/{menu_id}")
+    assert response.status_code == HTTP_404_NOT_FOUND
+    response = await client.post(
+        f"/api/v1/menus/{default_menu_id}/submenus",
+        json={"title": "Подменю", "description": "Описание"},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_404_NOT_FOUND
+    response = await client.get("/api/v1/search", params={"q": "меню"}, headers=headers)
+    assert {item["id"] for item in response.json()} == {menu_id}
+
+
+@pytest.mark.asyncio
+async def test_unknown_tenant(client):
+    for tenant in ("missing", "not a tenant"):
+        response = await client.get("/api/v1/menus", headers={settings.TENANT_HEADER: tenant})
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_change_stream_holds_no_session(db, monkeypatch):
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/api/v1/changes")
+    dependencies = [route.dependant]
+    while dependencies:
+        dependant = dependencies.pop()
+        assert dependant.call is not get_session
+        dependencies += dependant.dependencies
+
+    tenant = await create_tenant(db)
+    scope = SessionScope(db)
+    monkeypatch.setattr(tenants, "SessionLocal", scope)
+    tenants.tenant_registry.tenants.pop(tenant, None)
+    assert await tenants.get_stream_tenant(tenant) == tenant
+    assert scope.open == 0
+
+
+@pytest.mark.asyncio
+async def test_tenant_quotas(db, client):
+    tenant = await create_tenant(db, max_items=2, rate_limit=1)
+    headers = {settings.TENANT_HEADER: tenant}
+    response = await client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"}, headers=headers)
+    response = await client.post(
+        f"/api/v1/menus/{response.json()['id']}/submenus",
+        json={"title": "Подменю", "description": "Описание"},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_201_CREATED
+    response = await client.post("/api/v1/menus", json={"title": "Меню", "description": "Описание"}, headers=headers)
+    assert response.status_code == HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == "1"
+
+    tenant = await create_tenant(db, max_items=1)
+    headers = {settings.TENANT_HEADER: tenant}
+    menu = {"title": "Меню", "description": "Описание"}
+    statuses = [(await client.post("/api/v1/menus", json=menu, headers=headers)).status_code for _ in range(2)]
+    assert statuses == [HTTP_201_CREATED, HTTP_403_FORBIDDEN]
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_scoped_to_tenant():
+    redis = aioredis.from_url(REDIS_URL)
+    first, second = f"cafe-{uuid.uuid4().hex[:8]}", f"cafe-{uuid.uuid4().hex[:8]}"
+    try:
+        caches = [RedisCache(cache=redis, tenant=tenant) for tenant in (first, second)]
+        for cache in caches:
+            await cache.set("menu:list", [])
+            await cache.set("dish:1:2:list", [])
+            await cache.set("dish:1:2:list?fields=id", [])
+            await cache.set("search:меню:20:0", [], expire=60)
+        await caches[0].delete_all("dish:1:")
+        assert await redis.smembers(caches[0].index) == {tenant_key(first, "menu:list").encode()}
+        assert await caches[0].get("dish:1:2:list") is None
+        assert await caches[1].get("dish:1:2:list") == []
+        await caches[1].delete_one("dish:1:2:list")
+        assert not await redis.exists(tenant_key(second, "dish:1:2:list?fields=id"))
+        assert await caches[1].get("menu:list") == []
+    finally:
+        await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_create_tenant(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    tenant = {"id": f"cafe-{uuid.uuid4().hex[:8]}", "title": "Кафе", "rate_limit": None, "max_items": 100}
+    response = await client.post("/api/v1/admin/tenants", json=tenant, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == HTTP_201_CREATED
+    assert response.json() == tenant
+    response = await client.post("/api/v1/admin/tenants", json=tenant, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == HTTP_409_CONFLICT
+    response = await client.get("/api/v1/menus", headers={settings.TENANT_HEADER: tenant["id"]})
+    assert response.status_code == HTTP_200_OK
+    response = await client.post("/api/v1/admin/tenants", json={**tenant, "id": DEFAULT_TENANT.upper()})
+    assert response.status_code == HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_missing_tenant_is_cached(db, monkeypatch):
+    lookups = []
+    get_tenant = TenantCrud.get_tenant
+
+    async def counted_get_tenant(self, tenant_id):
+        lookups.append(tenant_id)
+        return await get_tenant(self, tenant_id)
+
+    monkeypatch.setattr(TenantCrud, "get_tenant", counted_get_tenant)
+    registry = tenants.TenantRegistry()
+    tenant_id = f"cafe-{uuid.uuid4().hex[:8]}"
+    assert await registry.get(tenant_id, db) is None
+    assert await registry.get(tenant_id, db) is None
+    assert lookups == [tenant_id]
+    registry.put(await TenantCrud(session=db).create_tenant({"id": tenant_id, "title": "Кафе"}))
+    assert (await registry.get(tenant_id, db)).id == tenant_id
+    assert lookups == [tenant_id]